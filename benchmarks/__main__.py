@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+
+from slideshow.Governor import getCpuCount
+from slideshow.Governor import getTotalMemory
+
+from .calibrate import calibrate
+from .calibrate import getCalibrationFilename
+from .compare import compare
+from .compare import formatRows
+from .media import makeAudio
+from .media import makeImages
+from .media import makeVideos
+from .phases import getConfig
+from .phases import timeGraph
+from .phases import timeProbes
+from .phases import timeRender
+from .phases import timeSlides
+
+PHASES = ["slides", "graph", "probe", "render"]
+
+
+def getList(value, type=str):
+    return [type(v) for v in value.split(",") if v]
+
+
+def run(args):
+    work_folder = args.work if args.work else tempfile.mkdtemp(prefix="kburns-bench-")
+    media_folder = os.path.join(work_folder, "media")
+    os.makedirs(media_folder, exist_ok=True)
+
+    config = getConfig(work_folder, args.stub, args.ffmpeg, args.ffprobe)
+    ffmpeg = None if args.stub else config["ffmpeg"]
+    phases = getList(args.phases)
+
+    print("Generating media in %s" % (media_folder))
+    images = makeImages(media_folder, args.images, args.megapixels)
+    videos = makeVideos(media_folder, args.videos, ffmpeg=ffmpeg)
+    audio = makeAudio(media_folder, args.audio, ffmpeg=ffmpeg)
+
+    metrics = {}
+    details = {}
+    try:
+        if "slides" in phases:
+            print("Slide construction")
+            metrics.update(timeSlides(config, images, max(100, args.images)))
+        if "graph" in phases:
+            for size in getList(args.slides, int):
+                print("Filter graph of %s slides" % (size))
+                metrics.update(timeGraph(config, images, [size]))
+        if "probe" in phases:
+            print("Probing")
+            metrics.update(timeProbes(config, videos, audio))
+        if "render" in phases:
+            for resolution in getList(args.resolutions):
+                width, height = [int(v) for v in resolution.split("x")]
+                for strategy in getList(args.strategies):
+                    print("Render %sx%s (%s)" % (width, height, strategy))
+                    results, render = timeRender(
+                        config,
+                        work_folder,
+                        images[: args.render_slides],
+                        videos,
+                        audio,
+                        width,
+                        height,
+                        strategy,
+                        args.stub,
+                    )
+                    metrics.update(results)
+                    details.update(render)
+    finally:
+        if not args.work:
+            shutil.rmtree(work_folder, ignore_errors=True)
+
+    content = {
+        "date": datetime.datetime.now().isoformat(),
+        "host": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpu_count": getCpuCount(),
+            "memory": getTotalMemory(),
+        },
+        "stub": args.stub,
+        "arguments": vars(args),
+        "metrics": metrics,
+        "details": {"render": details},
+    }
+    with open(args.output, "w") as file:
+        json.dump(content, file, indent=4, default=str)
+    print("Results written to %s" % (args.output))
+
+    for name in sorted(metrics):
+        print("%-40s %10.4f s" % (name, metrics[name]))
+    return 0
+
+
+def compareResults(args):
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    with open(args.current) as file:
+        current = json.load(file)
+
+    if baseline["stub"] != current["stub"]:
+        print("Warning: comparing a stub run with a real run")
+    if baseline["host"] != current["host"]:
+        print("Warning: the results are from different hosts")
+
+    rows, regressions = compare(baseline, current, args.threshold)
+    print("\n".join(formatRows(rows)))
+
+    if regressions:
+        print("%s regression(s): %s" % (len(regressions), ", ".join(regressions)))
+        return 1
+    return 0
+
+
+def calibrateResults(args):
+    with open(args.results) as file:
+        results = json.load(file)
+    if results["stub"]:
+        print("Stub results cannot be used for the calibration")
+        return 1
+
+    # the calibration belongs to the temp folder of the slideshow
+    config = getConfig(tempfile.gettempdir(), ffmpeg=args.ffmpeg)
+    filename = args.calibration or getCalibrationFilename(getConfig(None))
+
+    model, coefficients = calibrate(results["details"]["render"], config["ffmpeg"])
+    os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+    model.save(filename)
+
+    for key in sorted(coefficients):
+        print("%-20s %s" % (key, coefficients[key]))
+    print("Calibration written to %s" % (filename))
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description="Benchmarks of the slideshow"
+    )
+    commands = parser.add_subparsers(dest="command")
+
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument(
+        "--stub",
+        action="store_true",
+        help="use the ffmpeg/ffprobe stubs to measure only the Python side",
+    )
+    run_parser.add_argument(
+        "--phases", default=",".join(PHASES), help="default: %(default)s"
+    )
+    run_parser.add_argument(
+        "--slides",
+        default="10,100,1000,10000",
+        help="slide counts of the filter graph benchmark (default: %(default)s)",
+    )
+    run_parser.add_argument("--images", type=int, default=20, help="default: %(default)s")
+    run_parser.add_argument(
+        "--megapixels", type=float, default=2, help="default: %(default)s"
+    )
+    run_parser.add_argument("--videos", type=int, default=2, help="default: %(default)s")
+    run_parser.add_argument("--audio", type=int, default=1, help="default: %(default)s")
+    run_parser.add_argument(
+        "--render-slides",
+        type=int,
+        default=8,
+        help="images of the end-to-end render (default: %(default)s)",
+    )
+    run_parser.add_argument(
+        "--resolutions", default="320x200,640x400,1280x800", help="default: %(default)s"
+    )
+    run_parser.add_argument(
+        "--strategies", default="single,temp", help="default: %(default)s"
+    )
+    run_parser.add_argument("--ffmpeg", help="default: from config.json")
+    run_parser.add_argument("--ffprobe", help="default: from config.json")
+    run_parser.add_argument("--work", help="keep the generated media in this folder")
+    run_parser.add_argument(
+        "-o", "--output", default="benchmark.json", help="default: %(default)s"
+    )
+
+    compare_parser = commands.add_parser(
+        "compare", help="compare results with a baseline"
+    )
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="relative slowdown of a regression (default: %(default)s)",
+    )
+
+    calibrate_parser = commands.add_parser(
+        "calibrate", help="calibrate the cost model of the render planner"
+    )
+    calibrate_parser.add_argument("results", help="results of a run with real ffmpeg")
+    calibrate_parser.add_argument("--ffmpeg", help="default: from config.json")
+    calibrate_parser.add_argument(
+        "--calibration", help="default: calibration.json in the temp folder"
+    )
+
+    args = parser.parse_args()
+    if args.command == "run":
+        return run(args)
+    if args.command == "compare":
+        return compareResults(args)
+    if args.command == "calibrate":
+        return calibrateResults(args)
+    parser.print_help()
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
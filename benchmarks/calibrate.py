@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+
+import os
+import statistics
+import subprocess
+import time
+
+from slideshow.Planner import CALIBRATION_FILENAME
+from slideshow.Planner import CostModel
+from slideshow.Profiler import getItemCategory
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# share of the decoding of a segment (decode and encode), x264 ultrafast
+# spends most of the time in the encoder
+DECODE_SHARE = 0.25
+
+
+def getCalibrationFilename(config):
+    # same location as SlideManager.planRender
+    folder = config["temp_file_folder"] if "temp_file_folder" in config else "temp"
+    if not os.path.isabs(folder):
+        folder = os.path.join(PROJECT_ROOT, folder)
+    return os.path.join(folder, CALIBRATION_FILENAME)
+
+
+def timeProcess(ffmpeg, count=10):
+    start = time.perf_counter()
+    for i in range(count):
+        subprocess.check_output([ffmpeg, "-version"])
+    return (time.perf_counter() - start) / count
+
+
+def getSamples(details):
+    # cost per frame and megapixel of the temporary videos of the renders
+    samples = {
+        "zoompan": [],
+        "segment": [],
+        "transition": [],
+        "temp_size": [],
+        "parallelism": [],
+        "single_memory": [],
+        "concat_memory": [],
+    }
+    for render in details.values():
+        megapixels = render["width"] * render["height"] / 1000000
+        for stage in render["stages"]:
+            frames = stage["args"].get("frames")
+            if stage["category"] not in ["slide", "transition", "combine"] or not frames:
+                continue
+            cost = stage["children_cpu"] / (frames * megapixels)
+            category = getItemCategory({"suffix": stage["name"]})
+            if "size" in stage["args"]:
+                samples["temp_size"].append(stage["args"]["size"] / (frames * megapixels))
+
+            if category == "transition":
+                samples["transition"].append(cost)
+            elif category == "combine":
+                inputs = max(1, len(stage["args"].get("depends", [])))
+                samples["concat_memory"].append(
+                    stage["peak_rss_mb"] / (inputs * megapixels)
+                )
+            elif "_" in stage["name"]:
+                # start, main and end segments of a slide
+                samples["segment"].append(cost)
+            else:
+                # zoom/pan of an image
+                samples["zoompan"].append(cost)
+                samples["single_memory"].append(stage["peak_rss_mb"] / megapixels)
+                if stage["wall"] > 0:
+                    samples["parallelism"].append(stage["children_cpu"] / stage["wall"])
+    return samples
+
+
+def calibrate(details, ffmpeg=None, model=None):
+    model = model if model is not None else CostModel()
+    samples = getSamples(details)
+    coefficients = {}
+
+    if samples["segment"]:
+        segment = statistics.median(samples["segment"])
+        coefficients["decode"] = segment * DECODE_SHARE
+        coefficients["encode"] = segment * (1 - DECODE_SHARE)
+    if samples["zoompan"]:
+        # the zoom/pan video is encoded as well
+        encode = coefficients.get("encode", model.get("encode"))
+        coefficients["zoompan"] = max(
+            0.0001, statistics.median(samples["zoompan"]) - encode
+        )
+    if samples["transition"]:
+        # the transition video is encoded as well
+        encode = coefficients.get("encode", model.get("encode"))
+        coefficients["transition"] = max(
+            0.0001, statistics.median(samples["transition"]) - encode
+        )
+    if samples["parallelism"]:
+        coefficients["filter_parallelism"] = max(
+            1.0, statistics.median(samples["parallelism"])
+        )
+    for key in ["single_memory", "concat_memory", "temp_size"]:
+        if samples[key]:
+            coefficients[key] = statistics.median(samples[key])
+    if ffmpeg is not None:
+        coefficients["process"] = timeProcess(ffmpeg)
+
+    model.coefficients.update(coefficients)
+    model.calibrated = True
+    return model, coefficients
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+
+
+def compare(baseline, current, threshold=0.2, minimum=0.005):
+    # a metric regressed when it is slower by more than the threshold (relative)
+    # and the minimum (seconds), which ignores the noise of tiny timings
+    rows = []
+    regressions = []
+    for name in sorted(set(baseline["metrics"]) | set(current["metrics"])):
+        before = baseline["metrics"].get(name)
+        after = current["metrics"].get(name)
+
+        if before is None or after is None:
+            rows.append((name, before, after, None, "new" if before is None else "missing"))
+            continue
+
+        ratio = after / before if before > 0 else None
+        status = ""
+        if after > before * (1 + threshold) and after - before > minimum:
+            status = "REGRESSION"
+            regressions.append(name)
+        elif after < before * (1 - threshold) and before - after > minimum:
+            status = "faster"
+        rows.append((name, before, after, ratio, status))
+
+    return rows, regressions
+
+
+def formatRows(rows):
+    lines = ["%-40s %12s %12s %8s  %s" % ("Metric", "Baseline", "Current", "Ratio", "")]
+    for name, before, after, ratio, status in rows:
+        lines.append(
+            "%-40s %12s %12s %8s  %s"
+            % (
+                name,
+                "%.4f" % (before) if before is not None else "-",
+                "%.4f" % (after) if after is not None else "-",
+                "%.2f" % (ratio) if ratio is not None else "-",
+                status,
+            )
+        )
+    return lines
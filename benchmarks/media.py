@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+
+import json
+import math
+import os
+import subprocess
+
+from PIL import Image
+from PIL import ImageDraw
+
+
+def makeImages(folder, count, megapixels=2):
+    # 3:2 images with a gradient and a label, so that they compress like photos
+    width = int(math.sqrt(megapixels * 1000000 * 3 / 2))
+    height = int(width * 2 / 3)
+
+    files = []
+    for i in range(count):
+        file = os.path.join(folder, "image-%04d.jpg" % (i))
+        if not os.path.exists(file):
+            gradient = Image.linear_gradient("L")
+            image = Image.merge(
+                "RGB",
+                (
+                    gradient.resize((width, height)),
+                    gradient.rotate(90).resize((width, height)),
+                    Image.new("L", (width, height), (i * 37) % 256),
+                ),
+            )
+            draw = ImageDraw.Draw(image)
+            draw.text((width // 10, height // 10), "Slide %s" % (i), fill=(255, 255, 0))
+            image.save(file, "JPEG", quality=85)
+        files.append(file)
+    return files
+
+
+def makeVideos(folder, count, duration=4, ffmpeg=None, width=640, height=360, fps=30):
+    # test source video with a sine tone, a JSON description in stub mode
+    files = []
+    for i in range(count):
+        file = os.path.join(folder, "video-%04d.mp4" % (i))
+        if ffmpeg is None:
+            with open(file, "w") as f:
+                json.dump(
+                    {
+                        "duration": duration,
+                        "width": width,
+                        "height": height,
+                        "fps": fps,
+                        "audio": True,
+                    },
+                    f,
+                )
+        elif not os.path.exists(file):
+            subprocess.check_call(
+                [
+                    ffmpeg,
+                    "-v",
+                    "error",
+                    "-y",
+                    "-f",
+                    "lavfi",
+                    "-i",
+                    "testsrc=size=%sx%s:rate=%s:duration=%s" % (width, height, fps, duration),
+                    "-f",
+                    "lavfi",
+                    "-i",
+                    "sine=frequency=%s:duration=%s" % (220 + i * 110, duration),
+                    "-c:v",
+                    "libx264",
+                    "-preset",
+                    "ultrafast",
+                    "-c:a",
+                    "aac",
+                    "-shortest",
+                    file,
+                ]
+            )
+        files.append(file)
+    return files
+
+
+def makeAudio(folder, count, duration=30, ffmpeg=None):
+    # beeps twice per second, so that the onset detection finds something
+    files = []
+    for i in range(count):
+        file = os.path.join(folder, "audio-%04d.mp3" % (i))
+        if ffmpeg is None:
+            with open(file, "w") as f:
+                json.dump({"duration": duration, "audio": True}, f)
+        elif not os.path.exists(file):
+            subprocess.check_call(
+                [
+                    ffmpeg,
+                    "-v",
+                    "error",
+                    "-y",
+                    "-f",
+                    "lavfi",
+                    "-i",
+                    "sine=frequency=440:beep_factor=4:duration=%s" % (duration),
+                    "-c:a",
+                    "libmp3lame",
+                    file,
+                ]
+            )
+        files.append(file)
+    return files
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import random
+import shutil
+import time
+
+from slideshow.AudioFile import AudioFile
+from slideshow.SlideManager import SlideManager
+from slideshow.VideoSlide import VideoSlide
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+STUB_FOLDER = os.path.join(PROJECT_ROOT, "benchmarks", "stub")
+
+
+def getConfig(work_folder, stub=False, ffmpeg=None, ffprobe=None):
+    with open(os.path.join(PROJECT_ROOT, "config.json")) as config_file:
+        config = json.load(config_file)
+
+    if stub:
+        ffmpeg = os.path.join(STUB_FOLDER, "ffmpeg")
+        ffprobe = os.path.join(STUB_FOLDER, "ffprobe")
+    if ffmpeg is not None:
+        config["ffmpeg"] = ffmpeg
+    if ffprobe is not None:
+        config["ffprobe"] = ffprobe
+
+    if work_folder is None:
+        # configuration of the slideshow itself
+        return config
+
+    config.update(
+        {
+            "temp_file_folder": os.path.join(work_folder, "temp"),
+            "slide_duration": 2,
+            "slide_duration_min": 1,
+            "loopable": False,
+            "generate_temp": False,
+            "delete_temp": True,
+            "overwrite": True,
+            "sync_to_audio": False,
+            "progress_log": "",
+            "profile": False,
+            "trace": False,
+            "validate_threshold": 0,
+            # measure the final encode on every run
+            "stream_copy": False,
+        }
+    )
+    return config
+
+
+def cycle(files, count):
+    return [files[i % len(files)] for i in range(count)]
+
+
+def timeSlides(config, images, count):
+    # construction of image slides (opening the images)
+    random.seed(0)
+    sm = SlideManager(dict(config), [], [])
+    start = time.perf_counter()
+    for file in cycle(images, count):
+        sm.addSlide(file)
+    duration = time.perf_counter() - start
+    return {"slides.per_slide": duration / count, "slides.total.%s" % (count): duration}
+
+
+def timeGraph(config, images, sizes):
+    # filter graph generation of the single graph and the temporary videos
+    results = {}
+    for size in sizes:
+        random.seed(0)
+        sm = SlideManager(dict(config), cycle(images, size), [])
+        for strategy in ["single", "temp"]:
+            sm.config["generate_temp"] = strategy == "temp"
+            # a new job starts without a render plan
+            sm.newJob()
+            start = time.perf_counter()
+            sm.getVideoFilterChains()
+            sm.getAudioFilterChains()
+            results["graph.%s.%s" % (strategy, size)] = time.perf_counter() - start
+            sm.cleanVideoProcessing()
+    return results
+
+
+def timeProbes(config, videos, audio):
+    results = {}
+    if videos:
+        start = time.perf_counter()
+        for file in videos:
+            VideoSlide(4, file, config["ffprobe"], 1280, 800)
+        results["probe.video_per_file"] = (time.perf_counter() - start) / len(videos)
+    if audio:
+        start = time.perf_counter()
+        for file in audio:
+            AudioFile(file, config["ffprobe"])
+        results["probe.audio_per_file"] = (time.perf_counter() - start) / len(audio)
+    return results
+
+
+def timeRender(
+    config, work_folder, images, videos, audio, width, height, strategy, stub=False
+):
+    # end-to-end render, the stages come from the profiler of the slideshow
+    name = "%sx%s-%s" % (width, height, strategy)
+    render_config = dict(config)
+    render_config.update(
+        {"output_width": width, "output_height": height, "render_strategy": strategy}
+    )
+
+    random.seed(0)
+    sm = SlideManager(render_config, images + videos, audio)
+    if stub:
+        # the placeholders of the stub cannot be verified by their frames
+        del sm.config["ffprobe"]
+
+    output = os.path.join(work_folder, "%s.mp4" % (name))
+    start = time.perf_counter()
+    sm.createVideo(output, overwrite=True)
+    wall = time.perf_counter() - start
+
+    results = {"render.%s.wall" % (name): wall}
+    for category, total in sm.profiler.getTotals().items():
+        results["render.%s.%s" % (name, category)] = total["wall"]
+
+    details = {
+        "width": width,
+        "height": height,
+        "strategy": strategy,
+        "frames": sm.getFinalVideoFrames(),
+        "stages": sm.profiler.getStages(),
+    }
+
+    if os.path.exists(output):
+        os.remove(output)
+    shutil.rmtree(render_config["temp_file_folder"], ignore_errors=True)
+
+    return results, {name: details}
@@ -1,9 +1,17 @@
+import json
+import os
+import random
 from io import BytesIO
 
 import pytest
 from PIL import Image, ImageDraw
 
+from slideshow import PROJECT_ROOT
 from slideshow.ImageSlide import ImageSlide
+from slideshow.SlideManager import SlideManager
+
+# the stand-ins for ffmpeg and ffprobe of the benchmarks (python -m benchmarks --stub)
+STUB_FOLDER = PROJECT_ROOT / "benchmarks" / "stub"
 
 
 @pytest.fixture(scope="module")
@@ -39,3 +47,60 @@ def image_slide(image_slide_config):
     buffer.seek(0)
     image_slide_config["file"] = buffer
     return ImageSlide(**image_slide_config)
+
+
+@pytest.fixture
+def stub_config(tmp_path):
+    # the ffmpeg stub writes placeholders, the ffprobe stub reads their properties
+    with open(PROJECT_ROOT / "config.json") as config_file:
+        config = json.load(config_file)
+
+    config.update(
+        {
+            "ffmpeg": str(STUB_FOLDER / "ffmpeg"),
+            "ffprobe": str(STUB_FOLDER / "ffprobe"),
+            "temp_file_folder": str(tmp_path / "temp"),
+            "slide_duration": 2,
+            "slide_duration_min": 1,
+            "loopable": False,
+            "generate_temp": False,
+            "delete_temp": True,
+            "overwrite": True,
+            "sync_to_audio": False,
+            "progress_log": "",
+            "profile": False,
+            "trace": False,
+            "validate_threshold": 0,
+            "stream_copy": False,
+        }
+    )
+    return config
+
+
+@pytest.fixture
+def stub_manager(stub_config):
+    # slideshows which are rendered by the stubs, the placeholders have no frames
+    # to verify unless they are probed on purpose
+    def create(files, audio_files=(), probe=False, **config):
+        random.seed(0)
+        sm = SlideManager(dict(stub_config, **config), list(files), list(audio_files))
+        if not probe:
+            del sm.config["ffprobe"]
+        return sm
+
+    return create
+
+
+@pytest.fixture
+def stub_audio(tmp_path):
+    # placeholders of audio files with their properties for the ffprobe stub
+    def create(count, duration=30):
+        files = []
+        for i in range(count):
+            file = os.path.join(tmp_path, "audio-%04d.mp3" % (i))
+            with open(file, "w") as f:
+                json.dump({"duration": duration, "audio": True}, f)
+            files.append(file)
+        return files
+
+    return create
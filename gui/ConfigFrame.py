@@ -290,7 +290,9 @@ class ConfigFrame(tk.Toplevel):
     def saveConfig(self):
         logger.info("Save global config")
 
-        config = self.getConfig()
+        # keep the settings which are not editable in this window
+        config = dict(self.config)
+        config.update(self.getConfig())
 
         with open(self.config_path, "w") as file:
             json.dump(config, file, indent=4)
@@ -0,0 +1,87 @@
+import collections
+import concurrent.futures
+import logging
+import threading
+
+from PIL import Image
+from slideshow.Cache import getFileIdentity
+
+logger = logging.getLogger("kburns-slideshow")
+
+# decoded previews which are kept in memory
+PREVIEW_CACHE_SIZE = 16
+
+
+class PreviewCache:
+    # the sources of the slide previews, decoded only as large as the preview needs,
+    # the neighbours of the selected slide are decoded in the background
+    def __init__(self, capacity=PREVIEW_CACHE_SIZE):
+        self.capacity = capacity
+        self.images = collections.OrderedDict()
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+    def get(self, path, size):
+        # (image, size of the original) of a file, the image covers the size
+        key = (getFileIdentity(path), tuple(size))
+        with self.lock:
+            if key in self.images:
+                self.images.move_to_end(key)
+                return self.images[key]
+            event = self.pending.get(key)
+            owner = event is None
+            if owner:
+                event = self.pending[key] = threading.Event()
+
+        if not owner:
+            # the file is already decoded by a prefetch
+            event.wait()
+            with self.lock:
+                if key in self.images:
+                    return self.images[key]
+
+        try:
+            preview = self.load(path, size)
+            with self.lock:
+                self.images[key] = preview
+                if len(self.images) > self.capacity:
+                    self.images.popitem(last=False)
+        finally:
+            if owner:
+                with self.lock:
+                    del self.pending[key]
+                event.set()
+        return preview
+
+    def load(self, path, size):
+        width, height = size
+        with Image.open(path) as image:
+            original = image.size
+            # JPEGs are decoded at the smallest scale which is larger than the preview
+            image.draft("RGB", (width, height))
+            image = image.convert("RGB")
+
+        # the smallest size which covers the preview in both directions,
+        # crop_center and pan fill the preview with the image
+        scale = max(width / original[0], height / original[1])
+        cover = (
+            max(1, round(original[0] * scale)),
+            max(1, round(original[1] * scale)),
+        )
+        if image.size[0] > cover[0] and image.size[1] > cover[1]:
+            image = image.resize(cover, Image.LANCZOS)
+        return image, original
+
+    def prefetch(self, getPath, size):
+        # getPath is called by the worker, e.g. to extract the frame of a video
+        def load():
+            try:
+                self.get(getPath(), size)
+            except Exception as e:
+                logger.debug("Preview could not be prefetched: %s", e)
+
+        self.executor.submit(load)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,118 @@
+import time
+import tkinter as tk
+from tkinter import ttk
+
+from PIL import ImageTk
+
+
+class PreviewFrame(tk.Toplevel):
+    # plays the slideshow from the proxies of slideshow.Preview, the frame is taken
+    # from the clock, so slow frames are skipped and the playback stays in time
+    def __init__(self, parent, preview, **options):
+        tk.Toplevel.__init__(self, parent, options)
+
+        self.title("Preview")
+        self.resizable(False, False)
+
+        self.preview = preview
+        self.fps = preview.fps
+        self.frame = 0
+        self.playing = False
+        self.play_start = None
+        self.play_frame = 0
+        self.timer = None
+
+        self.imageLabel = tk.Label(self)
+        self.imageLabel.grid(row=0, column=0, columnspan=3, padx=4, pady=4)
+
+        self.position = tk.DoubleVar()
+        self.scale = ttk.Scale(
+            self,
+            from_=0,
+            to=max(preview.getFrameCount() - 1, 0),
+            variable=self.position,
+            command=self.onScrub,
+            length=preview.size[0],
+        )
+        self.scale.grid(row=1, column=0, columnspan=3, sticky=tk.EW, padx=4)
+
+        self.playText = tk.StringVar()
+        self.playText.set("Play")
+        tk.Button(self, textvariable=self.playText, command=self.togglePlay).grid(
+            row=2, column=0, sticky=tk.W, padx=4, pady=4
+        )
+
+        self.timeText = tk.StringVar()
+        tk.Label(self, textvariable=self.timeText).grid(
+            row=2, column=2, sticky=tk.E, padx=4, pady=4
+        )
+
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        self.show(0)
+
+    def show(self, frame):
+        self.frame = frame
+        photo = ImageTk.PhotoImage(self.preview.renderFrame(frame))
+        self.imageLabel.configure(image=photo)
+        # keep a reference
+        self.imageLabel.image = photo
+        self.position.set(frame)
+        self.timeText.set(
+            "%s / %s"
+            % (
+                self.formatTime(frame / self.fps),
+                self.formatTime(self.preview.getFrameCount() / self.fps),
+            )
+        )
+
+    def formatTime(self, seconds):
+        return "%02d:%05.2f" % (seconds // 60, seconds % 60)
+
+    def onScrub(self, value):
+        frame = int(float(value))
+        if frame == self.frame:
+            return
+        if self.playing:
+            self.play_start = time.perf_counter()
+            self.play_frame = frame
+        self.show(frame)
+
+    def togglePlay(self):
+        if self.playing:
+            self.stop()
+            return
+
+        if self.frame >= self.preview.getFrameCount() - 1:
+            self.frame = 0
+        self.playing = True
+        self.playText.set("Pause")
+        self.play_start = time.perf_counter()
+        self.play_frame = self.frame
+        self.tick()
+
+    def tick(self):
+        frame = self.play_frame + int(
+            (time.perf_counter() - self.play_start) * self.fps
+        )
+        if frame >= self.preview.getFrameCount():
+            self.show(self.preview.getFrameCount() - 1)
+            self.stop()
+            return
+
+        self.show(frame)
+        # the next frame is due at
+        due = self.play_start + (frame + 1 - self.play_frame) / self.fps
+        delay = max(1, int((due - time.perf_counter()) * 1000))
+        self.timer = self.after(delay, self.tick)
+
+    def stop(self):
+        self.playing = False
+        self.playText.set("Play")
+        if self.timer is not None:
+            self.after_cancel(self.timer)
+            self.timer = None
+
+    def close(self):
+        self.stop()
+        self.preview.shutdown()
+        self.destroy()
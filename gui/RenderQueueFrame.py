@@ -0,0 +1,56 @@
+import tkinter as tk
+from tkinter import ttk
+
+from slideshow.Progress import formatTime
+
+
+class RenderQueueFrame(tk.Toplevel):
+    # the jobs of the render queue, the GUI stays usable while they are rendered
+    def __init__(self, parent, renderQueue, **options):
+        tk.Toplevel.__init__(self, parent, options)
+
+        self.title("Render Queue")
+        self.renderQueue = renderQueue
+
+        self.tree = ttk.Treeview(
+            self, columns=("output", "state", "progress"), show="headings", height=8
+        )
+        self.tree.heading("output", text="Video")
+        self.tree.heading("state", text="State")
+        self.tree.heading("progress", text="Progress")
+        self.tree.column("output", width=360)
+        self.tree.column("state", width=80)
+        self.tree.column("progress", width=180)
+        self.tree.grid(row=0, column=0, sticky=tk.NSEW, padx=4, pady=4)
+
+        buttonCancel = tk.Button(self, text="Cancel", command=self.cancel)
+        buttonCancel.grid(row=1, column=0, sticky=tk.W, padx=4, pady=4)
+
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+
+        # closing only hides the queue, the jobs go on
+        self.protocol("WM_DELETE_WINDOW", self.withdraw)
+        self.refresh()
+
+    def refresh(self):
+        for job in self.renderQueue.jobs:
+            values = (job["output"], job["state"], self.formatJob(job))
+            if self.tree.exists(job["id"]):
+                self.tree.item(job["id"], values=values)
+            else:
+                self.tree.insert("", tk.END, iid=job["id"], values=values)
+
+    def formatJob(self, job):
+        if job["error"] is not None:
+            return job["error"]
+        overall = job["overall"]
+        if overall is None:
+            return ""
+        eta = " ETA %s" % (formatTime(overall["eta"])) if overall["eta"] else ""
+        return "%.0f%%%s" % (overall["percent"], eta)
+
+    def cancel(self):
+        for job_id in self.tree.selection():
+            self.renderQueue.cancel(job_id)
+        self.refresh()
@@ -24,9 +24,9 @@ class ScrollFrame(tk.Frame):
             self.canvas.configure(yscrollcommand=vsbar.set)
 
         # create horizontal scrollbar
-        hsbar = tk.Scrollbar(self, orient=tk.HORIZONTAL, command=self.canvas.xview)
-        hsbar.grid(row=1, column=0, sticky=tk.EW)
-        self.canvas.configure(xscrollcommand=hsbar.set)
+        self.hsbar = tk.Scrollbar(self, orient=tk.HORIZONTAL, command=self.canvas.xview)
+        self.hsbar.grid(row=1, column=0, sticky=tk.EW)
+        self.canvas.configure(xscrollcommand=self.hsbar.set)
 
     def addFrame(self, frame, anchor=tk.NW):
         self.frame = frame
@@ -35,8 +35,11 @@ class ScrollFrame(tk.Frame):
             (0, 0), window=frame, anchor=anchor
         )
 
+        self.updateScrollRegion()
+
+    def updateScrollRegion(self):
         # update idletasks so that bounding box info is available
-        frame.update_idletasks()
+        self.frame.update_idletasks()
 
         # update scrollregion to match frame content
         self.canvas.configure(scrollregion=self.canvas.bbox("all"))
@@ -0,0 +1,169 @@
+import collections
+import tkinter as tk
+from tkinter import ttk
+
+from PIL import Image
+from PIL import ImageTk
+
+# width of a slide in the strip (thumbnail and button padding)
+SLOT_WIDTH = 160
+# buttons on both sides of the visible part, so scrolling shows no empty slots
+OVERSCAN = 4
+# thumbnails which are kept as PhotoImage
+PHOTO_CACHE_SIZE = 256
+
+
+class SlideStrip:
+    # only the slides in the visible part of the strip have a button, the buttons
+    # are placed on the canvas of the ScrollFrame and re-used for other slides
+    # while scrolling, changes of the slides only re-bind the visible buttons
+    def __init__(
+        self, scrollFrame, getSlides, getThumbnail, onClick, onMove, canMove, style
+    ):
+        self.scrollFrame = scrollFrame
+        self.canvas = scrollFrame.getCanvas()
+        self.getSlides = getSlides
+        # path of the cached thumbnail of a slide or None if it is not rendered yet
+        self.getThumbnail = getThumbnail
+        self.onClick = onClick
+        self.onMove = onMove
+        self.canMove = canMove
+        self.style = style
+
+        self.selected = None
+        # buttons by slide index and the unused ones
+        self.visible = {}
+        self.free = []
+        self.photos = collections.OrderedDict()
+        self.placeholder = None
+
+        self.canvas.configure(xscrollcommand=self.onScroll)
+        self.canvas.bind("<Configure>", lambda event: self.update())
+
+    def onScroll(self, first, last):
+        self.scrollFrame.hsbar.set(first, last)
+        self.update()
+
+    def getVisibleRange(self):
+        count = len(self.getSlides())
+        left = self.canvas.canvasx(0)
+        right = left + max(self.canvas.winfo_width(), SLOT_WIDTH)
+        first = max(0, int(left // SLOT_WIDTH) - OVERSCAN)
+        last = min(count, int(right // SLOT_WIDTH) + 1 + OVERSCAN)
+        return first, last
+
+    def refresh(self):
+        # the slides were added, removed or moved
+        count = len(self.getSlides())
+        self.canvas.configure(scrollregion=(0, 0, count * SLOT_WIDTH, 90))
+        self.update(rebind=True)
+
+    def update(self, rebind=False):
+        first, last = self.getVisibleRange()
+
+        for index in list(self.visible):
+            if index < first or index >= last:
+                button = self.visible.pop(index)
+                self.canvas.itemconfigure(button.window, state="hidden")
+                self.free.append(button)
+
+        for index in range(first, last):
+            if index not in self.visible:
+                self.visible[index] = self.getButton()
+                self.bind(self.visible[index], index)
+            elif rebind:
+                self.bind(self.visible[index], index)
+
+    def getButton(self):
+        if self.free:
+            return self.free.pop()
+
+        button = ttk.Button(self.canvas, style=self.style)
+        button.window = self.canvas.create_window(0, 5, window=button, anchor=tk.NW)
+        button.bind("<Button-1>", self.onDragStart)
+        button.bind("<B1-Motion>", self.onDragMotion)
+        button.bind("<ButtonRelease-1>", self.onDragStop)
+        return button
+
+    def bind(self, button, index):
+        slide = self.getSlides()[index]
+        button.slide_index = index
+        button.slide_file = slide.file
+        button.configure(image=self.getPhoto(slide))
+        button.state(
+            ["pressed", "disabled"]
+            if index == self.selected
+            else ["!pressed", "!disabled"]
+        )
+        self.canvas.coords(button.window, index * SLOT_WIDTH, 5)
+        self.canvas.itemconfigure(button.window, state="normal")
+
+    def getPhoto(self, slide):
+        if slide.file in self.photos:
+            self.photos.move_to_end(slide.file)
+            return self.photos[slide.file]
+
+        thumbnail = self.getThumbnail(slide)
+        if thumbnail is None:
+            if self.placeholder is None:
+                self.placeholder = tk.PhotoImage(width=150, height=75)
+            return self.placeholder
+
+        # https://stackoverflow.com/a/44978329
+        with Image.open(thumbnail) as image:
+            photo = ImageTk.PhotoImage(image)
+        self.photos[slide.file] = photo
+        if len(self.photos) > PHOTO_CACHE_SIZE:
+            self.photos.popitem(last=False)
+        return photo
+
+    def updateThumbnail(self, file):
+        # a thumbnail was rendered, only the visible buttons show it
+        self.photos.pop(file, None)
+        for index, button in self.visible.items():
+            if button.slide_file == file:
+                self.bind(button, index)
+
+    def select(self, index):
+        self.selected = index
+        for i, button in self.visible.items():
+            button.state(
+                ["pressed", "disabled"] if i == index else ["!pressed", "!disabled"]
+            )
+
+    def clear(self):
+        for button in list(self.visible.values()) + self.free:
+            self.canvas.delete(button.window)
+            button.destroy()
+        self.visible = {}
+        self.free = []
+        self.photos.clear()
+        self.selected = None
+
+    def onDragStart(self, event):
+        widget = event.widget
+        widget._drag_start_x = event.x
+        widget._moved = False
+
+    def onDragMotion(self, event):
+        if self.canMove():
+            widget = event.widget
+            x = self.canvas.canvasx(widget.winfo_x() - widget._drag_start_x + event.x)
+            self.canvas.coords(widget.window, x, 5)
+            widget.lift()
+            widget._moved = True
+
+    def onDragStop(self, event):
+        widget = event.widget
+        index = widget.slide_index
+
+        if self.canMove() and widget._moved:
+            x = self.canvas.canvasx(widget.winfo_x() + event.x)
+            new_index = min(max(0, int(x // SLOT_WIDTH)), len(self.getSlides()) - 1)
+            if new_index != index:
+                self.onMove(index, new_index)
+                index = new_index
+            # the model changed, the buttons show the new order
+            self.update(rebind=True)
+
+        self.onClick(index)
@@ -0,0 +1,121 @@
+import concurrent.futures
+import logging
+import os
+import queue
+import subprocess
+import threading
+
+from PIL import Image
+from slideshow.Cache import Cache
+from slideshow.Cache import getFileIdentity
+from slideshow.Cache import getKey
+
+logger = logging.getLogger("kburns-slideshow")
+
+THUMBNAIL_EXTENSION = "jpg"
+
+
+class ThumbnailService:
+    # renders the thumbnails of the slide strip on a worker pool, the Tk thread
+    # only picks up the finished ones (see poll), so the strip fills in progressively
+    def __init__(self, ffmpeg, cache_folder, size=(150, 75), workers=None):
+        self.ffmpeg = ffmpeg
+        self.size = size
+        # thumbnails and video frames are kept between the sessions
+        self.cache = Cache(cache_folder)
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=workers or min(4, os.cpu_count() or 1)
+        )
+        self.pending = {}
+        self.finished = queue.Queue()
+        self.lock = threading.Lock()
+
+    def getThumbnailKey(self, file, size=None):
+        return getKey(getFileIdentity(file), size or self.size, "thumbnail")
+
+    def getFrameKey(self, file):
+        return getKey(getFileIdentity(file), "frame")
+
+    def get(self, file, is_video=False):
+        # the cached thumbnail or None, a missing one is rendered in the background
+        key = self.getThumbnailKey(file)
+        if self.cache.has(key, THUMBNAIL_EXTENSION):
+            return self.cache.getPath(key, THUMBNAIL_EXTENSION)
+
+        with self.lock:
+            if key not in self.pending:
+                self.pending[key] = self.executor.submit(
+                    self.render, file, is_video, key
+                )
+        return None
+
+    def poll(self):
+        # (file, thumbnail) of the thumbnails which were finished since the last poll
+        results = []
+        while True:
+            try:
+                results.append(self.finished.get_nowait())
+            except queue.Empty:
+                return results
+
+    def render(self, file, is_video, key):
+        try:
+            source = self.getFrame(file) if is_video else file
+            thumbnail = self.renderImage(source, key)
+        except Exception as e:
+            logger.warning("Thumbnail of %s could not be created: %s", file, e)
+            thumbnail = None
+        with self.lock:
+            del self.pending[key]
+        self.finished.put((file, thumbnail))
+        return thumbnail
+
+    def renderImage(self, file, key):
+        cached = self.cache.getPath(key, THUMBNAIL_EXTENSION)
+        with Image.open(file) as image:
+            # JPEGs are decoded at the smallest scale which is larger than the thumbnail
+            image.draft("RGB", self.size)
+            image.thumbnail(self.size)
+            part = "{}.{}.{}.part".format(cached, os.getpid(), threading.get_ident())
+            image.convert("RGB").save(part, "JPEG")
+        os.replace(part, cached)
+        return cached
+
+    def getFrame(self, file):
+        # the first keyframe of a video, only the keyframes are decoded
+        key = self.getFrameKey(file)
+        cached = self.cache.getPath(key, THUMBNAIL_EXTENSION)
+        if os.path.exists(cached):
+            return cached
+
+        part = "{}.{}.{}.part.jpg".format(cached, os.getpid(), threading.get_ident())
+        si = None
+        if hasattr(subprocess, "STARTUPINFO"):
+            si = subprocess.STARTUPINFO()
+            si.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+        subprocess.check_output(
+            [
+                self.ffmpeg,
+                "-hide_banner",
+                "-v",
+                "quiet",
+                "-skip_frame",
+                "nokey",
+                "-ss",
+                "0",
+                "-i",
+                file,
+                "-frames:v",
+                "1",
+                "-y",
+                part,
+            ],
+            stderr=subprocess.PIPE,
+            stdin=subprocess.PIPE,
+            startupinfo=si,
+        )
+        os.replace(part, cached)
+        return cached
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -6,10 +6,7 @@ import json
 import logging
 import os
 import pkgutil
-import re
-import subprocess
 import sys
-import threading
 import tkinter as tk
 from tkinter import messagebox
 from tkinter import ttk
@@ -20,14 +17,23 @@ from tkinter.filedialog import asksaveasfilename
 from PIL import Image
 from PIL import ImageDraw
 from PIL import ImageTk
+from slideshow.Cache import getFileIdentity
+from slideshow.JobManifest import getJobManifestFilename
+from slideshow.JobManifest import JobManifest
+from slideshow.Preview import Preview
+from slideshow.RenderQueue import RenderQueue
 from slideshow.SlideManager import ImageSlide
 from slideshow.SlideManager import SlideManager
 from slideshow.SlideManager import VideoSlide
 
 from .ConfigFrame import ConfigFrame
-from .ProgressFrame import ProgressFrame
+from .PreviewCache import PreviewCache
+from .PreviewFrame import PreviewFrame
+from .RenderQueueFrame import RenderQueueFrame
 from .ScrollFrame import ScrollFrame
 from .SettingsFrame import SettingsFrame
+from .SlideStrip import SlideStrip
+from .ThumbnailService import ThumbnailService
 
 logger = logging.getLogger("kburns-slideshow")
 
@@ -75,6 +81,15 @@ class App(tk.Tk):
         self.addSlideButton.grid(row=0, column=0, sticky=tk.SW)
         self.frameSlides = ScrollFrame(master_frame, 100, False)
         self.frameSlides.grid(row=1, column=0, sticky=tk.NSEW)
+        self.slideStrip = SlideStrip(
+            self.frameSlides,
+            lambda: self.sm.getSlides() if self.sm else [],
+            self.getSlideThumbnail,
+            self.onSlideClicked,
+            self.onSlideMoved,
+            lambda: self.moveSlidesBtn.get() > 0,
+            SUNKABLE_BUTTON,
+        )
 
         # Image Frame with fill parent (sticky=tk.NSEW)
         self.addAudioButton = ttk.Button(
@@ -132,10 +147,15 @@ class App(tk.Tk):
         )
         buttonResetTime.grid(row=0, column=5, rowspan=2, sticky=tk.W, padx=2)
 
+        buttonPreview = tk.Button(
+            frameActions, text="Preview", command=self.previewVideo
+        )
+        buttonPreview.grid(row=0, column=6, rowspan=2, sticky=tk.W, padx=2)
+
         buttonCreateVideo = tk.Button(
             frameActions, text="Create Video", command=self.createVideo
         )
-        buttonCreateVideo.grid(row=0, column=6, rowspan=2, sticky=tk.W, padx=2)
+        buttonCreateVideo.grid(row=0, column=7, rowspan=2, sticky=tk.W, padx=2)
 
         # Menu
         menubar = tk.Menu(self)
@@ -168,7 +188,6 @@ class App(tk.Tk):
 
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
 
-        self.buttons = []
         self.buttonsAudio = []
         # https://stackoverflow.com/a/23355222
         # https://kite.com/python/docs/ttk.Style
@@ -179,7 +198,17 @@ class App(tk.Tk):
             background=[("pressed", "red"), ("disabled", "red"), ("focus", "red")],
         )
 
-        self.thumbnails = []
+        # thumbnails of the slide strip, rendered in the background
+        self.thumbnailService = None
+        self.after(100, self.pollThumbnails)
+        # decoded previews of the slide editor and the last one with its geometry
+        self.previewCache = PreviewCache()
+        self.previewBase = None
+        # the videos are rendered by worker processes
+        self.renderQueue = RenderQueue()
+        self.renderQueueFrame = None
+        self.after(250, self.pollRenderQueue)
+
         self.transition_choices = [
             package_name
             for importer, package_name, _ in pkgutil.iter_modules(
@@ -236,18 +265,29 @@ class App(tk.Tk):
         )
 
     def on_closing(self):
-        if self.hasSlides():
+        if self.renderQueue.isBusy():
+            if messagebox.askyesno(
+                "Quit", "Videos are still rendered.\n\nDo you want to cancel them and quit?"
+            ):
+                self.renderQueue.shutdown()
+                self.closeThumbnailService()
+                self.destroy()
+        elif self.hasSlides():
             if messagebox.askyesno("Quit", "Do you want to quit?"):
-                # Delete thumbnails
-                for file in self.thumbnails:
-                    if os.path.exists(file):
-                        os.remove(file)
-                        logger.debug("Delete %s", file)
+                self.closeThumbnailService()
                 # Close
                 self.destroy()
         else:
+            self.closeThumbnailService()
             self.destroy()
 
+    def closeThumbnailService(self):
+        # the cached thumbnails are kept for the next session
+        if self.thumbnailService is not None:
+            self.thumbnailService.shutdown()
+            self.thumbnailService = None
+        self.previewCache.shutdown()
+
     def onCloseSlideshowSettings(self, toplevel):
         input_files = [
             slide.getObject(self.slideshow_config) for slide in self.sm.getSlides()
@@ -309,7 +349,7 @@ class App(tk.Tk):
         zr = self.inputZoomRate.get() if isinstance(slide, ImageSlide) else None
         sc = self.inputScaleMode.get() if isinstance(slide, ImageSlide) else None
         photo = self.getPreviewImage(
-            self.buttons[self.slide_selected].image_path, zd_x, zd_y, zd_z, zr, sc
+            self.getPreviewPath(self.slide_selected), zd_x, zd_y, zd_z, zr, sc
         )
 
         self.imageLabel.configure(image=photo)
@@ -507,6 +547,13 @@ class App(tk.Tk):
 
         try:
             self.sm = SlideManager(self.slideshow_config, input_files, audio_files)
+            self.closeThumbnailService()
+            self.thumbnailService = ThumbnailService(
+                self.slideshow_config["ffmpeg"],
+                os.path.join(self.sm.cacheFolder, "thumbnails"),
+            )
+            self.previewCache = PreviewCache()
+            self.previewBase = None
             self.loadSlideshowImagesRow()
             self.loadSlideshowAudioRow()
             self.generalmenu.entryconfig("Slideshow Settings", state="normal")
@@ -524,94 +571,70 @@ class App(tk.Tk):
         return True
 
     def resetGUI(self):
-        self.frameSlides.clear()
+        self.slideStrip.clear()
         self.frameAudio.clear()
         self.frameSlideSettings.clear()
         self.addSlideButton["state"] = tk.DISABLED
         self.addAudioButton["state"] = tk.DISABLED
 
     def loadSlideshowImagesRow(self):
-        canvas2 = self.frameSlides.getCanvas()
-
-        images_frame = tk.Frame(canvas2, padx=5, pady=5)
-
-        basewidth = 150
-
-        self.buttons = []
-        i = 0
-        for i, slide in enumerate(self.sm.getSlides()):
-            img_path = slide.file
-            if isinstance(slide, VideoSlide):
-                img_path = os.path.join(
-                    self.sm.tempFileFolder, "thumbnail_%s.jpg" % (i)
-                )
-                si = None
-                if hasattr(subprocess, "STARTUPINFO"):
-                    si = subprocess.STARTUPINFO()
-                    si.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-                subprocess.check_output(
-                    [
-                        self.slideshow_config["ffmpeg"],
-                        "-i",
-                        slide.file,
-                        "-ss",
-                        "00:00:00.000",
-                        "-vframes",
-                        "1",
-                        "-hide_banner",
-                        "-v",
-                        "quiet",
-                        "-y",
-                        img_path,
-                    ],
-                    stderr=subprocess.PIPE,
-                    stdin=subprocess.PIPE,
-                    startupinfo=si,
-                )
-                self.thumbnails.append(img_path)
-
-            # https://stackoverflow.com/a/44978329
-            img = Image.open(img_path)
-
-            img.thumbnail((basewidth, basewidth / 2))
-
-            photo = ImageTk.PhotoImage(img)
-
-            # https://stackoverflow.com/a/45733411
-            # https://stackoverflow.com/questions/50787864/how-do-i-make-a-tkinter-button-in-an-list-of-buttons-return-its-index#comment88609106_50787933
-            # command=lambda c=i: self.onSlideClicked(c),
-            b = ttk.Button(images_frame, image=photo, style=SUNKABLE_BUTTON)
-            b.image = photo  # keep a reference
-            b.grid(row=0, column=i, sticky=tk.NSEW)
-
-            # save reference to image path
-            b.image_path = img_path
-
-            b.bind("<Button-1>", self.buttonDragStart)
-            b.bind("<B1-Motion>", self.buttonDragMotion)
-            b.bind("<ButtonRelease-1>", self.buttonDragStopSlide)
-
-            self.buttons.append(b)
-
-        # addButton = ttk.Button(images_frame, text="Add slide", command=self.addSlide)
-        # addButton.grid(row=0, column=i + 1, sticky=tk.SW)
+        # only the visible slides have a button, see SlideStrip
+        self.slideStrip.refresh()
+        self.slideStrip.select(None)
 
         self.addSlideButton["state"] = tk.NORMAL
 
-        self.frameSlides.addFrame(images_frame)
         duration = self.sm.getTotalDuration()
         self.videoDurationValue.set(self.formatDuration(duration))
 
         self.slide_selected = None
 
-    def onSlideClicked(self, button_id):
-        for btn in self.buttons:
-            btn.state(["!pressed", "!disabled"])
+    def getSlideThumbnail(self, slide):
+        # cached thumbnails are shown at once, the others when they are rendered
+        if self.thumbnailService is None:
+            return None
+        return self.thumbnailService.get(slide.file, isinstance(slide, VideoSlide))
+
+    def pollThumbnails(self):
+        # the workers of the thumbnail service must not touch the widgets
+        if self.thumbnailService is not None:
+            for file, thumbnail in self.thumbnailService.poll():
+                if thumbnail is not None:
+                    self.slideStrip.updateThumbnail(file)
+        self.after(100, self.pollThumbnails)
+
+    def getPreviewPath(self, button_id):
+        return self.getSlidePreviewPath(self.sm.getSlides()[button_id])
+
+    def getSlidePreviewPath(self, slide):
+        # a video is shown by its first keyframe
+        if isinstance(slide, VideoSlide):
+            return self.thumbnailService.getFrame(slide.file)
+        return slide.file
 
+    def prefetchPreviews(self, button_id):
+        # the previous and next slide are decoded while the settings are edited
+        output_ratio = float(self.slideshow_config["output_width"]) / float(
+            self.slideshow_config["output_height"]
+        )
+        size = (250, int(250 / output_ratio))
+        slides = self.sm.getSlides()
+        for neighbour in [button_id - 1, button_id + 1]:
+            if 0 <= neighbour < len(slides):
+                slide = slides[neighbour]
+                self.previewCache.prefetch(
+                    lambda slide=slide: self.getSlidePreviewPath(slide), size
+                )
+
+    def onSlideMoved(self, old, new):
+        self.saveSlide()
+        self.sm.moveSlide(old, new)
+
+    def onSlideClicked(self, button_id):
         for btn in self.buttonsAudio:
             btn.state(["!pressed", "!disabled"])
 
-        self.buttons[button_id].state(["pressed", "disabled"])
+        self.slideStrip.select(button_id)
 
         # save previous slide
         self.saveSlide()
@@ -1030,13 +1053,14 @@ class App(tk.Tk):
         zr = slide.zoom_rate if isinstance(slide, ImageSlide) else None
         sc = slide.scale if isinstance(slide, ImageSlide) else None
         photo = self.getPreviewImage(
-            self.buttons[button_id].image_path, zd_x, zd_y, zd_z, zr, sc
+            self.getPreviewPath(button_id), zd_x, zd_y, zd_z, zr, sc
         )
 
         self.imageLabel = tk.Label(imageframe, image=photo)
         self.imageLabel.grid(row=0, column=0, sticky=tk.E, padx=4, pady=4)
         # keep a reference
         self.imageLabel.image = photo
+        self.prefetchPreviews(button_id)
 
         self.frameSlideSettings.addFrame(optionsFrame, tk.NW)
 
@@ -1052,43 +1076,12 @@ class App(tk.Tk):
         output_ratio = float(self.slideshow_config["output_width"]) / float(
             self.slideshow_config["output_height"]
         )
-        thumb_width = 250
-        thumb_height = int(thumb_width / output_ratio)
-
-        slideImage = Image.open(img_path)
-        slideImage_width, slideImage_height = slideImage.size
-        slideImage_ratio = slideImage_width / slideImage_height
-
-        slidethumb_width, slidethumb_height = [thumb_width, thumb_height]
-        if scale == "crop_center":
-            if slideImage_ratio < output_ratio:
-                slidethumb_width, slidethumb_height = [
-                    thumb_width,
-                    int(thumb_width / slideImage_ratio),
-                ]
-            else:
-                slidethumb_width, slidethumb_height = [
-                    int(thumb_height * slideImage_ratio),
-                    thumb_height,
-                ]
-        elif scale == "pad" or scale == "pan":
-            if slideImage_ratio > output_ratio:
-                slidethumb_width, slidethumb_height = [
-                    thumb_width,
-                    int(thumb_width / slideImage_ratio),
-                ]
-            else:
-                slidethumb_width, slidethumb_height = [
-                    int(thumb_height * slideImage_ratio),
-                    thumb_height,
-                ]
-
-        slideImage.thumbnail((slidethumb_width, slidethumb_height))
-
-        img = Image.new("RGB", (thumb_width, thumb_height), color="black")
-        thumb_x = int((thumb_width - slidethumb_width) / 2)
-        thumb_y = int((thumb_height - slidethumb_height) / 2)
-        img.paste(slideImage, (thumb_x, thumb_y))
+        # only the rectangles are drawn again when the zoom settings change
+        base, geometry = self.getPreviewBase(img_path, scale, output_ratio)
+        img = base.copy()
+        slideImage_ratio, slidethumb_width, slidethumb_height, thumb_x, thumb_y = (
+            geometry
+        )
 
         # transition preview
         if (
@@ -1263,6 +1256,62 @@ class App(tk.Tk):
 
         return ImageTk.PhotoImage(img)
 
+    def getPreviewBase(self, img_path, scale, output_ratio):
+        thumb_width = 250
+        thumb_height = int(thumb_width / output_ratio)
+
+        key = (getFileIdentity(img_path), scale, thumb_width, thumb_height)
+        if self.previewBase is not None and self.previewBase[0] == key:
+            return self.previewBase[1:]
+
+        # decoded at the preview size and kept for the neighbouring slides
+        slideImage, (slideImage_width, slideImage_height) = self.previewCache.get(
+            img_path, (thumb_width, thumb_height)
+        )
+        slideImage_ratio = slideImage_width / slideImage_height
+
+        slidethumb_width, slidethumb_height = [thumb_width, thumb_height]
+        if scale == "crop_center":
+            if slideImage_ratio < output_ratio:
+                slidethumb_width, slidethumb_height = [
+                    thumb_width,
+                    int(thumb_width / slideImage_ratio),
+                ]
+            else:
+                slidethumb_width, slidethumb_height = [
+                    int(thumb_height * slideImage_ratio),
+                    thumb_height,
+                ]
+        elif scale == "pad" or scale == "pan":
+            if slideImage_ratio > output_ratio:
+                slidethumb_width, slidethumb_height = [
+                    thumb_width,
+                    int(thumb_width / slideImage_ratio),
+                ]
+            else:
+                slidethumb_width, slidethumb_height = [
+                    int(thumb_height * slideImage_ratio),
+                    thumb_height,
+                ]
+
+        slideImage = slideImage.copy()
+        slideImage.thumbnail((slidethumb_width, slidethumb_height))
+
+        img = Image.new("RGB", (thumb_width, thumb_height), color="black")
+        thumb_x = int((thumb_width - slidethumb_width) / 2)
+        thumb_y = int((thumb_height - slidethumb_height) / 2)
+        img.paste(slideImage, (thumb_x, thumb_y))
+
+        geometry = (
+            slideImage_ratio,
+            slidethumb_width,
+            slidethumb_height,
+            thumb_x,
+            thumb_y,
+        )
+        self.previewBase = (key, img, geometry)
+        return img, geometry
+
     def loadSlideshowAudioRow(self):
         canvas = self.frameAudio.getCanvas()
 
@@ -1335,34 +1384,9 @@ class App(tk.Tk):
         button_id = widget.grid_info()["column"]
         self.onAudioClicked(button_id)
 
-    def buttonDragStopSlide(self, event):
-        widget = event.widget
-
-        if self.moveSlidesBtn.get() > 0:
-            x = widget.winfo_x() + event.x
-            y = widget.winfo_y() + event.y
-            (new_column, new_row) = self.frameSlides.getFrame().grid_location(x, y)
-
-            # move button to new position
-            # https://stackoverflow.com/a/3173159
-            if widget._col != new_column:
-                self.buttons.insert(new_column, self.buttons.pop(widget._col))
-                self.sm.moveSlide(widget._col, new_column)
-
-                # rearrange buttons in grid
-                for i, btn in enumerate(self.buttons):
-                    btn.grid(column=i)
-
-        # Trigger Button Click
-        # when using command the new button order is not respected
-        # the button_id of the command is not changable
-        button_id = widget.grid_info()["column"]
-        self.onSlideClicked(button_id)
-
     def onAudioClicked(self, button_id):
 
-        for btn in self.buttons:
-            btn.state(["!pressed", "!disabled"])
+        self.slideStrip.select(None)
 
         for btn in self.buttonsAudio:
             btn.state(["!pressed", "!disabled"])
@@ -1441,97 +1465,61 @@ class App(tk.Tk):
         self.loadSlideshowAudioRow()
         self.videoDurationValue.set(self.formatDuration(self.sm.getTotalDuration()))
 
+    def previewVideo(self):
+        # the slideshow is played from proxies, nothing is rendered
+        if not self.hasSlides():
+            return
+        self.saveSlide()
+        PreviewFrame(self, Preview(self.sm, getSource=self.getSlidePreviewPath))
+
     def createVideo(self):
         self.saveSlide()
         filename = asksaveasfilename()
         if filename:
-            createVideoThread = threading.Thread(
-                target=self.startVideoCreation, args=(filename,), daemon=True
-            )
-            createVideoThread.start()
-
-    def startVideoCreation(self, output_file):
-        (
-            burnSubtitles,
-            srtInput,
-            srtFilename,
-            inputs,
-            temp_filter_script,
-        ) = self.sm.prepareVideoProcessing(output_file)
-
-        queue_length = self.sm.queue.getQueueLength()
-        frames = self.sm.getFinalVideoFrames()
-
-        progressPopup = ProgressFrame(self)
-        progressPopup.create(
-            self.slideshow_config["generate_temp"], queue_length, frames
-        )
-
-        for idx, item in enumerate(self.sm.queue.getQueue()):
-            if progressPopup.is_cancelled:
-                self.sm.cleanVideoProcessing()
-                break
-            print(f"Processing video {idx + 1}/{queue_length}")
-            logger.info(f"Processing video {idx + 1}/{queue_length}")
-            # logger.debug(item)
-            tempFile = self.sm.queue.createTemporaryVideo(
-                self.slideshow_config["ffmpeg"], item
-            )
-
-            if tempFile is None:
-                print("Error while creating the temporary video file!")
-                logger.error("Error while creating the temporary video file!")
-
-            progressPopup.progress_var1.set(idx + 1)
-            progressPopup.update()
-
-        if not progressPopup.is_cancelled:
-            cmd = self.sm.getFinalVideoCommand(
-                output_file,
-                burnSubtitles,
-                srtInput,
-                srtFilename,
-                inputs,
-                temp_filter_script,
-                overwrite=True,
-            )
-
-            cmd.append("-v")
-            cmd.append("quiet")
-
-            logger.info("FFMPEG started")
-            logger.debug(" ".join(cmd))
-            p = subprocess.Popen(
-                " ".join(cmd),
-                shell=True,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                universal_newlines=True,
+            resume = False
+            # the worker renders a copy, so the slideshow can be edited meanwhile
+            project = self.getRenderProject()
+            # is there an interrupted render of this file?
+            manifest = JobManifest(
+                getJobManifestFilename(
+                    self.sm.tempFileFolder, self.sm.tempFilePrefix, filename
+                )
             )
-
-            # set the process to the popup so when clicking cancel the command "q" can be send to ffmpeg
-            progressPopup.setFinalVideoProcess(p)
-
-            # read the stdout/stderr
-            for line in iter(p.stdout.readline, ""):
-                if p.returncode or progressPopup.is_cancelled:
-                    break
-                print(line.rstrip())
-                m = re.search(r"^frame= *(\d+)", line)
-                if m and m.group(1) is not None:
-                    progress = m.group(1)
-                    progressPopup.progress_var2.set(progress)
-                    progressPopup.update()
-
-            # wait till the process is finished (regular or cancelled)
-            p.wait()
-            logger.info("FFMPEG finished")
-
-        self.sm.cleanVideoProcessing(temp_filter_script, srtFilename)
-
-        # close popup
-        progressPopup.destroy()
+            if (
+                manifest.load()
+                and manifest.getProject() is not None
+                and messagebox.askyesno(
+                    "Resume",
+                    "A previous rendering of this file was interrupted.\n\n"
+                    "Do you want to resume it?",
+                )
+            ):
+                resume = True
+                # continue with the slideshow of the interrupted render, the open
+                # slideshow and its unsaved edits are kept
+                project = manifest.getProject()
+                project["config"] = dict(self.slideshow_config, **project["config"])
+
+            self.renderQueue.submit(project, filename, resume)
+            self.showRenderQueue()
+
+    def getRenderProject(self):
+        project = self.sm.getProject()
+        project["config"] = dict(self.slideshow_config, **project["config"])
+        return project
+
+    def showRenderQueue(self):
+        if self.renderQueueFrame is None or not self.renderQueueFrame.winfo_exists():
+            self.renderQueueFrame = RenderQueueFrame(self, self.renderQueue)
+        self.renderQueueFrame.deiconify()
+        self.renderQueueFrame.lift()
+        self.renderQueueFrame.refresh()
+
+    def pollRenderQueue(self):
+        # the progress of the render workers
+        if self.renderQueue.poll() and self.renderQueueFrame is not None:
+            self.renderQueueFrame.refresh()
+        self.after(250, self.pollRenderQueue)
 
     def addSlide(self):
         self.saveSlide()
@@ -1546,13 +1534,11 @@ class App(tk.Tk):
         filenames = askopenfilenames(filetypes=ftypes)
         for file in list(filenames):
             self.sm.addSlide(file, self.slide_selected)
-        self.frameSlides.clear()
         self.frameSlideSettings.clear()
         self.loadSlideshowImagesRow()
 
     def deleteSlide(self):
         self.sm.removeSlide(self.slide_selected)
-        self.frameSlides.clear()
         self.frameSlideSettings.clear()
         self.loadSlideshowImagesRow()
 
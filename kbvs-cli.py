@@ -3,9 +3,11 @@
 import json
 import logging
 import os
+import sys
 
 import slideshow.cli as cli
 from slideshow.SlideManager import SlideManager
+from slideshow.Validator import formatReport
 
 # Logging
 logger = logging.getLogger("kburns-slideshow")
@@ -40,6 +42,27 @@ if __name__ == "__main__":
         logger.info("Sync titles durations to slides durations")
         sm.adjustTitlesToSlides()
 
-    sm.createVideo(
-        output_file, True, config["save"], config["test"], config["overwrite"]
+    # the project is saved as edited, not with the settings of a draft
+    if config["save"] is not None:
+        sm.saveConfig(config["save"])
+
+    # the render works on a frozen copy of the slideshow
+    snapshot = sm.snapshot()
+
+    if config["estimate"]:
+        print(json.dumps(snapshot.getEstimate(), indent=4))
+        sys.exit(0)
+
+    if config["validate"]:
+        report = snapshot.validate(output_file)
+        print("\n".join(formatReport(report)))
+        sys.exit(0 if report["valid"] else 1)
+
+    snapshot.createVideo(
+        output_file,
+        True,
+        None,
+        config["test"],
+        config["overwrite"],
+        config["resume"],
     )
@@ -1,4 +1,5 @@
 import logging
+import multiprocessing
 import os
 
 from gui.app import App
@@ -15,5 +16,7 @@ handler.setFormatter(formatter)
 logger.addHandler(handler)
 
 if __name__ == "__main__":
+    # the videos are rendered in worker processes, also from the frozen executable
+    multiprocessing.freeze_support()
     app = App("kbvs")
     app.mainloop()
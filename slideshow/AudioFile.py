@@ -2,6 +2,9 @@
 
 import subprocess
 
+# onset detection method of aubioonset (Kullback-Liebler)
+ONSET_PARAMETERS = ["-O", "kl"]
+
 
 class AudioFile:
     def __init__(self, file, ffprobe):
@@ -28,10 +31,15 @@ class AudioFile:
         ).decode()
         self.duration = float(duration)
 
-    def getTimestamps(self, aubio):
+    def getTimestamps(self, aubio, detector=None):
+        # the built-in detector streams the PCM from ffmpeg instead of aubio
+        if detector is not None:
+            return detector.detect(self.file)
+
         timestamps = (
             subprocess.check_output(
-                ["%s" % (aubio), "-i", self.file, "-O", "kl"], stderr=subprocess.DEVNULL
+                ["%s" % (aubio), "-i", self.file] + ONSET_PARAMETERS,
+                stderr=subprocess.DEVNULL,
             )
             .decode()
             .splitlines()
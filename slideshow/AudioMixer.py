@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+
+import logging
+import os
+import subprocess
+import wave
+
+from .Cache import Cache
+from .Cache import getFileIdentity
+from .Cache import getKey
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger("kburns-slideshow")
+
+# all sources are decoded to interleaved float32 PCM of this format
+SAMPLE_RATE = 48000
+CHANNELS = 2
+PCM_EXTENSION = "f32"
+
+# samples which are mixed at once
+BLOCK_SIZE = 1 << 16
+
+
+def isMixerAvailable():
+    return np is not None
+
+
+def getFadeGain(times, fade_in, fade_out_start, fade_out):
+    # linear afade in (from 0) and out (at fade_out_start), times relative to the track
+    gain = np.ones(len(times), dtype=np.float32)
+    if fade_in > 0:
+        gain *= np.clip(times / fade_in, 0, 1)
+    if fade_out > 0:
+        gain *= np.clip(1 - (times - fade_out_start) / fade_out, 0, 1)
+    return gain
+
+
+def getSectionGain(times, sections):
+    # the background sections are the same stream with their own fades,
+    # before the start of a section its fade-in is silent, after the fade-out as well
+    gain = np.zeros(len(times), dtype=np.float32)
+    for section in sections:
+        fade_in = (
+            np.clip((times - section["start"]) / section["fade_in"], 0, 1)
+            if section["fade_in"] > 0
+            else (times >= section["start"]).astype(np.float32)
+        )
+        fade_out = (
+            np.clip(1 - (times - section["end"]) / section["fade_out"], 0, 1)
+            if section["fade_out"] > 0
+            else (times < section["end"]).astype(np.float32)
+        )
+        gain += fade_in * fade_out
+    return gain
+
+
+def readSamples(sources, start, end):
+    # samples [start, end) of the concatenated sources, silence outside of them
+    block = np.zeros((end - start, CHANNELS), dtype=np.float32)
+    position = 0
+    for pcm in sources:
+        first = max(start, position)
+        last = min(end, position + len(pcm))
+        if first < last:
+            block[first - start : last - start] = pcm[first - position : last - position]
+        position += len(pcm)
+        if position >= end:
+            break
+    return block
+
+
+def writeWave(filename, blocks):
+    # 16 bit PCM, the mix is clipped to the valid range
+    part = "%s.part" % (filename)
+    with wave.open(part, "wb") as file:
+        file.setnchannels(CHANNELS)
+        file.setsampwidth(2)
+        file.setframerate(SAMPLE_RATE)
+        for block in blocks:
+            file.writeframes(
+                (np.clip(block, -1, 1) * 32767).astype("<i2").tobytes()
+            )
+    os.replace(part, filename)
+    return filename
+
+
+class AudioMixer:
+    def __init__(self, ffmpeg, cache_folder, governor=None):
+        self.ffmpeg = ffmpeg
+        # decoded sources are shared by all renders
+        self.cache = Cache(cache_folder)
+        self.governor = governor
+
+    def getPcmKey(self, file):
+        return getKey(getFileIdentity(file), SAMPLE_RATE, CHANNELS, PCM_EXTENSION)
+
+    def decode(self, file):
+        # decode a source once, the PCM file is re-used while the file is unchanged
+        key = self.getPcmKey(file)
+        cached = self.cache.getPath(key, PCM_EXTENSION)
+        if self.cache.has(key, PCM_EXTENSION):
+            return cached
+
+        part = "{}.{}.part".format(cached, os.getpid())
+        cmd = [
+            self.ffmpeg,
+            "-hide_banner",
+            "-v error",
+            "-y",
+            '-i "%s"' % (file),
+            "-vn",
+            "-ac %s" % (CHANNELS),
+            "-ar %s" % (SAMPLE_RATE),
+            "-f f32le",
+            '"%s"' % (part),
+        ]
+        logger.debug("Decode audio of %s", file)
+        if self.governor is not None:
+            returncode = self.governor.call(cmd)
+        else:
+            returncode = subprocess.call(" ".join(cmd), shell=True)
+
+        if returncode != 0 or not os.path.exists(part):
+            if os.path.exists(part):
+                os.remove(part)
+            raise ValueError("Audio of %s could not be decoded" % (file))
+        os.replace(part, cached)
+        return cached
+
+    def load(self, file):
+        filename = self.decode(file)
+        if os.path.getsize(filename) == 0:
+            return np.zeros((0, CHANNELS), dtype=np.float32)
+        return np.memmap(filename, dtype="<f4", mode="r").reshape(-1, CHANNELS)
+
+    def getTracks(self, videos, background):
+        tracks = []
+        for video in videos:
+            # the trimmed part of the audio of a video slide
+            pcm = self.load(video["file"])
+            start = int(round(video["start"] * SAMPLE_RATE))
+            end = (
+                int(round(video["end"] * SAMPLE_RATE))
+                if video["end"] is not None
+                else len(pcm)
+            )
+            tracks.append(dict(video, pcm=pcm[start:end]))
+        return tracks, [self.load(file) for file in background]
+
+    def getBlocks(self, tracks, background, sections, duration):
+        # amix divides every input by the number of inputs
+        inputs = len(tracks) + len(sections)
+        scale = 1 / inputs if inputs > 0 else 1
+        total = int(round(duration * SAMPLE_RATE))
+
+        for start in range(0, total, BLOCK_SIZE):
+            end = min(total, start + BLOCK_SIZE)
+            times = np.arange(start, end, dtype=np.float64) / SAMPLE_RATE
+            block = np.zeros((end - start, CHANNELS), dtype=np.float32)
+
+            if sections and background:
+                gain = getSectionGain(times, sections)
+                if gain.any():
+                    block += readSamples(background, start, end) * gain[:, None]
+
+            for track in tracks:
+                # the audio of a video slide starts at the offset of the slide
+                offset = int(round(track["offset"] * SAMPLE_RATE))
+                first = max(start, offset)
+                last = min(end, offset + len(track["pcm"]))
+                if first >= last:
+                    continue
+                local = times[first - start : last - start] - track["offset"]
+                gain = getFadeGain(
+                    local, track["fade_in"], track["fade_out_start"], track["fade_out"]
+                )
+                block[first - start : last - start] += (
+                    track["pcm"][first - offset : last - offset] * gain[:, None]
+                )
+
+            yield block * scale
+
+    def mix(self, videos, background, sections, duration, output):
+        # videos: audio of the video slides (file, start, end, offset and fades),
+        # background: files of the background tracks, played one after another,
+        # sections: parts of the timeline with background music (start, end and fades)
+        tracks, background = self.getTracks(videos, background)
+        return writeWave(output, self.getBlocks(tracks, background, sections, duration))
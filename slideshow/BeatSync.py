@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+
+import bisect
+
+from .Slide import getDurationFrames
+from .Slide import getPossibleFrames
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# every slide ends on the first onset after its minimum duration
+GREEDY = "greedy"
+# the onsets with the least deviation from the requested durations of all slides,
+# an approximation which keeps the best timelines of every slide (a beam search)
+BEAM = "beam"
+SYNC_MODES = [GREEDY, BEAM]
+
+# states which are kept per slide and onsets which are tried per state
+BEAM_WIDTH = 32
+CANDIDATES = 4
+
+
+def isBeamAvailable():
+    return np is not None
+
+
+def isSorted(values):
+    return all(a <= b for a, b in zip(values, values[1:]))
+
+
+def getNextOnset(onsets, index, start, minimum, ordered=True):
+    # the first onset from index on which is at least the minimum after the start,
+    # like the original loop `(start >= onset or (onset - start)) < minimum` an onset
+    # before the start ends the search when the minimum is not above one second
+    count = len(onsets)
+    if not ordered:
+        for found in range(index, count):
+            if not ((start >= onsets[found] or (onsets[found] - start)) < minimum):
+                return found
+        return None
+
+    if minimum <= 1 and onsets[index] <= start:
+        return index
+    found = max(index, bisect.bisect_left(onsets, start + minimum))
+    # start + minimum is rounded differently than the difference of an onset
+    while found < count and onsets[found] - start < minimum:
+        found += 1
+    while found > index and onsets[found - 1] - start >= minimum:
+        found -= 1
+    return found if found < count else None
+
+
+class Timeline:
+    # the offsets of the slides like SlideManager.getOffset, from the frames
+    # of the slides, their fades and the frames of their transitions
+    def __init__(self, frames, fades, transitions, fps):
+        self.frames = list(frames)
+        self.fades = list(fades)
+        # transition frames of a slide when it has a fade-out
+        self.transitions = list(transitions)
+        self.fps = fps
+        # SlideManager.isSlideDurationGreaterThanFadeDuration, the first and the
+        # last slide only have one fade
+        self.shortest = [
+            fade * (1 if idx == 0 or idx == len(self.fades) - 1 else 2)
+            for idx, fade in enumerate(self.fades)
+        ]
+
+    def isLong(self, idx, frames):
+        return round(frames / self.fps, 3) >= self.shortest[idx]
+
+    def getFadeOut(self, idx, frames, next_frames):
+        # SlideManager.getSlideFadeOutDuration of a slide and the next one
+        if idx < 0 or idx == len(self.frames) - 1:
+            return 0
+        if not self.isLong(idx + 1, next_frames):
+            return 0
+        if self.isLong(idx, frames):
+            return self.fades[idx] * self.fps
+        return 0
+
+    def getTransitionFrames(self, idx, frames, next_frames):
+        if self.getFadeOut(idx, frames, next_frames) > 0:
+            return self.transitions[idx]
+        return 0
+
+    def getPart(self, idx, frames, next_frames):
+        # the frames until the next slide starts
+        fade_out = self.getFadeOut(idx, frames, next_frames)
+        transition = self.transitions[idx] if fade_out > 0 else 0
+        offset = transition - fade_out if transition >= fade_out else -1 * transition
+        return frames - fade_out + offset
+
+
+def solveGreedy(onsets, timeline, minimums, eligible):
+    # the new frames of every slide, the same result as the original slide by slide
+    # search with getOffset but the offsets are summed up once
+    onsets = onsets.tolist() if hasattr(onsets, "tolist") else list(onsets)
+    ordered = isSorted(onsets)
+    frames = list(timeline.frames)
+    fps = timeline.fps
+
+    total = 0
+    index = 0
+    for i in range(len(frames)):
+        # the part of the previous slide depends on the frames of this slide
+        part = timeline.getPart(i - 1, frames[i - 1], frames[i]) if i > 0 else 0
+        if eligible[i] and index < len(onsets):
+            offset = total + part if i > 0 else total
+            slide_start = round(offset / fps, 5)
+
+            found = getNextOnset(onsets, index, slide_start, minimums[i], ordered)
+            if found is None:
+                # the music is not long enough
+                index = len(onsets) - 1
+            else:
+                index = found
+                duration = onsets[index] - slide_start
+                if duration < round(frames[i] / fps, 3):
+                    next_frames = frames[i + 1] if i + 1 < len(frames) else 0
+                    transition = timeline.getTransitionFrames(i, frames[i], next_frames)
+                    # the middle of the transition matches the onset
+                    frames[i] = getDurationFrames(duration + transition / 2 / fps, fps)
+                    index = index + 1
+                    if i > 0:
+                        part = timeline.getPart(i - 1, frames[i - 1], frames[i])
+
+        if i > 0:
+            total = total + part
+
+    return frames
+
+
+def getDurationFramesArray(durations, fps):
+    # getDurationFrames of an array of durations
+    possible = np.array(getPossibleFrames(fps), dtype=np.int64)
+    total_frames = np.round(durations * fps).astype(np.int64)
+    total_frames_seconds = np.trunc(durations).astype(np.int64) * fps
+    remaining = total_frames - total_frames_seconds
+    position = np.searchsorted(possible, remaining, side="right") - 1
+    return total_frames_seconds + np.where(
+        position >= 0, possible[np.maximum(position, 0)], 0
+    )
+
+
+def solveBeam(
+    onsets, timeline, minimums, eligible, width=BEAM_WIDTH, candidates=CANDIDATES
+):
+    # beam search over the onsets of every slide which minimizes the deviation
+    # of the synced durations from the requested ones, the slides still end
+    # on an onset after their minimum duration and are never extended
+    onsets = np.sort(np.asarray(onsets, dtype=np.float64))
+    requested = np.asarray(timeline.frames, dtype=np.int64)
+    count = len(requested)
+    fps = timeline.fps
+    fades = np.asarray(timeline.fades, dtype=np.float64)
+    transitions = np.asarray(timeline.transitions, dtype=np.float64)
+    multipliers = np.full(count, 2.0)
+    multipliers[0] = multipliers[-1] = 1
+
+    def isLong(idx, frames):
+        return np.round(frames / fps, 3) >= fades[idx] * multipliers[idx]
+
+    def getFadeOut(idx, frames, next_frames):
+        if idx == count - 1:
+            return np.zeros(len(frames))
+        active = isLong(idx + 1, next_frames) & isLong(idx, frames)
+        return np.where(active, fades[idx] * fps, 0)
+
+    def getPart(idx, frames, next_frames):
+        fade_out = getFadeOut(idx, frames, next_frames)
+        transition = np.where(fade_out > 0, transitions[idx], 0)
+        offset = np.where(transition >= fade_out, transition - fade_out, -transition)
+        return frames - fade_out + offset
+
+    # the states: sum of the final parts, frames of the previous slide,
+    # the index after the last used onset and the deviation so far
+    total = np.zeros(1)
+    previous = np.zeros(1, dtype=np.int64)
+    last = np.zeros(1, dtype=np.int64)
+    cost = np.zeros(1)
+    # frames of every slide and the state it was chosen in, for the backtracking
+    history = []
+
+    for i in range(count):
+        current = np.full(len(total), requested[i])
+        offset = total + getPart(i - 1, previous, current) if i > 0 else total
+        start = np.round(offset / fps, 5)
+
+        parent = np.arange(len(total))
+        frames = current
+        used = last
+        if eligible[i] and len(onsets):
+            duration = requested[i] / fps
+            next_frames = np.full(len(total), requested[i + 1] if i + 1 < count else 0)
+            transition = np.where(
+                getFadeOut(i, current, next_frames) > 0, transitions[i], 0
+            )
+            # onsets after the minimum whose duration is shorter than the requested one
+            first = np.maximum(last, np.searchsorted(onsets, start + minimums[i]))
+            end = np.searchsorted(onsets, start + round(duration, 3))
+            target = np.searchsorted(onsets, start + duration - transition / 2 / fps)
+            index = target[:, None] + np.arange(
+                -(candidates // 2), candidates - candidates // 2
+            )
+            valid = (index >= first[:, None]) & (index < end[:, None])
+
+            # states without an onset keep the requested duration
+            keep = ~valid.any(axis=1)
+            rows, columns = np.nonzero(valid)
+            chosen = index[rows, columns]
+            synced = getDurationFramesArray(
+                onsets[chosen] - start[rows] + transition[rows] / 2 / fps, fps
+            )
+            parent = np.concatenate([parent[keep], rows])
+            frames = np.concatenate([current[keep], synced])
+            used = np.concatenate([last[keep], chosen + 1])
+
+        deviation = cost[parent] + np.abs(frames - requested[i]) / fps
+        if i > 0:
+            total = total[parent] + getPart(i - 1, previous[parent], frames)
+        else:
+            total = np.zeros(len(parent))
+
+        # the best state of every timeline, then the best states overall
+        order = np.lexsort((deviation, used, frames, total))
+        unique = np.ones(len(order), dtype=bool)
+        unique[1:] = (np.diff(total[order]) != 0) | (np.diff(frames[order]) != 0)
+        unique[1:] |= np.diff(used[order]) != 0
+        order = order[unique]
+        order = order[np.argsort(deviation[order], kind="stable")[:width]]
+
+        history.append((frames[order], parent[order]))
+        total = total[order]
+        previous = frames[order]
+        last = used[order]
+        cost = deviation[order]
+
+    # follow the best state back to the first slide
+    result = [0] * count
+    state = 0
+    for i in range(count - 1, -1, -1):
+        frames, parent = history[i]
+        result[i] = int(frames[state])
+        state = parent[state]
+    return result
+
+
+def solve(onsets, timeline, minimums, eligible, mode=GREEDY):
+    if mode == BEAM:
+        return solveBeam(onsets, timeline, minimums, eligible)
+    return solveGreedy(onsets, timeline, minimums, eligible)
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+
+logger = logging.getLogger("kburns-slideshow")
+
+
+def getFileIdentity(file):
+    # a file is identified by its location, size and modification time
+    # so that an edited file never matches a cached artifact
+    path = os.path.abspath(str(file))
+    try:
+        stat = os.stat(path)
+        return f"{path}|{stat.st_size}|{stat.st_mtime_ns}"
+    except OSError:
+        return path
+
+
+def getKey(*parts):
+    content = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+class Cache:
+    def __init__(self, folder):
+        self.folder = folder
+
+        if not os.path.exists(self.folder):
+            os.makedirs(self.folder, exist_ok=True)
+            logger.debug("Cache directory %s created", self.folder)
+
+    def getPath(self, key, extension="mp4"):
+        return os.path.join(self.folder, f"{key}.{extension}")
+
+    def has(self, key, extension="mp4"):
+        return os.path.exists(self.getPath(key, extension))
+
+    def put(self, key, file, extension="mp4"):
+        # store a finished artifact under its content key
+        cached = self.getPath(key, extension)
+        if not os.path.exists(cached):
+            self.link(file, cached)
+            logger.debug("Cached %s as %s", file, cached)
+        return cached
+
+    def fetch(self, key, destination, extension="mp4"):
+        # make a cached artifact available under the expected (slot) name
+        if os.path.exists(destination):
+            os.remove(destination)
+        self.link(self.getPath(key, extension), destination)
+        return destination
+
+    def remove(self, key, extension="mp4"):
+        cached = self.getPath(key, extension)
+        if os.path.exists(cached):
+            os.remove(cached)
+            logger.debug("Removed %s from the cache", cached)
+
+    def link(self, source, destination):
+        # hard links are free, fall back to a copy on filesystems without support
+        try:
+            os.link(source, destination)
+        except FileExistsError:
+            # another render stored the same artifact in the meantime
+            pass
+        except OSError:
+            # copy under a private name first, other renders only see complete files
+            temp = "{}.{}.tmp".format(destination, os.getpid())
+            shutil.copyfile(source, temp)
+            os.replace(temp, destination)
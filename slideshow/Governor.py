@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+
+import contextlib
+import logging
+import os
+import shutil
+import subprocess
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+from .Profiler import waitProcess
+from .Progress import getProgressCommand
+from .Progress import runWithProgress
+
+logger = logging.getLogger("kburns-slideshow")
+
+
+def getCpuCount():
+    try:
+        # respect the CPU affinity of the process (e.g. in containers)
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def getTotalMemory():
+    # total physical memory in MB (None if unknown)
+    try:
+        return int(os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024)
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def getAvailableMemory():
+    # currently free physical memory in MB (total memory if unknown)
+    try:
+        return int(os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024)
+    except (AttributeError, ValueError, OSError):
+        return getTotalMemory()
+
+
+def getOpenFileLimit():
+    # soft limit of open files per process (None if unlimited)
+    try:
+        import resource
+
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        return soft if soft != resource.RLIM_INFINITY else None
+    except ImportError:
+        # default stream limit of the C runtime on Windows
+        return 512
+    except (ValueError, OSError):
+        return None
+
+
+class Slot:
+    def __init__(self, index, threads, file=None):
+        self.index = index
+        self.threads = threads
+        self.file = file
+
+
+# Hands out host-wide CPU slots to ffmpeg processes.
+# The slots are lock files in a shared folder, so all renders on one host
+# (in any process) share the same limit.
+class Governor:
+    def __init__(
+        self,
+        folder,
+        max_parallel_jobs=0,
+        memory_per_job=1024,
+        memory_budget=None,
+        nice=0,
+        ionice=False,
+    ):
+        self.folder = folder
+        self.cpu_count = getCpuCount()
+
+        slots = max_parallel_jobs if max_parallel_jobs > 0 else max(1, self.cpu_count // 4)
+
+        # never start more jobs than the memory budget allows
+        if memory_budget is None:
+            total_memory = getTotalMemory()
+            memory_budget = int(total_memory * 0.8) if total_memory else None
+        if memory_budget is not None and memory_per_job > 0:
+            slots = max(1, min(slots, memory_budget // memory_per_job))
+
+        self.memory_budget = memory_budget
+        self.memory_per_job = memory_per_job
+        self.slots = slots
+        self.threads = max(1, self.cpu_count // self.slots)
+        self.nice = nice
+        self.ionice = ionice
+
+        if not os.path.exists(self.folder):
+            os.makedirs(self.folder, exist_ok=True)
+
+        logger.debug(
+            "Governor: %s slots with %s threads each", self.slots, self.threads
+        )
+
+    @classmethod
+    def fromConfig(cls, folder, config):
+        return cls(
+            folder,
+            config["max_parallel_jobs"] if "max_parallel_jobs" in config else 0,
+            config["memory_per_job"] if "memory_per_job" in config else 1024,
+            config["memory_budget"] if "memory_budget" in config else None,
+            config["nice"] if "nice" in config else 0,
+            config["ionice"] if "ionice" in config else False,
+        )
+
+    def tryLock(self, file):
+        try:
+            if fcntl is not None:
+                fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            elif msvcrt is not None:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def unlock(self, file):
+        try:
+            if fcntl is not None:
+                fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            file.close()
+
+    @contextlib.contextmanager
+    def acquire(self):
+        slot = None
+
+        # without file locking there is no limit
+        if fcntl is None and msvcrt is None:
+            slot = Slot(0, self.threads)
+
+        waiting = False
+        while slot is None:
+            for index in range(self.slots):
+                file = open(os.path.join(self.folder, "slot-%s.lock" % (index)), "a+")
+                if self.tryLock(file):
+                    slot = Slot(index, self.threads, file)
+                    break
+                file.close()
+
+            if slot is None:
+                if not waiting:
+                    logger.debug("Waiting for a free ffmpeg slot")
+                    waiting = True
+                time.sleep(0.2)
+
+        logger.debug("Acquired ffmpeg slot %s", slot.index)
+        try:
+            yield slot
+        finally:
+            if slot.file is not None:
+                self.unlock(slot.file)
+            logger.debug("Released ffmpeg slot %s", slot.index)
+
+    def getCommand(self, cmd, slot):
+        # the last element of the command is the output file, a command with
+        # several outputs limits the threads of every output itself
+        threads = ["-threads %s" % (slot.threads)]
+        if any(arg.startswith("-threads ") for arg in cmd):
+            threads = []
+        cmd = (
+            [
+                cmd[0],
+                "-filter_threads %s" % (slot.threads),
+                "-filter_complex_threads %s" % (slot.threads),
+            ]
+            + cmd[1:-1]
+            + threads
+            + [cmd[-1]]
+        )
+
+        if self.ionice and shutil.which("ionice"):
+            cmd = ["ionice", "-c", "3"] + cmd
+        if self.nice and shutil.which("nice"):
+            cmd = ["nice", "-n", "%s" % (self.nice)] + cmd
+
+        return cmd
+
+    def call(self, cmd, progress=None, job=None):
+        with self.acquire() as slot:
+            if progress is not None:
+                return runWithProgress(
+                    self.getCommand(getProgressCommand(cmd), slot), progress, job
+                )
+            p = subprocess.Popen(" ".join(self.getCommand(cmd, slot)), shell=True)
+            return waitProcess(p)
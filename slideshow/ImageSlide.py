@@ -9,6 +9,9 @@ from .Slide import Slide
 
 
 class ImageSlide(Slide):
+    # the image is scaled up before the zoompan filter (a draft is not supersampled)
+    supersample = 4
+
     def __init__(
         self,
         ffmpeg_version,
@@ -260,8 +263,8 @@ class ImageSlide(Slide):
         # workaround a float bug in zoompan filter that causes a jitter/shake
         # https://superuser.com/questions/1112617/ffmpeg-smooth-zoompan-with-no-jiggle/1112680#1112680
         # https://trac.ffmpeg.org/ticket/4298
-        supersample_width = self.output_width * 4
-        supersample_height = self.output_height * 4
+        supersample_width = self.output_width * self.supersample
+        supersample_height = self.output_height * self.supersample
 
         slide_filters.append(
             "scale={}x{},zoompan=z='{}':x='{}':y='{}':fps={}:d={}*{}:s={}x{}".format(
@@ -281,6 +284,113 @@ class ImageSlide(Slide):
         # return the filters for rendering
         return slide_filters
 
+    def getZoom(self, frame):
+        # the zoom of the zoompan filter (see getFilter) on a frame of the slide
+        try:
+            z_step = self.zoom_rate / (self.fps * self.duration)
+        except ZeroDivisionError:
+            z_step = 0
+
+        z_rate = self.zoom_rate
+        z_initial = 1
+        if self.scale == "pan":
+            if self.ratio > self.output_ratio:
+                z_initial = self.ratio / self.output_ratio
+                z_step = z_step * self.ratio / self.output_ratio
+                z_rate = z_rate * self.ratio / self.output_ratio
+            else:
+                z_initial = self.output_ratio / self.ratio
+
+        if self.direction_z == "in":
+            zoom = z_initial + frame * z_step
+        elif self.direction_z == "out":
+            zoom = z_initial + z_rate - frame * z_step
+        else:
+            zoom = z_initial
+
+        # zoompan limits the zoom to 1..10
+        return min(max(zoom, 1), 10)
+
+    def getCropBox(self, frame):
+        # the part (x, y, width, height) of the scaled/padded image which the zoompan
+        # filter shows on a frame of the slide, relative to the size of the image
+        iw = self.output_width * self.supersample
+        ih = self.output_height * self.supersample
+        ow = self.output_width
+        oh = self.output_height
+        zoom = self.getZoom(frame)
+        try:
+            progress = frame / (self.fps * self.duration)
+        except ZeroDivisionError:
+            progress = 0
+
+        x = 0
+        y = 0
+        if self.scale == "pan":
+            if self.ratio > self.output_ratio:
+                if (self.direction_x == "left" and self.direction_z != "out") or (
+                    self.direction_x == "right" and self.direction_z == "out"
+                ):
+                    x = (1 - progress) * (iw - iw / zoom)
+                elif (self.direction_x == "right" and self.direction_z != "out") or (
+                    self.direction_x == "left" and self.direction_z == "out"
+                ):
+                    x = progress * (iw - iw / zoom)
+                else:
+                    x = (iw - ow) / 2
+
+                y_offset = (ih - iw / self.ratio) / 2
+                if self.direction_y == "top":
+                    y = y_offset
+                elif self.direction_y == "center":
+                    y = (
+                        y_offset
+                        + iw / self.ratio / 2
+                        - iw / self.output_ratio / zoom / 2
+                    )
+                elif self.direction_y == "bottom":
+                    y = y_offset + iw / self.ratio - iw / self.output_ratio / zoom
+            else:
+                x_offset = (iw - self.ratio * ih) / 2
+                if self.direction_x == "left":
+                    x = x_offset
+                elif self.direction_x == "center":
+                    x = (
+                        x_offset
+                        + ih * self.ratio / 2
+                        - ih * self.output_ratio / zoom / 2
+                    )
+                elif self.direction_x == "right":
+                    x = x_offset + ih * self.ratio - ih * self.output_ratio / zoom
+
+                if (self.direction_y == "top" and self.direction_z != "out") or (
+                    self.direction_y == "bottom" and self.direction_z == "out"
+                ):
+                    y = (1 - progress) * (ih - ih / zoom)
+                elif (self.direction_y == "bottom" and self.direction_z != "out") or (
+                    self.direction_y == "top" and self.direction_z == "out"
+                ):
+                    y = progress * (ih - ih / zoom)
+                else:
+                    y = (ih - oh) / 2
+        else:
+            if self.direction_x == "center":
+                x = iw / 2 - iw / zoom / 2
+            elif self.direction_x == "right":
+                x = iw - iw / zoom
+
+            if self.direction_y == "center":
+                y = ih / 2 - ih / zoom / 2
+            elif self.direction_y == "bottom":
+                y = ih - ih / zoom
+
+        # zoompan keeps the visible part inside of the image
+        width = iw / zoom
+        height = ih / zoom
+        x = min(max(x, 0), max(iw - width, 0))
+        y = min(max(y, 0), max(ih - height, 0))
+        return x / iw, y / ih, width / iw, height / ih
+
     def getZoomDirectionX(self):
         return self.direction_x
 
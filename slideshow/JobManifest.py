@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+
+import json
+import logging
+import os
+import threading
+
+from .Cache import getKey
+
+logger = logging.getLogger("kburns-slideshow")
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+def getPartName(file):
+    # keep the extension, ffmpeg detects the output format by it
+    root, extension = os.path.splitext(file)
+    return f"{root}.part{extension}"
+
+
+def getJobManifestFilename(tempFileFolder, tempFilePrefix, output_file):
+    return os.path.join(
+        tempFileFolder,
+        "{}job-{}.json".format(
+            tempFilePrefix, getKey(os.path.abspath(output_file))[:12]
+        ),
+    )
+
+
+class JobManifest:
+    def __init__(self, filename):
+        self.filename = filename
+        self.content = {"output": None, "project": None, "jobs": {}}
+        # temporary videos may be rendered in parallel
+        self.lock = threading.RLock()
+
+    def load(self):
+        if not os.path.exists(self.filename):
+            return False
+        try:
+            with open(self.filename) as file:
+                self.content = json.load(file)
+        except ValueError:
+            logger.warning("Job manifest %s is not readable", self.filename)
+            return False
+        return True
+
+    def save(self):
+        # write atomically so that a crash never leaves a half written manifest
+        with self.lock:
+            part = getPartName(self.filename)
+            with open(part, "w") as file:
+                json.dump(self.content, file, indent=4)
+            os.replace(part, self.filename)
+
+    def remove(self):
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
+
+    def setOutput(self, output_file):
+        self.content["output"] = os.path.abspath(output_file)
+
+    def setProject(self, project):
+        self.content["project"] = project
+
+    def getProject(self):
+        return self.content["project"]
+
+    def addJob(self, name, key=None, frames=None):
+        name = str(name)
+        previous = self.content["jobs"].get(name)
+        # a resumed job keeps its state when nothing changed
+        state = (
+            previous["state"]
+            if previous is not None and previous["key"] == key
+            else PENDING
+        )
+        self.content["jobs"][name] = {"state": state, "key": key, "frames": frames}
+
+    def getState(self, name):
+        job = self.content["jobs"].get(str(name))
+        return job["state"] if job is not None else None
+
+    def setState(self, name, state):
+        name = str(name)
+        with self.lock:
+            if name not in self.content["jobs"]:
+                self.addJob(name)
+            self.content["jobs"][name]["state"] = state
+            self.save()
+
+    def getJobs(self):
+        return self.content["jobs"]
+
+    def isFinished(self):
+        return len(self.content["jobs"]) > 0 and all(
+            job["state"] == DONE for job in self.content["jobs"].values()
+        )
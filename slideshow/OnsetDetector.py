@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+
+import logging
+import subprocess
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger("kburns-slideshow")
+
+# mono PCM which is read from ffmpeg
+SAMPLE_RATE = 44100
+# samples of one block read from the pipe
+BLOCK_SIZE = 1 << 16
+
+
+def isDetectorAvailable():
+    return np is not None
+
+
+class OnsetDetector:
+    # spectral flux onsets, the PCM is streamed through a fixed size buffer
+    # so the memory does not depend on the length of the track
+    def __init__(
+        self,
+        ffmpeg="ffmpeg",
+        window=1024,
+        hop=512,
+        threshold=0.1,
+        multiplier=1.5,
+        average=8,
+        minimum_interval=0.05,
+        silence=-70,
+    ):
+        self.ffmpeg = ffmpeg
+        self.window = window
+        self.hop = hop
+        # a peak of the flux is an onset above the median of the previous frames
+        # (times the multiplier) plus the threshold
+        self.threshold = threshold
+        self.multiplier = multiplier
+        self.average = average
+        # seconds between two onsets
+        self.minimum_interval = minimum_interval
+        # frames below this level (dB) have no onsets
+        self.silence = silence
+        self.hann = np.hanning(window).astype(np.float32)
+        self.reset()
+
+    def getParameters(self):
+        # the parameters of the onsets (for the onset index)
+        return [
+            "spectral-flux",
+            SAMPLE_RATE,
+            self.window,
+            self.hop,
+            self.threshold,
+            self.multiplier,
+            self.average,
+            self.minimum_interval,
+            self.silence,
+        ]
+
+    def reset(self):
+        # samples which are not a complete hop yet
+        self.samples = np.zeros(0, dtype=np.float32)
+        self.spectrum = None
+        # flux and level of the last frames (the previous average and the pending peak)
+        self.flux = np.zeros(0, dtype=np.float32)
+        self.level = np.zeros(0, dtype=np.float32)
+        self.frames = 0
+        self.last_onset = None
+
+    def getFrames(self, samples):
+        # all complete frames of the samples and the samples of the next frame
+        count = (len(samples) - self.window) // self.hop + 1
+        if count <= 0:
+            return np.zeros((0, self.window), dtype=np.float32), samples
+        frames = np.lib.stride_tricks.sliding_window_view(samples, self.window)[
+            :: self.hop
+        ][:count]
+        return frames, samples[count * self.hop :]
+
+    def getFlux(self, frames):
+        # positive change of the log-magnitude spectrum, averaged over the bins
+        spectrum = np.log1p(100 * np.abs(np.fft.rfft(frames * self.hann, axis=1)))
+        previous = self.spectrum if self.spectrum is not None else spectrum[:1]
+        flux = np.maximum(0, np.diff(spectrum, axis=0, prepend=previous)).mean(axis=1)
+        self.spectrum = spectrum[-1:]
+
+        rms = np.sqrt(np.mean(np.square(frames), axis=1))
+        level = 20 * np.log10(np.maximum(rms, 1e-10))
+        return flux.astype(np.float32), level.astype(np.float32)
+
+    def pickPeaks(self, flux, level):
+        # flux values before the new ones (the last one is pending, it needs a successor)
+        history = len(self.flux)
+        first = self.frames - history
+        flux = np.concatenate([self.flux, flux])
+        level = np.concatenate([self.level, level])
+
+        onsets = []
+        if len(flux) >= 3:
+            current = flux[1:-1]
+            peaks = (current > flux[:-2]) & (current >= flux[2:])
+
+            # median of the previous frames of every frame, the first frames of
+            # the track only have fewer of them
+            padded = np.concatenate([np.full(self.average, np.nan), flux])
+            previous = np.lib.stride_tricks.sliding_window_view(padded, self.average)
+            median = np.nanmedian(previous[1 : len(flux) - 1], axis=1)
+            index = np.arange(1, len(flux) - 1)
+            peaks &= current > median * self.multiplier + self.threshold
+            peaks &= level[1:-1] > self.silence
+            # the peaks of the previous call were already checked
+            peaks &= index >= max(1, history - 1)
+
+            for i in index[peaks]:
+                time = (first + i) * self.hop / SAMPLE_RATE
+                if (
+                    self.last_onset is None
+                    or time - self.last_onset >= self.minimum_interval
+                ):
+                    onsets.append(round(time, 6))
+                    self.last_onset = time
+
+        self.flux = flux[-(self.average + 2) :]
+        self.level = level[-(self.average + 2) :]
+        return onsets
+
+    def feed(self, samples):
+        # onsets (seconds) of the next mono samples of the track
+        samples = np.concatenate([self.samples, np.asarray(samples, dtype=np.float32)])
+        # the frames overlap, the next one starts after the last hop
+        frames, self.samples = self.getFrames(samples)
+        if len(frames) == 0:
+            return []
+
+        flux, level = self.getFlux(frames)
+        onsets = self.pickPeaks(flux, level)
+        self.frames += len(frames)
+        return onsets
+
+    def finish(self):
+        # the last frame has no successor, it is a peak if it is higher than the previous one
+        onsets = self.pickPeaks(np.zeros(1, dtype=np.float32), np.zeros(1) - 1000)
+        self.reset()
+        return onsets
+
+    def detect(self, file):
+        # stream the decoded track from ffmpeg
+        cmd = [
+            self.ffmpeg,
+            "-v",
+            "error",
+            "-i",
+            str(file),
+            "-vn",
+            "-ac",
+            "1",
+            "-ar",
+            str(SAMPLE_RATE),
+            "-f",
+            "f32le",
+            "pipe:1",
+        ]
+        self.reset()
+        onsets = []
+        p = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        remainder = b""
+        while True:
+            data = p.stdout.read(BLOCK_SIZE * 4)
+            if not data:
+                break
+            data = remainder + data
+            # a read may end within a sample
+            usable = len(data) - len(data) % 4
+            remainder = data[usable:]
+            onsets.extend(self.feed(np.frombuffer(data[:usable], dtype="<f4")))
+        p.stdout.close()
+        if p.wait() != 0:
+            raise ValueError("Audio of %s could not be decoded" % (file))
+        onsets.extend(self.finish())
+        logger.debug("%s onsets in %s", len(onsets), file)
+        return onsets
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+import concurrent.futures
+import copy
+import json
+import logging
+import os
+import threading
+
+from .AudioFile import ONSET_PARAMETERS
+from .Cache import getFileIdentity
+from .Cache import getKey
+from .JobManifest import getPartName
+
+logger = logging.getLogger("kburns-slideshow")
+
+ONSET_INDEX_FILENAME = "onsets.json"
+
+
+class OnsetIndex:
+    def __init__(self, filename):
+        self.filename = filename
+        # onsets (seconds from the start of the track) by file and detector parameters
+        self.onsets = {}
+        self.lock = threading.RLock()
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.filename):
+            return False
+        try:
+            with open(self.filename) as file:
+                content = json.load(file)
+        except ValueError:
+            logger.warning("Onset index %s is not readable", self.filename)
+            return False
+        with self.lock:
+            # keep the onsets of this process, other renders may have added some
+            content.update(self.onsets)
+            self.onsets = content
+        return True
+
+    def save(self):
+        with self.lock:
+            self.load()
+            folder = os.path.dirname(self.filename)
+            if folder and not os.path.exists(folder):
+                os.makedirs(folder, exist_ok=True)
+            part = getPartName(self.filename)
+            with open(part, "w") as file:
+                json.dump(self.onsets, file)
+            os.replace(part, self.filename)
+
+    def getKey(self, file, aubio, detector=None):
+        # an edited file or other parameters never match
+        if detector is not None:
+            return getKey(getFileIdentity(file), detector.getParameters())
+        return getKey(getFileIdentity(file), aubio, ONSET_PARAMETERS)
+
+    def get(self, track, aubio, detector=None):
+        with self.lock:
+            return self.onsets.get(self.getKey(track.file, aubio, detector))
+
+    def put(self, track, aubio, onsets, detector=None):
+        with self.lock:
+            self.onsets[self.getKey(track.file, aubio, detector)] = onsets
+
+    def analyze(self, tracks, aubio, workers=1, profiler=None, detector=None):
+        # onsets of every track, the missing ones are detected concurrently,
+        # with aubio or the built-in detector
+        missing = {}
+        for track in tracks:
+            if self.get(track, aubio, detector) is None:
+                # the same file is only analyzed once
+                missing[self.getKey(track.file, aubio, detector)] = track
+        missing = list(missing.values())
+
+        def detect(track):
+            # the streaming state of the built-in detector belongs to one track
+            track_detector = copy.copy(detector) if detector is not None else None
+            if profiler is not None:
+                with profiler.stage(os.path.basename(track.file), "onsets"):
+                    onsets = track.getTimestamps(aubio, track_detector)
+            else:
+                onsets = track.getTimestamps(aubio, track_detector)
+            self.put(track, aubio, [float(onset) for onset in onsets], detector)
+
+        if missing:
+            logger.debug("Detect onsets of %s tracks", len(missing))
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=max(1, min(workers, len(missing)))
+            ) as executor:
+                # re-raises a failed detection
+                list(executor.map(detect, missing))
+            self.save()
+
+        return [self.get(track, aubio, detector) for track in tracks]
@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+
+import json
+import logging
+import os
+
+logger = logging.getLogger("kburns-slideshow")
+
+AUTO = "auto"
+# single, or temp with generate_temp, like before the planner
+FIXED = "fixed"
+# all slides in one ffmpeg filter graph
+SINGLE = "single"
+# one temporary video per zoom/pan and segment, rendered one after another
+TEMP = "temp"
+# the temporary videos rendered in parallel, limited by the governor
+CHUNKED = "chunked"
+
+STRATEGIES = [SINGLE, TEMP, CHUNKED]
+
+# the benchmark suite writes the coefficients of this host to this file
+CALIBRATION_FILENAME = "calibration.json"
+
+# never concat more temporary videos in one step
+MAX_FAN_IN = 64
+# temporary videos concatenated in one step by the fixed strategy
+FIXED_FAN_IN = 10
+
+
+class CostModel:
+    # seconds per frame and megapixel (of the output resolution),
+    # memory in MB per megapixel, measured on a 4 core laptop
+    DEFAULTS = {
+        # zoompan on the supersampled image
+        "zoompan": 0.03,
+        # libx264 ultrafast encoding
+        "encode": 0.004,
+        # decoding a temporary video
+        "decode": 0.001,
+        # blending two slides in a transition
+        "transition": 0.01,
+        # start of an ffmpeg process (seconds)
+        "process": 0.3,
+        # opening one input of a filter graph (seconds)
+        "input": 0.05,
+        # one input of the single filter graph (supersampled frames and fifos)
+        "single_memory": 80,
+        # one decoder of a concat step
+        "concat_memory": 30,
+        # memory of ffmpeg itself (MB)
+        "base_memory": 150,
+        # filter graphs are mostly processed by a single thread
+        "filter_parallelism": 1.0,
+        # open files of one input (file and filter script)
+        "files_per_input": 2,
+        # size of the temporary videos (bytes per frame and megapixel)
+        "temp_size": 16000,
+    }
+
+    def __init__(self, coefficients=None):
+        self.coefficients = dict(self.DEFAULTS)
+        if coefficients is not None:
+            self.coefficients.update(coefficients)
+        self.calibrated = False
+
+    @classmethod
+    def load(cls, filename):
+        model = cls()
+        if filename is None or not os.path.exists(filename):
+            return model
+        try:
+            with open(filename) as file:
+                content = json.load(file)
+            coefficients = (
+                content["coefficients"] if "coefficients" in content else content
+            )
+            model.coefficients.update(
+                {
+                    key: value
+                    for key, value in coefficients.items()
+                    if key in cls.DEFAULTS
+                }
+            )
+            model.calibrated = True
+        except (ValueError, TypeError, KeyError, AttributeError):
+            logger.warning("Calibration file %s is not readable", filename)
+        return model
+
+    def save(self, filename):
+        with open(filename, "w") as file:
+            json.dump({"coefficients": self.coefficients}, file, indent=4)
+
+    def get(self, key):
+        return self.coefficients[key]
+
+
+class Plan:
+    def __init__(self, strategy, reduce_variable, workers, estimates, reasons):
+        self.strategy = strategy
+        # number of temporary videos concatenated in one step
+        self.reduce_variable = reduce_variable
+        # parallel ffmpeg processes of the temporary videos
+        self.workers = workers
+        # estimated costs of all strategies
+        self.estimates = estimates
+        self.reasons = reasons
+
+    def useTempFiles(self):
+        return self.strategy != SINGLE
+
+    def explain(self):
+        lines = [
+            "Render strategy: %s (fan-in %s, %s worker%s)"
+            % (
+                self.strategy,
+                self.reduce_variable,
+                self.workers,
+                "s" if self.workers != 1 else "",
+            )
+        ]
+        lines.extend(self.reasons)
+        for strategy in STRATEGIES:
+            estimate = self.estimates[strategy]
+            lines.append(
+                "  %s: %.0fs wall, %.0fs CPU, %s MB, %s MB disk, %s files, %s ffmpeg runs%s"
+                % (
+                    strategy,
+                    estimate["wall"],
+                    estimate["cpu"],
+                    estimate["memory"],
+                    estimate["disk"],
+                    estimate["files"],
+                    estimate["processes"],
+                    "" if estimate["feasible"] else " (not feasible)",
+                )
+            )
+        return lines
+
+
+class Planner:
+    def __init__(
+        self,
+        model=None,
+        cpu_count=1,
+        memory=None,
+        open_files=None,
+        slots=1,
+        threads=None,
+    ):
+        self.model = model if model is not None else CostModel()
+        self.cpu_count = max(1, cpu_count)
+        # available memory in MB (None if unknown)
+        self.memory = memory
+        # open file limit (None if unlimited)
+        self.open_files = open_files
+        # CPU slots of the governor and threads of one slot
+        self.slots = max(1, slots)
+        self.threads = threads if threads is not None else self.cpu_count
+
+    def getFanIn(self, megapixels):
+        # a higher fan-in means less concat steps, each one re-encodes all frames,
+        # but every input of a step is decoded at the same time
+        fan_in = MAX_FAN_IN
+        if self.open_files is not None:
+            fan_in = min(
+                fan_in, int(self.open_files * 0.8 / self.model.get("files_per_input"))
+            )
+        if self.memory is not None:
+            memory = self.memory / self.slots - self.model.get("base_memory")
+            fan_in = min(
+                fan_in, int(memory / (self.model.get("concat_memory") * megapixels))
+            )
+        return max(2, fan_in)
+
+    def getConcatSteps(self, segments, fan_in):
+        # replicates the reduction of SlideManager.getVideoFilterChains
+        levels = []
+        while segments > fan_in:
+            steps = segments // fan_in
+            levels.append(steps)
+            segments = steps + segments % fan_in
+        return levels, segments
+
+    def estimateSingle(
+        self, slides, frames, image_frames, megapixels, inputs, transition_frames=0
+    ):
+        # the transitions are blended in the same filter graph
+        zoompan = (
+            image_frames * megapixels * self.model.get("zoompan")
+            + transition_frames * megapixels * self.model.get("transition")
+        )
+        encode = frames * megapixels * self.model.get("encode")
+        cpu = zoompan + encode + inputs * self.model.get("input")
+        wall = (
+            zoompan / min(self.model.get("filter_parallelism"), self.cpu_count)
+            + encode / self.cpu_count
+            + inputs * self.model.get("input")
+            + self.model.get("process")
+        )
+        return {
+            "wall": wall,
+            "cpu": cpu,
+            "memory": int(
+                self.model.get("base_memory")
+                + inputs * self.model.get("single_memory") * megapixels
+            ),
+            "files": int(inputs * self.model.get("files_per_input")),
+            "processes": 1,
+            "disk": 0,
+        }
+
+    def estimateTemp(
+        self,
+        slides,
+        frames,
+        image_frames,
+        megapixels,
+        inputs,
+        fan_in,
+        workers,
+        transition_frames=0,
+    ):
+        # every slide is split into up to three segments (start, main, end)
+        segments = slides * 3
+        levels, final_inputs = self.getConcatSteps(segments, fan_in)
+        threads = self.threads if workers > 1 else self.cpu_count
+
+        zoompan = (
+            image_frames * megapixels * self.model.get("zoompan")
+            + transition_frames * megapixels * self.model.get("transition")
+        )
+        # zoompan videos, segments and every concat level are encoded and decoded again
+        passes = 2 + len(levels)
+        encode = frames * megapixels * self.model.get("encode") * passes
+        decode = frames * megapixels * self.model.get("decode") * passes
+        processes = slides + segments + sum(levels)
+
+        # the temporary videos are parallelized, the final video is not
+        parallel = (
+            zoompan / min(self.model.get("filter_parallelism"), threads)
+            + (encode + decode) / threads
+            + processes * self.model.get("process")
+        ) / workers
+        final = (
+            frames * megapixels * (self.model.get("encode") + self.model.get("decode"))
+        ) / self.cpu_count + final_inputs * self.model.get("input")
+
+        return {
+            "wall": parallel + final + self.model.get("process"),
+            "cpu": zoompan
+            + encode
+            + decode
+            + frames * megapixels * self.model.get("encode"),
+            "memory": int(
+                workers
+                * (
+                    self.model.get("base_memory")
+                    + max(
+                        self.model.get("single_memory"),
+                        fan_in * self.model.get("concat_memory"),
+                    )
+                    * megapixels
+                )
+            ),
+            "files": int(
+                (max(fan_in, final_inputs + inputs - slides) + 1)
+                * self.model.get("files_per_input")
+            ),
+            "processes": processes + 1,
+            # all temporary videos are kept until the final video is finished
+            "disk": int(
+                (image_frames + frames * (passes - 1) + transition_frames)
+                * megapixels
+                * self.model.get("temp_size")
+                / 1000000
+            ),
+        }
+
+    def isFeasible(self, estimate):
+        reasons = []
+        if self.open_files is not None and estimate["files"] > self.open_files * 0.8:
+            reasons.append("open file limit of %s" % (self.open_files))
+        if self.memory is not None and estimate["memory"] > self.memory:
+            reasons.append("available memory of %s MB" % (self.memory))
+        return reasons
+
+    def plan(
+        self,
+        slides,
+        frames,
+        image_frames,
+        width,
+        height,
+        inputs,
+        strategy=AUTO,
+        temp=False,
+        transition_frames=0,
+    ):
+        megapixels = width * height / 1000000
+        fan_in = self.getFanIn(megapixels)
+        workers = self.slots
+
+        estimates = {
+            SINGLE: self.estimateSingle(
+                slides, frames, image_frames, megapixels, inputs, transition_frames
+            ),
+            TEMP: self.estimateTemp(
+                slides,
+                frames,
+                image_frames,
+                megapixels,
+                inputs,
+                fan_in,
+                1,
+                transition_frames,
+            ),
+            CHUNKED: self.estimateTemp(
+                slides,
+                frames,
+                image_frames,
+                megapixels,
+                inputs,
+                fan_in,
+                workers,
+                transition_frames,
+            ),
+        }
+
+        reasons = [
+            "  %s slides, %s frames at %sx%s, %s inputs, %s cores, %s MB available, "
+            "open file limit %s, %s cost model"
+            % (
+                slides,
+                frames,
+                width,
+                height,
+                inputs,
+                self.cpu_count,
+                self.memory if self.memory is not None else "unknown",
+                self.open_files if self.open_files is not None else "unlimited",
+                "calibrated" if self.model.calibrated else "default",
+            )
+        ]
+        for name, estimate in estimates.items():
+            limits = self.isFeasible(estimate)
+            estimate["feasible"] = len(limits) == 0
+            if limits:
+                reasons.append("  %s exceeds the %s" % (name, " and ".join(limits)))
+
+        if strategy == FIXED:
+            strategy = TEMP if temp else SINGLE
+            fan_in = FIXED_FAN_IN
+            reasons.append(
+                "  %s is fixed by generate_temp (render_strategy: %s)"
+                % (strategy, FIXED)
+            )
+        elif strategy in STRATEGIES:
+            reasons.append("  %s is set in the configuration" % (strategy))
+            if not estimates[strategy]["feasible"]:
+                logger.warning(
+                    "The configured render strategy %s will probably fail", strategy
+                )
+        else:
+            # with generate_temp the temporary videos are kept in any case
+            candidates = [TEMP, CHUNKED] if temp else STRATEGIES
+            if workers <= 1:
+                # without parallel slots chunked is the same as temp
+                candidates = [c for c in candidates if c != CHUNKED]
+            feasible = [c for c in candidates if estimates[c]["feasible"]]
+            if not feasible:
+                # the temporary videos need the least resources at once
+                feasible = [TEMP]
+                reasons.append("  no strategy fits, falling back to temp")
+            strategy = min(feasible, key=lambda c: estimates[c]["wall"])
+            reasons.append(
+                "  %s has the lowest estimated wall time (%.0fs)"
+                % (strategy, estimates[strategy]["wall"])
+            )
+
+        return Plan(
+            strategy,
+            fan_in,
+            workers if strategy == CHUNKED else 1,
+            estimates,
+            reasons,
+        )
+
+    def getBreakdown(self, slides, width, height, strategy):
+        # CPU seconds of every slide and its transition (to the next slide),
+        # slides: dicts with frames, image and transition_frames
+        megapixels = width * height / 1000000
+        # the temporary videos encode the frames twice (zoom/pan and segments)
+        passes = 1 if strategy == SINGLE else 2
+        breakdown = []
+        for slide in slides:
+            frames = slide["frames"] * megapixels
+            render = frames * self.model.get(
+                "zoompan" if slide["image"] else "decode"
+            ) + frames * self.model.get("encode") * passes
+            transition = (
+                slide["transition_frames"] * megapixels * self.model.get("transition")
+            )
+            row = dict(slide)
+            row.update({"cpu": render, "transition_cpu": transition})
+            breakdown.append(row)
+        return breakdown
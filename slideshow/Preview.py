@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+import bisect
+import collections
+import concurrent.futures
+import logging
+import threading
+
+from PIL import Image
+
+from .Cache import getFileIdentity
+from .ImageSlide import ImageSlide
+
+logger = logging.getLogger("kburns-slideshow")
+
+# the proxies are larger than the preview, so zooming in stays sharp
+PROXY_SCALE = 2
+# proxies which are kept in memory
+PROXY_CACHE_SIZE = 32
+
+
+class Preview:
+    # renders single frames of the slideshow without FFmpeg: the zoom/pan of the image
+    # slides (ImageSlide.getCropBox) is applied to low resolution proxies of the slides
+    # and the transitions are blended, on the same timeline as the rendered video.
+    # transition effects other than the fade, the overlays and the audio are not shown
+    def __init__(self, sm, width=480, getSource=None):
+        self.sm = sm
+        self.fps = sm.config["fps"]
+        output_ratio = sm.config["output_width"] / sm.config["output_height"]
+        self.size = (width, int(width / output_ratio))
+        self.proxy_size = (self.size[0] * PROXY_SCALE, self.size[1] * PROXY_SCALE)
+        # the image which shows a slide, e.g. the frame of a video (None is black)
+        self.getSource = getSource or self.getSlideSource
+
+        self.proxies = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        # the slide which was prepared last
+        self.prefetched = None
+
+        self.refresh()
+
+    def getSlideSource(self, slide):
+        return slide.file if isinstance(slide, ImageSlide) else None
+
+    def refresh(self):
+        # the parts of the video like they are concatenated by getVideoFilterChains:
+        # (frames, slide, first frame of the slide, next slide of a transition)
+        self.segments = []
+        self.starts = []
+        frames = 0
+        for i, slide in enumerate(self.sm.getSlides()):
+            fade_in_end = int(self.sm.getSlideFadeOutDuration(i - 1)) if i > 0 else 0
+            fade_out_start = int(self.sm.getSlideFadeOutPosition(i))
+
+            if fade_in_end > 0:
+                previous = self.sm.getSlides()[i - 1]
+                filter, _ = self.sm.getTransition(i - 1)
+                if filter is not None:
+                    # the end of the previous slide blended with the start of this slide
+                    segments = [
+                        (fade_in_end, i - 1, previous.getFrames() - fade_in_end, i)
+                    ]
+                else:
+                    segments = [
+                        (fade_in_end, i - 1, previous.getFrames() - fade_in_end, None),
+                        (fade_in_end, i, 0, None),
+                    ]
+            else:
+                segments = []
+
+            if fade_out_start > fade_in_end:
+                segments.append((fade_out_start - fade_in_end, i, fade_in_end, None))
+
+            for segment in segments:
+                self.starts.append(frames)
+                self.segments.append(segment)
+                frames = frames + segment[0]
+
+        self.frames = frames
+
+    def getFrameCount(self):
+        return self.frames
+
+    def getFrame(self, t):
+        # the frame which is shown at t seconds
+        return min(max(int(t * self.fps + 1e-6), 0), max(self.frames - 1, 0))
+
+    def renderFrameAt(self, t):
+        return self.renderFrame(self.getFrame(t))
+
+    def renderFrame(self, frame):
+        if not self.segments:
+            return Image.new("RGB", self.size)
+
+        index = bisect.bisect_right(self.starts, frame) - 1
+        frames, slide, first, next_slide = self.segments[index]
+        offset = frame - self.starts[index]
+
+        image = self.renderSlideFrame(slide, first + offset)
+        if next_slide is not None:
+            # the fade transition, see transitions/fade.py
+            image = Image.blend(
+                image, self.renderSlideFrame(next_slide, offset), offset / frames
+            )
+
+        # the following slide is prepared while this one is shown
+        self.prefetch((next_slide if next_slide is not None else slide) + 1)
+        return image
+
+    def renderSlideFrame(self, idx, frame):
+        slide = self.sm.getSlides()[idx]
+        proxy = self.getProxy(slide)
+        if proxy is None:
+            return Image.new("RGB", self.size)
+
+        if isinstance(slide, ImageSlide):
+            x, y, width, height = slide.getCropBox(frame)
+            box = (
+                x * proxy.width,
+                y * proxy.height,
+                (x + width) * proxy.width,
+                (y + height) * proxy.height,
+            )
+            return proxy.resize(self.size, Image.BILINEAR, box=box)
+        return proxy.resize(self.size, Image.BILINEAR)
+
+    def getProxy(self, slide):
+        source = self.getSource(slide)
+        if source is None:
+            return None
+
+        # videos are scaled into the output like padded images
+        scale = slide.scale if isinstance(slide, ImageSlide) else "pad"
+        key = (getFileIdentity(source), scale)
+        with self.lock:
+            if key in self.proxies:
+                self.proxies.move_to_end(key)
+                return self.proxies[key]
+
+        proxy = self.createProxy(source, scale)
+        with self.lock:
+            self.proxies[key] = proxy
+            if len(self.proxies) > PROXY_CACHE_SIZE:
+                self.proxies.popitem(last=False)
+        return proxy
+
+    def createProxy(self, source, scale):
+        # the image like it is passed to the zoompan filter, in the size of the proxy
+        width, height = self.proxy_size
+        output_ratio = width / height
+        with Image.open(source) as image:
+            # JPEGs are decoded at the smallest scale which is larger than the proxy
+            image.draft("RGB", self.proxy_size)
+            image = image.convert("RGB")
+        ratio = image.width / image.height
+
+        if scale == "crop_center":
+            if ratio < output_ratio:
+                crop = image.width / output_ratio
+                box = (
+                    0,
+                    (image.height - crop) / 2,
+                    image.width,
+                    (image.height + crop) / 2,
+                )
+            else:
+                crop = image.height * output_ratio
+                box = (
+                    (image.width - crop) / 2,
+                    0,
+                    (image.width + crop) / 2,
+                    image.height,
+                )
+            return image.resize(self.proxy_size, Image.BILINEAR, box=box)
+
+        # pad and pan show the whole image in the middle of a black frame
+        size = (
+            (width, max(1, round(width / ratio)))
+            if ratio > output_ratio
+            else (max(1, round(height * ratio)), height)
+        )
+        proxy = Image.new("RGB", self.proxy_size)
+        proxy.paste(
+            image.resize(size, Image.BILINEAR),
+            ((width - size[0]) // 2, (height - size[1]) // 2),
+        )
+        return proxy
+
+    def prefetch(self, idx):
+        slides = self.sm.getSlides()
+        if idx >= len(slides) or idx == self.prefetched:
+            return
+        self.prefetched = idx
+
+        def load(slide):
+            try:
+                self.getProxy(slide)
+            except Exception as e:
+                logger.debug("Proxy of %s could not be created: %s", slide.file, e)
+
+        self.executor.submit(load, slides[idx])
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+
+import contextlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+logger = logging.getLogger("kburns-slideshow")
+
+# stages of the python side, the rest are ffmpeg processes
+SETUP_CATEGORIES = ["probe", "open", "onsets"]
+
+_local = threading.local()
+
+
+def getMaxRss(usage):
+    # ru_maxrss is in kilobytes, on macOS in bytes
+    if sys.platform == "darwin":
+        return usage.ru_maxrss / 1024 / 1024
+    return usage.ru_maxrss / 1024
+
+
+def waitProcess(p):
+    # wait for a process and collect its resource usage (and of its children)
+    # for the open stages of the current thread
+    if hasattr(os, "wait4"):
+        try:
+            pid, status, usage = os.wait4(p.pid, 0)
+            if os.WIFSIGNALED(status):
+                p.returncode = -os.WTERMSIG(status)
+            else:
+                p.returncode = os.WEXITSTATUS(status)
+            for record in getattr(_local, "stack", []):
+                record["children_cpu"] += usage.ru_utime + usage.ru_stime
+                record["peak_rss_mb"] = max(record["peak_rss_mb"], getMaxRss(usage))
+            return p.returncode
+        except ChildProcessError:
+            pass
+    return p.wait()
+
+
+def getItemCategory(item):
+    suffix = str(item["suffix"])
+    if suffix.endswith("_combine"):
+        return "combine"
+    if "_trans_" in suffix:
+        return "transition"
+    return "slide"
+
+
+class Profiler:
+    def __init__(self):
+        self.stages = []
+        self.lock = threading.Lock()
+        self.started = time.time()
+
+    @contextlib.contextmanager
+    def stage(self, name, category="stage", **args):
+        record = {
+            "name": str(name),
+            "category": category,
+            "start": time.time() - self.started,
+            "wall": 0,
+            "cpu": 0,
+            "children_cpu": 0,
+            "peak_rss_mb": 0,
+            "thread": threading.current_thread().name,
+            "args": args,
+        }
+        if not hasattr(_local, "stack"):
+            _local.stack = []
+        _local.stack.append(record)
+
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        try:
+            yield record
+        finally:
+            record["wall"] = time.perf_counter() - wall
+            record["cpu"] = time.thread_time() - cpu
+            _local.stack.remove(record)
+            # python stages only know the peak of the whole process
+            if record["peak_rss_mb"] == 0 and resource is not None:
+                record["peak_rss_mb"] = getMaxRss(
+                    resource.getrusage(resource.RUSAGE_SELF)
+                )
+            with self.lock:
+                self.stages.append(record)
+
+    def clear(self, keep=SETUP_CATEGORIES):
+        # a new render keeps the stages of loading the slideshow
+        with self.lock:
+            self.stages = [s for s in self.stages if s["category"] in keep]
+
+    def getStages(self, category=None):
+        return [s for s in self.stages if category is None or s["category"] == category]
+
+    def getTotals(self):
+        totals = {}
+        for record in self.stages:
+            total = totals.setdefault(
+                record["category"],
+                {"count": 0, "wall": 0, "cpu": 0, "children_cpu": 0, "peak_rss_mb": 0},
+            )
+            total["count"] += 1
+            total["wall"] += record["wall"]
+            total["cpu"] += record["cpu"]
+            total["children_cpu"] += record["children_cpu"]
+            total["peak_rss_mb"] = max(total["peak_rss_mb"], record["peak_rss_mb"])
+        return totals
+
+    def getWorst(self, category, key="slide", limit=5, labels=None):
+        # cost of the slides (zoom/pan and segments) or transitions, slowest first
+        labels = labels if labels is not None else {}
+        costs = {}
+        for record in self.getStages(category):
+            if key not in record["args"]:
+                continue
+            cost = costs.setdefault(
+                record["args"][key],
+                {
+                    key: record["args"][key],
+                    "label": labels.get(record["args"][key], "?"),
+                    "wall": 0,
+                    "children_cpu": 0,
+                    "args": {},
+                },
+            )
+            cost["wall"] += record["wall"]
+            cost["children_cpu"] += record["children_cpu"]
+            cost["args"].update(record["args"])
+        return sorted(costs.values(), key=lambda c: c["wall"], reverse=True)[:limit]
+
+    def getReport(self, labels=None):
+        # labels: names of the slides by index
+        return {
+            "wall": max([s["start"] + s["wall"] for s in self.stages], default=0)
+            - min([s["start"] for s in self.stages], default=0),
+            "totals": self.getTotals(),
+            "worst_slides": self.getWorst("slide", labels=labels),
+            "worst_transitions": self.getWorst("transition", labels=labels),
+            "stages": self.stages,
+        }
+
+    def getSummary(self, title="Render profile", labels=None):
+        report = self.getReport(labels)
+        lines = [
+            title,
+            "",
+            "%-12s %6s %10s %10s %12s %10s"
+            % ("Stage", "Count", "Wall (s)", "CPU (s)", "ffmpeg (s)", "RSS (MB)"),
+        ]
+        for category, total in sorted(
+            report["totals"].items(), key=lambda t: t[1]["wall"], reverse=True
+        ):
+            lines.append(
+                "%-12s %6d %10.2f %10.2f %12.2f %10.0f"
+                % (
+                    category,
+                    total["count"],
+                    total["wall"],
+                    total["cpu"],
+                    total["children_cpu"],
+                    total["peak_rss_mb"],
+                )
+            )
+
+        if report["worst_slides"]:
+            lines += ["", "Slowest slides:"]
+            for cost in report["worst_slides"]:
+                lines.append(
+                    "  slide %s (%s): %.2fs wall, %.2fs ffmpeg CPU"
+                    % (
+                        cost["slide"],
+                        cost["label"],
+                        cost["wall"],
+                        cost["children_cpu"],
+                    )
+                )
+        if report["worst_transitions"]:
+            lines += ["", "Slowest transitions:"]
+            for cost in report["worst_transitions"]:
+                lines.append(
+                    "  %s after slide %s (%s): %.2fs wall, %.2fs ffmpeg CPU"
+                    % (
+                        cost["args"].get("transition", "?"),
+                        cost["slide"],
+                        cost["label"],
+                        cost["wall"],
+                        cost["children_cpu"],
+                    )
+                )
+        return lines
+
+    def save(self, filename, title="Render profile", labels=None):
+        # JSON report and a human readable summary next to each other
+        root, extension = os.path.splitext(filename)
+        with open(filename, "w") as file:
+            json.dump(self.getReport(labels), file, indent=4, default=str)
+        with open(root + ".txt", "w") as file:
+            file.write("\n".join(self.getSummary(title, labels)) + "\n")
+        logger.info("Profile written to %s", filename)
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+
+import datetime
+import json
+import logging
+import subprocess
+import sys
+import threading
+import time
+
+from .Profiler import waitProcess
+
+logger = logging.getLogger("kburns-slideshow")
+
+
+def toInt(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def toFloat(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def getProgressCommand(cmd):
+    # ffmpeg writes key=value blocks to stdout instead of the stats line
+    return [cmd[0], "-progress pipe:1", "-nostats"] + [
+        c for c in cmd[1:] if c != "-stats"
+    ]
+
+
+def formatTime(seconds):
+    if seconds is None:
+        return "--:--:--"
+    return str(datetime.timedelta(seconds=int(seconds)))
+
+
+def formatProgress(event, overall):
+    text = "%3d%% (%s/%s frames)" % (
+        overall["percent"],
+        overall["frames_done"],
+        overall["frames_total"],
+    )
+    if event.get("fps") is not None:
+        text += ", %.1f fps" % (event["fps"])
+    if event.get("speed") is not None:
+        text += ", %.2fx" % (event["speed"])
+    text += ", ETA %s" % (formatTime(overall["eta"]))
+    return text
+
+
+class ProgressParser:
+    # parses the output of ffmpeg -progress
+    def __init__(self, job):
+        self.job = job
+        self.values = {}
+
+    def feed(self, line):
+        line = line.strip()
+        if "=" not in line:
+            return None
+
+        key, value = line.split("=", 1)
+        key = key.strip()
+        self.values[key] = value.strip()
+
+        # every block ends with progress=continue or progress=end
+        if key != "progress":
+            return None
+
+        out_time = toInt(self.values.get("out_time_us"))
+        speed = self.values.get("speed")
+        event = {
+            "job": self.job,
+            "frame": toInt(self.values.get("frame")),
+            "fps": toFloat(self.values.get("fps")),
+            "out_time": out_time / 1000000 if out_time is not None else None,
+            "speed": toFloat(speed.rstrip("x")) if speed is not None else None,
+            "size": toInt(self.values.get("total_size")),
+            "finished": self.values["progress"] == "end",
+        }
+        self.values = {}
+        return event
+
+
+def runWithProgress(cmd, progress, job):
+    # run ffmpeg (see getProgressCommand) and pass its progress to the aggregator
+    p = subprocess.Popen(
+        " ".join(cmd),
+        shell=True,
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    parser = ProgressParser(job)
+    for line in iter(p.stdout.readline, ""):
+        event = parser.feed(line)
+        if event is not None:
+            progress.update(event)
+    p.stdout.close()
+    return waitProcess(p)
+
+
+class Progress:
+    # aggregates the progress of all ffmpeg jobs of a render and passes the
+    # events with the overall progress to the sinks
+    def __init__(self, sinks=None):
+        self.sinks = list(sinks) if sinks is not None else []
+        self.jobs = {}
+        self.started = None
+        self.lock = threading.RLock()
+
+    def addSink(self, sink):
+        self.sinks.append(sink)
+
+    def addJob(self, job, frames=None):
+        with self.lock:
+            self.jobs[str(job)] = {"frames": frames, "frame": 0, "finished": False}
+
+    def update(self, event):
+        with self.lock:
+            if self.started is None:
+                self.started = time.time()
+
+            job = self.jobs.setdefault(
+                str(event["job"]), {"frames": None, "frame": 0, "finished": False}
+            )
+            if event.get("frame") is not None:
+                job["frame"] = event["frame"]
+            if event.get("finished"):
+                job["finished"] = True
+
+            overall = self.getOverall()
+            for sink in self.sinks:
+                sink.write(event, overall)
+
+    def finish(self, job, state="done"):
+        # cached or failed jobs are finished without ffmpeg progress
+        job = str(job)
+        frames = self.jobs[job]["frames"] if job in self.jobs else None
+        self.update({"job": job, "frame": frames, "finished": True, "state": state})
+
+    def getOverall(self):
+        with self.lock:
+            # jobs with an unknown number of frames are not part of the total
+            jobs = [job for job in self.jobs.values() if job["frames"] is not None]
+            total = sum(job["frames"] for job in jobs)
+            done = sum(
+                job["frames"] if job["finished"] else min(job["frame"], job["frames"])
+                for job in jobs
+            )
+
+            eta = None
+            elapsed = time.time() - self.started if self.started is not None else 0
+            if done > 0 and elapsed > 0:
+                eta = (total - done) / (done / elapsed)
+
+            return {
+                "frames_done": done,
+                "frames_total": total,
+                "percent": 100 * done / total if total > 0 else 0,
+                "jobs_done": len([j for j in self.jobs.values() if j["finished"]]),
+                "jobs_total": len(self.jobs),
+                "elapsed": elapsed,
+                "eta": eta,
+            }
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+        self.sinks = []
+
+
+class ConsoleSink:
+    def __init__(self, stream=None, width=30):
+        self.stream = stream if stream is not None else sys.stdout
+        self.width = width
+
+    def write(self, event, overall):
+        filled = int(self.width * overall["percent"] / 100)
+        self.stream.write(
+            "\r[%s%s] %s "
+            % ("#" * filled, " " * (self.width - filled), formatProgress(event, overall))
+        )
+        if overall["jobs_total"] > 0 and overall["jobs_done"] == overall["jobs_total"]:
+            self.stream.write("\n")
+        self.stream.flush()
+
+    def close(self):
+        pass
+
+
+class JsonLinesSink:
+    def __init__(self, filename):
+        self.filename = filename
+        self.file = open(filename, "a")
+
+    def write(self, event, overall):
+        self.file.write(
+            json.dumps({"time": time.time(), "event": event, "overall": overall}) + "\n"
+        )
+        self.file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+
+class QueueSink:
+    # passes the progress of a render in a worker process to the parent process
+    def __init__(self, queue, job):
+        self.queue = queue
+        self.job = job
+
+    def write(self, event, overall):
+        self.queue.put(("progress", self.job, event, overall))
+
+    def close(self):
+        pass
@@ -1,34 +1,118 @@
 #!/usr/bin/env python3
 
+import concurrent.futures
 import logging
 import os
 import subprocess
 
+from .Cache import Cache
+from .Cache import getFileIdentity
+from .Cache import getKey
+from .JobManifest import DONE
+from .JobManifest import FAILED
+from .JobManifest import getPartName
+from .JobManifest import RUNNING
+from .Profiler import getItemCategory
+from .Profiler import Profiler
+from .Progress import getProgressCommand
+from .Progress import runWithProgress
+
 logger = logging.getLogger("kburns-slideshow")
 
+# encoding parameters of the temporary videos, part of every cache key
+TEMP_VIDEO_PARAMETERS = ["-preset", "ultrafast", "-tune", "stillimage", "-c:v", "libx264"]
+
 
 class Queue:
-    def __init__(self, tempFileFolder, tempFilePrefix):
+    def __init__(
+        self,
+        tempFileFolder,
+        tempFilePrefix,
+        cacheFolder=None,
+        ffprobe=None,
+        governor=None,
+        progress=None,
+        profiler=None,
+    ):
         self.tempFileFolder = tempFileFolder
         self.tempFilePrefix = tempFilePrefix
+        self.ffprobe = ffprobe
+        # limits the concurrent ffmpeg processes on the host (optional)
+        self.governor = governor
+        # receives the progress of the ffmpeg processes (optional)
+        self.progress = progress
+        # records the resources of every temporary video
+        self.profiler = profiler if profiler is not None else Profiler()
+        self.cacheFolder = (
+            cacheFolder
+            if cacheFolder is not None
+            else os.path.join(tempFileFolder, "cache")
+        )
         self.init()
 
     def init(self):
         self.queue = []
 
+        # job manifest of the current render (optional)
+        self.manifest = None
+
         if not os.path.exists(self.tempFileFolder):
-            os.mkdir(self.tempFileFolder)
+            os.makedirs(self.tempFileFolder, exist_ok=True)
             logger.debug("Temporary directory %s created", self.tempFileFolder)
 
+        self.cache = Cache(self.cacheFolder)
+
+        # content keys of the queued outputs (by output name)
+        self.keys = {}
+        self.frames = {}
+        self.suffixes = {}
+
         # delete these files eventually
         self.tempFiles = []
 
-    def addItem(self, inputs, filters, suffix):
+    def addItem(self, inputs, filters, suffix, frames=None):
         item = {"inputs": inputs, "filters": filters, "suffix": suffix}
+        item["key"] = self.getItemKey(item)
+        # expected number of frames, used to verify the rendered file
+        item["frames"] = frames
         self.queue.append(item)
 
+        self.keys[self.getOutputName(item)] = item["key"]
+        self.frames[self.getOutputName(item)] = frames
+        self.suffixes[self.getOutputName(item)] = item["suffix"]
+
         return self.getOutputName(item)
 
+    def getInputKeys(self, inputs):
+        # inputs which are generated by the queue are identified by their own key
+        return [self.keys[i] if i in self.keys else getFileIdentity(i) for i in inputs]
+
+    def getItemKey(self, item):
+        return getKey(
+            self.getInputKeys(item["inputs"]), item["filters"], TEMP_VIDEO_PARAMETERS
+        )
+
+    def getFrames(self, outputs):
+        # total frames of queued outputs (None if one of them is unknown)
+        frames = [self.frames.get(output) for output in outputs]
+        if None in frames:
+            return None
+        return sum(frames)
+
+    def getSuffixes(self, outputs):
+        # suffixes of the items which create these outputs
+        return [str(self.suffixes[o]) for o in outputs if o in self.suffixes]
+
+    def setManifest(self, manifest):
+        self.manifest = manifest
+        for item in self.queue:
+            manifest.addJob(item["suffix"], item["key"], item["frames"])
+        manifest.save()
+
+    def setState(self, item, state):
+        if self.manifest is not None:
+            self.manifest.setState(item["suffix"], state)
+
     def getQueue(self):
         return self.queue
 
@@ -41,6 +125,52 @@ class Queue:
     def getOutputName(self, item, extension="mp4"):
         return os.path.join(self.tempFileFolder, self.getFileName(item, extension))
 
+    def getDependencies(self):
+        # an item depends on the items which create its inputs
+        outputs = {self.getOutputName(item): idx for idx, item in enumerate(self.queue)}
+        return [
+            {outputs[i] for i in item["inputs"] if i in outputs} for item in self.queue
+        ]
+
+    def process(self, ffmpeg, workers=1, callback=None, isCancelled=None):
+        # create all temporary videos, with several workers in dependency order
+        results = [None] * len(self.queue)
+        if workers <= 1:
+            for idx, item in enumerate(self.queue):
+                if isCancelled is not None and isCancelled():
+                    break
+                results[idx] = self.createTemporaryVideo(ffmpeg, item)
+                if callback is not None:
+                    callback(idx, item, results[idx])
+            return results
+
+        dependencies = self.getDependencies()
+        pending = list(range(len(self.queue)))
+        finished = set()
+        running = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            while pending or running:
+                if isCancelled is not None and isCancelled():
+                    pending = []
+                for idx in [i for i in pending if dependencies[i] <= finished]:
+                    pending.remove(idx)
+                    running[
+                        executor.submit(self.createTemporaryVideo, ffmpeg, self.queue[idx])
+                    ] = idx
+                if not running:
+                    break
+                done, _ = concurrent.futures.wait(
+                    running, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    idx = running.pop(future)
+                    results[idx] = future.result()
+                    # a failed input is reported by the depending item as well
+                    finished.add(idx)
+                    if callback is not None:
+                        callback(idx, self.queue[idx], results[idx])
+        return results
+
     def createTemporaryVideo(self, ffmpeg, item):
 
         if isinstance(item["filters"], list):
@@ -52,6 +182,9 @@ class Queue:
         with open("%s" % (temp_filter_script), "w") as file:
             file.write("%s [out]" % (filters))
 
+        output = self.getOutputName(item)
+        part = getPartName(output)
+
         cmd = [
             ffmpeg,
             "-y",
@@ -63,43 +196,150 @@ class Queue:
             '-filter_complex_script "%s"' % (temp_filter_script),
             # "-crf", "0" ,
             "-map [out]",
-            "-preset",
-            "ultrafast",
-            "-tune",
-            "stillimage",
-            "-c:v",
-            "libx264",
-            self.getOutputName(item),
+            " ".join(TEMP_VIDEO_PARAMETERS),
+            part,
         ]
 
-        # re-use existing temp file
-        if not os.path.exists(self.getOutputName(item)):
+        key = item["key"] if "key" in item else self.getItemKey(item)
+
+        # re-use a cached video with the same inputs and filters
+        if not self.cache.has(key):
             logger.debug(
                 "Create temporary video %s for file %s",
-                self.getOutputName(item),
+                output,
                 ",".join(item["inputs"]),
             )
+            # never re-use a stale file of a previous render with the same name
+            for file in [output, part]:
+                if os.path.exists(file):
+                    os.remove(file)
+
+            self.setState(item, RUNNING)
             # logger.debug("Command: %s", " ".join(cmd))
-            subprocess.call(" ".join(cmd), shell=True)
+            with self.profiler.stage(
+                item["suffix"], getItemCategory(item), **self.getItemArgs(item)
+            ) as record:
+                if self.governor is not None:
+                    returncode = self.governor.call(cmd, self.progress, item["suffix"])
+                elif self.progress is not None:
+                    returncode = runWithProgress(
+                        getProgressCommand(cmd), self.progress, item["suffix"]
+                    )
+                else:
+                    returncode = subprocess.call(" ".join(cmd), shell=True)
+
+            # the video is written to a part file and only renamed when it is complete
+            frames = item["frames"] if "frames" in item else None
+            if (
+                returncode == 0
+                and os.path.exists(part)
+                and self.verifyVideo(part, frames)
+            ):
+                os.replace(part, output)
+                self.cache.put(key, output)
+                # the size of the temporary videos calibrates the disk estimate
+                record["args"]["size"] = os.path.getsize(output)
+            elif os.path.exists(part):
+                logger.error("Temporary video %s is incomplete", part)
+                os.remove(part)
         else:
             logger.debug(
-                "Using existing temporary video %s for file %s",
-                self.getOutputName(item),
+                "Using cached temporary video %s for file %s",
+                output,
                 ",".join(item["inputs"]),
             )
+            self.cache.fetch(key, output)
 
-        if os.path.exists(self.getOutputName(item)):
+        if os.path.exists(output):
+            self.setState(item, DONE)
+            if self.progress is not None:
+                self.progress.finish(item["suffix"])
             self.tempFiles.append(self.getFileName(item))
             self.tempFiles.append(self.getFileName(item, "txt"))
-            return self.getOutputName(item)
+            return output
 
+        self.setState(item, FAILED)
+        if self.progress is not None:
+            self.progress.finish(item["suffix"], FAILED)
         return None
 
+    def getItemArgs(self, item):
+        # slide index (and transition) of the item for the profile
+        args = {
+            "frames": item["frames"] if "frames" in item else None,
+            "depends": self.getSuffixes(item["inputs"]),
+        }
+        suffix = str(item["suffix"])
+        if getItemCategory(item) != "combine" and suffix.split("_")[0].isdigit():
+            args["slide"] = int(suffix.split("_")[0])
+        if "_trans_" in suffix:
+            args["transition"] = suffix.split("_trans_")[1]
+            # the suffix has the index of the next slide, the transition belongs to
+            # the slide before (see SlideManager.getVideoFilterChains)
+            args["slide"] = args["slide"] - 1
+        return args
+
+    def probeFrames(self, file):
+        si = None
+        if hasattr(subprocess, "STARTUPINFO"):
+            si = subprocess.STARTUPINFO()
+            si.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+        try:
+            with self.profiler.stage(os.path.basename(file), "probe"):
+                frames = subprocess.check_output(
+                    [
+                        "%s" % (self.ffprobe),
+                        "-v",
+                        "error",
+                        "-select_streams",
+                        "v:0",
+                        "-count_packets",
+                        "-show_entries",
+                        "stream=nb_read_packets",
+                        "-of",
+                        "default=noprint_wrappers=1:nokey=1",
+                        file,
+                    ],
+                    stderr=subprocess.PIPE,
+                    stdin=subprocess.PIPE,
+                    startupinfo=si,
+                ).decode()
+            return int(frames.strip())
+        except (subprocess.CalledProcessError, OSError, ValueError):
+            return None
+
+    def verifyVideo(self, file, frames=None):
+        if os.path.getsize(file) == 0:
+            return False
+
+        # without ffprobe only the existence of the file can be checked
+        if self.ffprobe is None:
+            return True
+
+        probed = self.probeFrames(file)
+        if probed is None or probed == 0:
+            return False
+
+        # the encoder may drop or duplicate a single frame at the end
+        if frames is not None and abs(probed - frames) > 1:
+            logger.error(
+                "Video %s has %s frames, expected %s", file, probed, frames
+            )
+            return False
+
+        return True
+
     def clean(self, delete_temp=True):
-        if delete_temp:
-            for temp in self.tempFiles:
-                file = os.path.join(self.tempFileFolder, temp)
+        for temp in self.tempFiles:
+            file = os.path.join(self.tempFileFolder, temp)
+            if os.path.exists(file):
                 os.remove(file)
                 logger.debug("Delete %s", file)
-            # os.rmdir(self.tempFileFolder)
+        # the cached videos are shared by the renders, without them nothing can be
+        # resumed
+        if delete_temp:
+            for key in self.keys.values():
+                self.cache.remove(key)
+            if self.manifest is not None:
+                self.manifest.remove()
         self.init()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+import os
+
+from .Progress import Progress
+from .Queue import Queue
+
+
+class RenderJob:
+    # everything a render creates: its folder, the queue of temporary videos and
+    # their progress, the render plan and how the slides are split for the
+    # transitions. the slides of the project are not changed by a render, so several
+    # jobs can be built from one project (see SlideManager.snapshot)
+    def __init__(
+        self,
+        jobId,
+        folder,
+        tempFilePrefix,
+        cacheFolder,
+        ffprobe=None,
+        governor=None,
+        profiler=None,
+        sinks=None,
+    ):
+        # without an id the job is the default namespace of the temporary folder
+        self.id = jobId
+        self.folder = folder
+        self.tempFileFullPrefix = os.path.join(folder, tempFilePrefix)
+        # progress of all ffmpeg processes of the job
+        self.progress = Progress(sinks)
+        self.queue = Queue(
+            folder,
+            tempFilePrefix,
+            cacheFolder,
+            ffprobe,
+            governor,
+            self.progress,
+            profiler,
+        )
+        self.tempInputFiles = []
+        self.reduceVariable = 10
+
+        # render plan of the job (see SlideManager.planRender)
+        self.plan = None
+        self.planner = None
+        # sections (start, main, end) and temporary video of the slides by index
+        self.splits = {}
+        self.tempfiles = {}
+        # audio mixed by the AudioMixer (see SlideManager.mixAudio)
+        self.audioMix = None
+        # separately rendered audio and video (see SlideManager.useStreamCopy)
+        self.audioArtifact = None
+        self.videoKey = None
+        # cached (key, extension) of the audio and the outputs, see cleanVideoProcessing
+        self.cached = []
+        # additional outputs scaled from the video (see SlideManager.getRenditions)
+        self.renditions = []
+
+    def getSplits(self, idx):
+        return self.splits[idx] if idx in self.splits else []
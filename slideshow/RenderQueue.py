@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import subprocess
+import sys
+import uuid
+
+from .JobManifest import DONE
+from .JobManifest import FAILED
+from .JobManifest import PENDING
+from .JobManifest import RUNNING
+from .Progress import QueueSink
+from .SlideManager import SlideManager
+
+logger = logging.getLogger("kburns-slideshow")
+
+CANCELLED = "cancelled"
+
+
+def killProcessTree(pid):
+    # the worker and all of its ffmpeg processes
+    try:
+        if os.name == "nt":
+            subprocess.call(
+                ["taskkill", "/F", "/T", "/PID", str(pid)],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        else:
+            # the worker leads its own process group, see renderProject
+            try:
+                os.killpg(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                # the worker did not start its process group yet
+                os.kill(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError) as e:
+        logger.debug("Process tree %s could not be killed: %s", pid, e)
+
+
+def renderProject(job, project, output_file, resume, messages):
+    # runs in the worker process, the project is a snapshot of the slideshow
+    # (see SlideManager.getProject) so the GUI can be edited during the render
+    if hasattr(os, "setsid"):
+        os.setsid()
+    # a GUI without console has no stdout for the progress
+    if sys.stdout is None:
+        sys.stdout = open(os.devnull, "w")
+
+    try:
+        sm = SlideManager(project["config"], project["slides"], project["audio"])
+        sm.progressSinks.append(QueueSink(messages, job))
+        finished = sm.snapshot().createVideo(output_file, overwrite=True, resume=resume)
+        messages.put(("finished", job, DONE if finished else FAILED, None))
+    except Exception as e:
+        logger.exception("Render of %s failed", output_file)
+        messages.put(("finished", job, FAILED, str(e)))
+
+
+class RenderQueue:
+    # renders the submitted projects one after another, each in its own process,
+    # the progress comes back over a queue which is read by poll
+    def __init__(self):
+        # a forked Tk process is not safe, the workers are started fresh
+        self.context = multiprocessing.get_context("spawn")
+        self.jobs = []
+        self.running = None
+
+    def submit(self, project, output_file, resume=False):
+        job = {
+            "id": uuid.uuid4().hex[:8],
+            "output": output_file,
+            "project": project,
+            "resume": resume,
+            "state": PENDING,
+            "overall": None,
+            "error": None,
+            "process": None,
+            # a killed worker may leave its queue broken, every job has its own
+            "messages": None,
+        }
+        self.jobs.append(job)
+        self.startNext()
+        return job
+
+    def getJob(self, job_id):
+        for job in self.jobs:
+            if job["id"] == job_id:
+                return job
+        return None
+
+    def startNext(self):
+        if self.running is not None:
+            return
+        for job in self.jobs:
+            if job["state"] == PENDING:
+                job["messages"] = self.context.Queue()
+                job["process"] = self.context.Process(
+                    target=renderProject,
+                    args=(
+                        job["id"],
+                        job["project"],
+                        job["output"],
+                        job["resume"],
+                        job["messages"],
+                    ),
+                    daemon=True,
+                )
+                job["process"].start()
+                job["state"] = RUNNING
+                self.running = job
+                logger.info("Render job %s of %s started", job["id"], job["output"])
+                return
+
+    def poll(self):
+        # the jobs whose state or progress may have changed since the last poll
+        changed = []
+        job = self.running
+        while job is not None and job["state"] == RUNNING:
+            try:
+                kind, _, *values = job["messages"].get_nowait()
+            except queue.Empty:
+                # the worker died without a message (a finished worker exits with 0)
+                if not job["process"].is_alive() and job["process"].exitcode != 0:
+                    self.finish(job, FAILED, "exit code %s" % (job["process"].exitcode))
+                break
+
+            if kind == "progress":
+                job["overall"] = values[1]
+            elif kind == "finished":
+                self.finish(job, values[0], values[1])
+
+        if job is not None:
+            changed.append(job)
+        self.startNext()
+        return changed
+
+    def finish(self, job, state, error=None):
+        job["state"] = state
+        job["error"] = error
+        if job["process"] is not None:
+            job["process"].join(1)
+        if self.running is job:
+            self.running = None
+        logger.info("Render job %s of %s %s", job["id"], job["output"], state)
+
+    def cancel(self, job_id):
+        job = self.getJob(job_id)
+        if job is None:
+            return
+        if job["state"] == PENDING:
+            job["state"] = CANCELLED
+        elif job["state"] == RUNNING:
+            # the interrupted render can be resumed later (see JobManifest)
+            killProcessTree(job["process"].pid)
+            self.finish(job, CANCELLED)
+            self.startNext()
+
+    def isBusy(self):
+        return any(job["state"] in [PENDING, RUNNING] for job in self.jobs)
+
+    def shutdown(self):
+        for job in self.jobs:
+            self.cancel(job["id"])
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+import logging
+import math
+import os
+import re
+
+logger = logging.getLogger("kburns-slideshow")
+
+HLS = "hls"
+DASH = "dash"
+
+# the segmented output is chosen by the extension of the output file
+SEGMENT_FORMATS = {".m3u8": HLS, ".mpd": DASH}
+
+
+def getSegmentFormat(output_file):
+    extension = os.path.splitext(output_file)[1].lower()
+    return SEGMENT_FORMATS[extension] if extension in SEGMENT_FORMATS else None
+
+
+def quoteTemplate(template):
+    # the $ of the DASH templates is expanded by a POSIX shell, not by cmd.exe
+    return '"%s"' % (template if os.name == "nt" else template.replace("$", "\\$"))
+
+
+def getSegmentArguments(output_file, boundaries, fps, segment_duration):
+    # a keyframe at the start of every slide (and at least every segment_duration),
+    # the muxer starts a new segment at every keyframe
+    root = os.path.splitext(output_file)[0]
+    name = os.path.basename(root)
+    arguments = [
+        "-force_key_frames %s"
+        % (",".join("%.4f" % (boundary) for boundary in boundaries))
+        if boundaries
+        else "",
+        "-g %s" % (max(1, int(segment_duration * fps))),
+        "-sc_threshold 0",
+    ]
+
+    if getSegmentFormat(output_file) == HLS:
+        # an event playlist is updated after every segment, the segments are renamed
+        # when they are complete, so the start can be played while the rest is encoded
+        return arguments + [
+            "-f hls",
+            "-hls_time %.3f" % (1 / fps),
+            "-hls_playlist_type event",
+            "-hls_flags independent_segments+temp_file",
+            '-hls_segment_filename "%s-%%05d.ts"' % (root),
+        ]
+
+    # the manifest is dynamic until the last segment is written, the segments are
+    # named after the manifest (relative to its folder)
+    init = "%s-init-$RepresentationID$.m4s" % (name)
+    media = "%s-$RepresentationID$-$Number%%05d$.m4s" % (name)
+    return arguments + [
+        "-f dash",
+        "-seg_duration %.3f" % (1 / fps),
+        "-use_template 1",
+        "-use_timeline 1",
+        "-window_size 0",
+        "-init_seg_name %s" % (quoteTemplate(init)),
+        "-media_seg_name %s" % (quoteTemplate(media)),
+    ]
+
+
+def getMasterPlaylistName(output_file):
+    # the playlist of the renditions next to the playlist of the video
+    root, extension = os.path.splitext(output_file)
+    return "{}.master{}".format(root, extension)
+
+
+def getPlaylistBandwidth(playlist):
+    # the peak and the average bits per second of the segments of a playlist
+    folder = os.path.dirname(os.path.abspath(playlist))
+    with open(playlist) as file:
+        lines = [line.strip() for line in file if line.strip()]
+
+    peak = 0
+    bits = 0
+    duration = 0
+    for line, uri in zip(lines, lines[1:]):
+        if not line.startswith("#EXTINF:") or uri.startswith("#"):
+            continue
+        seconds = float(line[len("#EXTINF:") :].split(",")[0])
+        size = os.path.getsize(os.path.join(folder, uri)) * 8
+        if seconds > 0:
+            peak = max(peak, size / seconds)
+        bits += size
+        duration += seconds
+    average = bits / duration if duration > 0 else 0
+    return int(math.ceil(peak)), int(math.ceil(average))
+
+
+def writeMasterPlaylist(output_file, variants):
+    # one playlist of all (playlist, width, height) variants, so that a player can
+    # switch between them, the variants are in the folder of the master playlist
+    lines = ["#EXTM3U", "#EXT-X-VERSION:3", "#EXT-X-INDEPENDENT-SEGMENTS"]
+    for playlist, width, height in variants:
+        peak, average = getPlaylistBandwidth(playlist)
+        lines.append(
+            "#EXT-X-STREAM-INF:BANDWIDTH=%s,AVERAGE-BANDWIDTH=%s,RESOLUTION=%sx%s"
+            % (peak, average, width, height)
+        )
+        lines.append(os.path.basename(playlist))
+
+    master = getMasterPlaylistName(output_file)
+    with open("%s.tmp" % (master), "w") as file:
+        file.write("\n".join(lines) + "\n")
+    os.replace("%s.tmp" % (master), master)
+    return master
+
+
+def getSegmentFiles(output_file):
+    # the segments of an output, the segments of other outputs in the folder have
+    # another name (e.g. the renditions video-720p-00001.ts of video-00001.ts)
+    folder = os.path.dirname(os.path.abspath(output_file))
+    name = re.escape(os.path.basename(os.path.splitext(output_file)[0]))
+    pattern = re.compile(r"^%s-(\d+|init-\d+|\d+-\d+)\.(ts|m4s)(\.tmp)?$" % (name))
+    return [
+        os.path.join(folder, file) for file in os.listdir(folder) if pattern.match(file)
+    ]
+
+
+def removeSegments(output_file):
+    # the playlists and the segments of a previous render
+    playlists = [output_file]
+    if getSegmentFormat(output_file) == HLS:
+        playlists.append(getMasterPlaylistName(output_file))
+    for file in getSegmentFiles(output_file) + playlists:
+        if os.path.exists(file):
+            logger.debug("Removing segment %s", file)
+            os.remove(file)
@@ -1,12 +1,43 @@
 #!/usr/bin/env python3
 
+import copy
+import functools
 import pkgutil
 import random
 
 from slideshow import PROJECT_ROOT
 
 
+@functools.lru_cache()
+def getPossibleFrames(fps):
+    # for each frame (in one second) calculate the expected duration (i/fps)
+    # if this value has more than 2 decimal places (*100 has no decimal places (is_integer))
+    # it is a possible frame for a duration with less than 2 decimal places
+    return [i for i in range(fps) if float(i / fps * 100).is_integer()]
+
+
+def getDurationFrames(duration, fps):
+    possibleFrames = getPossibleFrames(fps)
+
+    total_frames = round(duration * fps)
+    total_frames_seconds = int(duration) * fps
+
+    remaining_frames = total_frames - total_frames_seconds
+
+    frameCount = 0
+    for i in possibleFrames:
+        if i <= remaining_frames:
+            frameCount = i
+        else:
+            break
+
+    return total_frames_seconds + frameCount
+
+
 class Slide:
+    # the slides of a snapshot are shared by its renders and can not be changed
+    frozen = False
+
     def __init__(
         self,
         ffmpeg_version,
@@ -42,38 +73,50 @@ class Slide:
                 transition if transition in self.getTransitions() else None
             )
 
-        self.splits = []
-        self.tempfile = None
-
         # fix the duration
         # round down to last full frame
         self.frames = 0
         self.setDuration(duration)
 
+    def __setattr__(self, name, value):
+        if self.frozen:
+            raise AttributeError("The slide %s of a snapshot is frozen" % (self.file))
+        super().__setattr__(name, value)
+
+    def __copy__(self):
+        # a copy can be changed, e.g. scaled for the validation
+        slide = object.__new__(self.__class__)
+        slide.__dict__.update(self.__dict__)
+        slide.__dict__.pop("frozen", None)
+        return slide
+
+    def getSnapshot(self, output_width, output_height, fps, frames=None, **changes):
+        # a frozen copy for a render, the output size and frame rate may differ,
+        # the changes are other attributes (e.g. the transition of a draft)
+        slide = copy.deepcopy(self)
+        slide.__dict__.pop("frozen", None)
+        slide.output_width = output_width
+        slide.output_height = output_height
+        slide.output_ratio = output_width / output_height
+        if fps != slide.fps:
+            slide.fps = fps
+            if frames is None:
+                slide.setDuration(self.duration)
+            else:
+                slide.setFrames(frames)
+        for name, value in changes.items():
+            setattr(slide, name, value)
+        slide.frozen = True
+        return slide
+
     def getDuration(self):
         return round(self.frames / self.fps, 3)
 
     def setDuration(self, duration):
-        # for each frame (in one second) calculate the expected duration (i/fps)
-        # if this value has more than 2 decimal places (*100 has no decimal places (is_integer))
-        # it is a possible frame for a duration with less than 2 decimal places
-        possibleFrames = [
-            i for i in range(self.fps) if float(i / self.fps * 100).is_integer()
-        ]
-
-        total_frames = round(duration * self.fps)
-        total_frames_seconds = int(duration) * self.fps
-
-        remaining_frames = total_frames - total_frames_seconds
-
-        frameCount = 0
-        for i in possibleFrames:
-            if i <= remaining_frames:
-                frameCount = i
-            else:
-                break
+        self.setFrames(getDurationFrames(duration, self.fps))
 
-        self.frames = total_frames_seconds + frameCount
+    def setFrames(self, frames):
+        self.frames = frames
         self.duration = self.frames / self.fps
 
     def getFrames(self):
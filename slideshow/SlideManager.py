@@ -6,16 +6,86 @@ import json
 import logging
 import os
 import re
+import shutil
 import subprocess
 import sys
+import types
+import uuid
 
 from .AudioFile import AudioFile
+from .AudioMixer import AudioMixer
+from .AudioMixer import isMixerAvailable
+from .BeatSync import BEAM
+from .BeatSync import GREEDY
+from .BeatSync import isBeamAvailable
+from .BeatSync import solve
+from .BeatSync import SYNC_MODES
+from .BeatSync import Timeline
+from .Cache import Cache
+from .Cache import getFileIdentity
+from .Cache import getKey
+from .Governor import getAvailableMemory
+from .Governor import getOpenFileLimit
+from .Governor import Governor
 from .ImageSlide import ImageSlide
-from .Queue import Queue
+from .JobManifest import DONE
+from .JobManifest import FAILED
+from .JobManifest import getJobManifestFilename
+from .JobManifest import getPartName
+from .JobManifest import JobManifest
+from .JobManifest import RUNNING
+from .OnsetDetector import isDetectorAvailable
+from .OnsetDetector import OnsetDetector
+from .OnsetIndex import ONSET_INDEX_FILENAME
+from .OnsetIndex import OnsetIndex
+from .Planner import CALIBRATION_FILENAME
+from .Planner import CostModel
+from .Planner import FIXED
+from .Planner import Planner
+from .Profiler import Profiler
+from .Progress import ConsoleSink
+from .Progress import formatTime
+from .Progress import JsonLinesSink
+from .RenderJob import RenderJob
+from .Segments import DASH
+from .Segments import getSegmentArguments
+from .Segments import getSegmentFormat
+from .Segments import HLS
+from .Segments import removeSegments
+from .Segments import writeMasterPlaylist
+from .Trace import saveTrace
+from .Validator import formatReport
+from .Validator import getValidationConfig
+from .Validator import scaleSlide
+from .Validator import validate
 from .VideoSlide import VideoSlide
 
 logger = logging.getLogger("kburns-slideshow")
 
+# encoding of the audio of the final video
+AUDIO_PARAMETERS = "-c:a aac -b:a 160k"
+AUDIO_EXTENSION = "m4a"
+
+# the renditions are scaled from the rendered video
+RENDITION_FILTER = "scale={}:{}:flags=lanczos,setsar=1"
+# longest segment (seconds) of a HLS/DASH output
+SEGMENT_DURATION = 4
+
+# font size of the titles (pixels) unless the slide has its own
+TITLE_FONT_SIZE = 150
+
+# quality tiers of a render (see snapshot)
+FINAL = "final"
+DRAFT = "draft"
+QUALITIES = [FINAL, DRAFT]
+
+# a draft has the timeline of the video at a fraction of the size and frames
+DRAFT_WIDTH = 480
+DRAFT_FPS = 15
+# the blend of two slides is the cheapest transition
+DRAFT_TRANSITION = "fade"
+DRAFT_PARAMETERS = "-preset ultrafast -tune fastdecode -crf 32"
+
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 
 class SlideManager:
@@ -39,12 +109,27 @@ class SlideManager:
             if "temp_file_prefix" in config
             else "temp-kburns-"
         )
-        self.tempFileFullPrefix = os.path.join(self.tempFileFolder, self.tempFilePrefix)
-        self.queue = Queue(self.tempFileFolder, self.tempFilePrefix)
-
-        self.tempInputFiles = []
-
-        self.reduceVariable = 10
+        # content addressed videos can be shared by all renders
+        self.cacheFolder = os.path.join(self.tempFileFolder, "cache")
+        # every render gets its own folder for scripts, subtitles and segments
+        self.jobsFolder = os.path.join(self.tempFileFolder, "jobs")
+        # all ffmpeg processes of the host share the CPU slots
+        self.governor = Governor.fromConfig(
+            os.path.join(self.tempFileFolder, "slots"), config
+        )
+        # sinks which get the progress of every job (e.g. of a render worker)
+        self.progressSinks = []
+        # wall time, CPU and memory of every stage
+        self.profiler = Profiler()
+        # the state of the current render, a job is started with the video processing
+        self.job = self.getDefaultJob()
+        # offsets of the slides of a snapshot (see snapshot)
+        self.offsets = None
+        self.cache = Cache(self.cacheFolder)
+        # onsets of the background tracks, kept between the renders
+        self.onsetIndex = OnsetIndex(
+            os.path.join(self.tempFileFolder, ONSET_INDEX_FILENAME)
+        )
 
         # is FFmpeg Version 3 or 4?
         try:
@@ -55,12 +140,13 @@ class SlideManager:
             if hasattr(subprocess, "STARTUPINFO"):
                 si = subprocess.STARTUPINFO()
                 si.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            ffmpeg_version_extract = subprocess.check_output(
-                ["%s" % (config["ffmpeg"]), "-version"],
-                stderr=subprocess.PIPE,
-                stdin=subprocess.PIPE,
-                startupinfo=si,
-            ).decode()
+            with self.profiler.stage("ffmpeg -version", "probe"):
+                ffmpeg_version_extract = subprocess.check_output(
+                    ["%s" % (config["ffmpeg"]), "-version"],
+                    stderr=subprocess.PIPE,
+                    stdin=subprocess.PIPE,
+                    startupinfo=si,
+                ).decode()
             m = re.search("^ffmpeg version (([0-9])[0-9.]*)", ffmpeg_version_extract)
             self.ffmpeg_version = int(m.group(2)) if m else 4
         except Exception as e:
@@ -89,6 +175,85 @@ class SlideManager:
         for file in audio_files:
             self.addAudio(file)
 
+    def snapshot(self, **overrides):
+        # a frozen copy of the project for a render: the config and the slides can
+        # not be changed and the offsets of the slides are computed once. every
+        # snapshot renders in its own job, so several snapshots (e.g. in different
+        # output sizes) can be rendered at the same time while the project is edited
+        config = dict(self.config, **overrides)
+        quality = config["quality"] if "quality" in config else FINAL
+        if quality not in QUALITIES:
+            raise ValueError("Unknown quality %s" % (quality))
+        if quality == DRAFT:
+            config.update(self.getDraftConfig(config))
+
+        snapshot = copy.copy(self)
+        snapshot.config = types.MappingProxyType(config)
+        snapshot.slides = tuple(self.getSnapshotSlides(config, quality))
+        snapshot.background_tracks = tuple(copy.deepcopy(self.background_tracks))
+        snapshot.progressSinks = list(self.progressSinks)
+        snapshot.profiler = Profiler()
+        # the render creates its job, until then the snapshot is planned in its own
+        # default namespace
+        snapshot.job = snapshot.getDefaultJob()
+
+        snapshot.offsets = None
+        offsets = [0]
+        for i, slide in enumerate(snapshot.slides):
+            offsets.append(
+                offsets[-1]
+                + slide.getFrames()
+                - snapshot.getSlideFadeOutDuration(i)
+                + snapshot.getTransitionOffset(i)
+            )
+        snapshot.offsets = tuple(offsets)
+        return snapshot
+
+    def getDraftConfig(self, config):
+        # a smaller size and fewer frames, which are encoded fast
+        width = min(config["output_width"], DRAFT_WIDTH)
+        return {
+            "output_width": width,
+            "output_height": 2
+            * round(width * config["output_height"] / config["output_width"] / 2),
+            "fps": min(config["fps"], DRAFT_FPS),
+            "output_codec": "libx264",
+            "output_parameters": DRAFT_PARAMETERS,
+            "renditions": [],
+        }
+
+    def getSnapshotSlides(self, config, quality):
+        width, height, fps = config["output_width"], config["output_height"], config["fps"]
+        # the titles keep their size relative to the video
+        size_factor = height / self.config["output_height"]
+
+        frames = 0
+        for slide in self.slides:
+            # at another frame rate the frames are rounded on the whole timeline
+            # (not per slide), so every slide starts at the same time
+            start = round(frames * fps / self.config["fps"])
+            frames = frames + slide.getFrames()
+            end = round(frames * fps / self.config["fps"])
+
+            changes = {}
+            if slide.overlay_text is not None and size_factor != 1:
+                font_size = (
+                    slide.overlay_text["font_size"]
+                    if "font_size" in slide.overlay_text
+                    else TITLE_FONT_SIZE
+                )
+                changes["overlay_text"] = dict(
+                    slide.overlay_text, font_size=max(1, int(font_size * size_factor))
+                )
+            if quality == DRAFT:
+                if isinstance(slide, ImageSlide):
+                    changes["supersample"] = 1
+                # without a transition the slides are cut
+                if slide.transition is not None:
+                    changes["transition"] = DRAFT_TRANSITION
+
+            yield slide.getSnapshot(width, height, fps, end - start, **changes)
+
     def addSlide(self, file, position=None):
         logger.debug("Slide: %s", file)
 
@@ -185,44 +350,46 @@ class SlideManager:
             if extension.lower() in [
                 e.lower() for e in self.config["VIDEO_EXTENSIONS"]
             ]:
-                slide = VideoSlide(
-                    self.ffmpeg_version,
-                    filename,
-                    self.config["ffprobe"],
-                    output_width,
-                    output_height,
-                    fade_duration,
-                    title,
-                    fps,
-                    overlay_text,
-                    overlay_color,
-                    transition,
-                    force_no_audio,
-                    video_start,
-                    video_end,
-                )
+                with self.profiler.stage(os.path.basename(filename), "probe"):
+                    slide = VideoSlide(
+                        self.ffmpeg_version,
+                        filename,
+                        self.config["ffprobe"],
+                        output_width,
+                        output_height,
+                        fade_duration,
+                        title,
+                        fps,
+                        overlay_text,
+                        overlay_color,
+                        transition,
+                        force_no_audio,
+                        video_start,
+                        video_end,
+                    )
             if extension.lower() in [
                 e.lower() for e in self.config["IMAGE_EXTENSIONS"]
             ]:
-                slide = ImageSlide(
-                    self.ffmpeg_version,
-                    filename,
-                    output_width,
-                    output_height,
-                    slide_duration,
-                    slide_duration_min,
-                    fade_duration,
-                    zoom_direction_x,
-                    zoom_direction_y,
-                    zoom_direction_z,
-                    scale_mode,
-                    zoom_rate,
-                    fps,
-                    title,
-                    overlay_text,
-                    overlay_color,
-                    transition,
-                )
+                with self.profiler.stage(os.path.basename(filename), "open"):
+                    slide = ImageSlide(
+                        self.ffmpeg_version,
+                        filename,
+                        output_width,
+                        output_height,
+                        slide_duration,
+                        slide_duration_min,
+                        fade_duration,
+                        zoom_direction_x,
+                        zoom_direction_y,
+                        zoom_direction_z,
+                        scale_mode,
+                        zoom_rate,
+                        fps,
+                        title,
+                        overlay_text,
+                        overlay_color,
+                        transition,
+                    )
 
         if slide is not None:
             if position is not None:
@@ -240,7 +407,8 @@ class SlideManager:
 
         extension = filename.split(".")[-1]
         if extension.lower() in [e.lower() for e in self.config["AUDIO_EXTENSIONS"]]:
-            audio = AudioFile(filename, self.config["ffprobe"])
+            with self.profiler.stage(os.path.basename(filename), "probe"):
+                audio = AudioFile(filename, self.config["ffprobe"])
             self.background_tracks.append(audio)
             logger.debug("added valid audio file")
 
@@ -274,6 +442,11 @@ class SlideManager:
     # - fade-out duration (begin of transition)
     # + transition offset of previous transition (the duration which the transition is longer than the fade-duration)
     def getOffset(self, idx, frames=True):
+        if self.offsets is not None:
+            # the timeline of a snapshot is computed once
+            offset = self.offsets[len(self.getSlides()[:idx])]
+            return offset if frames else round(offset / self.config["fps"], 5)
+
         offset = sum(
             [
                 (
@@ -338,8 +511,10 @@ class SlideManager:
         slide = self.getSlides()[idx]
         return slide.transition
 
-    def getTransition(self, i, end="", start="", trans=""):
-        fade_duration = self.getSlideFadeOutDuration(i, False)
+    def getTransition(self, i, end="", start="", trans="", fade_duration=None):
+        # the fade-out of the slide unless the transition is needed for another one
+        if fade_duration is None:
+            fade_duration = self.getSlideFadeOutDuration(i, False)
         # blend between previous slide and this slide
         if fade_duration > 0:
             # Load transition
@@ -396,11 +571,13 @@ class SlideManager:
             filters = slide.getFilter()
 
             # generate temporary video of zoom/pan effect
-            if self.config["generate_temp"] and isinstance(slide, ImageSlide):
+            if self.useTempFiles() and isinstance(slide, ImageSlide):
                 # fix scaling
                 filters.append("setsar=1")
 
-                slide.tempfile = self.queue.addItem([slide.file], filters, i)
+                self.job.tempfiles[i] = self.job.queue.addItem(
+                    [slide.file], filters, i, slide.getFrames()
+                )
 
                 filters = []
 
@@ -473,7 +650,7 @@ class SlideManager:
                 font_size = (
                     slide.overlay_text["font_size"]
                     if "font_size" in slide.overlay_text
-                    else 150
+                    else TITLE_FONT_SIZE
                 )
                 font_color = (
                     slide.overlay_text["color"]
@@ -568,9 +745,9 @@ class SlideManager:
             if fade_out_start > fade_in_end:
                 splits.append("main")
 
-            slide.splits = splits
+            self.job.splits[i] = splits
 
-            if self.config["generate_temp"]:
+            if self.useTempFiles():
                 for step in splits:
                     tempfilters = filters[:]
 
@@ -580,6 +757,7 @@ class SlideManager:
                                 0, fade_in_end
                             )
                         )
+                        step_frames = fade_in_end
 
                     if step == "main":
                         tempfilters.append(
@@ -587,6 +765,7 @@ class SlideManager:
                                 fade_in_end, fade_out_start
                             )
                         )
+                        step_frames = fade_out_start - fade_in_end
 
                     if step == "end":
                         tempfilters.append(
@@ -594,11 +773,16 @@ class SlideManager:
                                 fade_out_start, slide.getFrames()
                             )
                         )
+                        step_frames = slide.getFrames() - fade_out_start
 
                     file = (
-                        slide.tempfile if isinstance(slide, ImageSlide) else slide.file
+                        self.job.tempfiles[i]
+                        if isinstance(slide, ImageSlide)
+                        else slide.file
+                    )
+                    self.job.queue.addItem(
+                        [file], tempfilters, f"{i}_{step}", int(step_frames)
                     )
-                    self.queue.addItem([file], tempfilters, f"{i}_{step}")
             else:
                 filters.append("split=%s" % (len(splits)))
                 filter_chains.append(
@@ -634,8 +818,8 @@ class SlideManager:
         # Concat videos
         videos = []
         for i, slide in enumerate(self.getSlides()):
-            if "start" in slide.splits:
-                if self.config["generate_temp"]:
+            if "start" in self.job.getSplits(i):
+                if self.useTempFiles():
                     end = "[v0]"
                     start = "[v1]"
                     transition = ""
@@ -647,13 +831,13 @@ class SlideManager:
                 filter, _ = self.getTransition(i - 1, end, start, transition)
 
                 if filter is not None:
-                    if self.config["generate_temp"]:
+                    if self.useTempFiles():
                         # temporary transition video
                         tempvideo_end = "{}{}_{}.mp4".format(
-                            self.tempFileFullPrefix, i - 1, "end"
+                            self.job.tempFileFullPrefix, i - 1, "end"
                         )
                         tempvideo_start = "{}{}_{}.mp4".format(
-                            self.tempFileFullPrefix, i, "start"
+                            self.job.tempFileFullPrefix, i, "start"
                         )
 
                         filter = (
@@ -662,70 +846,73 @@ class SlideManager:
                         )
 
                         trans_slide = self.getSlides()[i - 1]
-                        output = self.queue.addItem(
+                        output = self.job.queue.addItem(
                             [tempvideo_end, tempvideo_start],
                             filter,
                             f"{i}_trans_{trans_slide.transition}",
                         )
 
-                        self.tempInputFiles.append(output)
+                        self.job.tempInputFiles.append(output)
                     else:
                         filter_chains.append(filter)
                         videos.append(transition)
                 else:
-                    if self.config["generate_temp"]:
-                        self.tempInputFiles.append(
-                            "{}{}_{}.mp4".format(self.tempFileFullPrefix, i - 1, "end")
+                    if self.useTempFiles():
+                        self.job.tempInputFiles.append(
+                            "{}{}_{}.mp4".format(self.job.tempFileFullPrefix, i - 1, "end")
                         )
-                        self.tempInputFiles.append(
-                            "{}{}_{}.mp4".format(self.tempFileFullPrefix, i, "start")
+                        self.job.tempInputFiles.append(
+                            "{}{}_{}.mp4".format(self.job.tempFileFullPrefix, i, "start")
                         )
                     else:
                         videos.append("[v%send]" % (i - 1))
                         videos.append("[v%sstart]" % (i))
 
             # append video between transitions
-            if "main" in slide.splits:
-                if self.config["generate_temp"]:
-                    self.tempInputFiles.append(
-                        "{}{}_{}.mp4".format(self.tempFileFullPrefix, i, "main")
+            if "main" in self.job.getSplits(i):
+                if self.useTempFiles():
+                    self.job.tempInputFiles.append(
+                        "{}{}_{}.mp4".format(self.job.tempFileFullPrefix, i, "main")
                     )
                 else:
                     videos.append("[v%smain]" % (i))
 
             # on the last slide the end needs to be added (if available)
-            # if "end" in slide.splits and i == len(self.getSlides())-1:
+            # if "end" in self.job.getSplits(i) and i == len(self.getSlides())-1:
             #    videos.append("[v%send]" %(i))
 
         # use input files instead of filter outputs
-        if self.config["generate_temp"]:
+        if self.useTempFiles():
             count = 0
-            while len(self.tempInputFiles) > self.reduceVariable:
-                files = self.tempInputFiles
-                self.tempInputFiles = []
+            while len(self.job.tempInputFiles) > self.job.reduceVariable:
+                files = self.job.tempInputFiles
+                self.job.tempInputFiles = []
                 temp = []
                 for k, video in enumerate(files):
                     temp.append(video)
-                    if len(temp) >= self.reduceVariable:
+                    if len(temp) >= self.job.reduceVariable:
                         filter_names = ["[%s]" % (i) for i in range(len(temp))]
                         filter = "{} concat=n={}".format(
                             "".join(filter_names), len(filter_names)
                         )
 
-                        output = self.queue.addItem(
-                            temp, filter, f"{count}_{k}_combine"
+                        output = self.job.queue.addItem(
+                            temp,
+                            filter,
+                            f"{count}_{k}_combine",
+                            self.job.queue.getFrames(temp),
                         )
 
                         # add concated video
-                        self.tempInputFiles.append(output)
+                        self.job.tempInputFiles.append(output)
 
                         temp = []
 
                 # add remaining files
-                self.tempInputFiles.extend(temp)
+                self.job.tempInputFiles.extend(temp)
                 count = count + 1
 
-            videos = ["[%s:v]" % (i) for i in range(len(self.tempInputFiles))]
+            videos = ["[%s:v]" % (i) for i in range(len(self.job.tempInputFiles))]
 
         subtitles = ""
         # Burn subtitles to last element
@@ -740,6 +927,81 @@ class SlideManager:
 
         return filter_chains
 
+    def getRenditions(self, output_file):
+        # additional outputs (e.g. 720p and 480p of a 1080p slideshow) which are
+        # scaled from the rendered video, so the slides are rendered only once
+        renditions = self.config["renditions"] if "renditions" in self.config else []
+        if renditions and getSegmentFormat(output_file) == DASH:
+            # a player only switches between the representations of one manifest
+            raise ValueError(
+                "Renditions of a DASH output are not supported, use HLS (.m3u8)"
+            )
+        root, extension = os.path.splitext(output_file)
+        result = []
+        for rendition in renditions:
+            width = rendition["width"]
+            # an even height with the aspect ratio of the slideshow
+            height = (
+                rendition["height"]
+                if "height" in rendition
+                else 2
+                * round(
+                    width * self.config["output_height"] / self.config["output_width"] / 2
+                )
+            )
+            if width > self.config["output_width"]:
+                logger.warning(
+                    "The rendition %sx%s is larger than the video, it is upscaled",
+                    width,
+                    height,
+                )
+            suffix = rendition["suffix"] if "suffix" in rendition else "-%sp" % (height)
+            result.append(
+                {
+                    "width": width,
+                    "height": height,
+                    "codec": rendition["codec"]
+                    if "codec" in rendition
+                    else self.config["output_codec"],
+                    "parameters": rendition["parameters"]
+                    if "parameters" in rendition
+                    else self.config["output_parameters"],
+                    "file": "{}{}{}".format(root, suffix, extension),
+                    # the cached video of the rendition (see prepareVideoProcessing)
+                    "key": None,
+                }
+            )
+        return result
+
+    def getRenditionFilterChains(self):
+        # the rendered video (and the mixed audio) is split into the renditions
+        if not self.job.renditions:
+            return []
+
+        count = len(self.job.renditions) + 1
+        chains = [
+            "[out]split={}[vmaster]{}".format(
+                count,
+                "".join("[rendition{}]".format(i) for i in range(count - 1)),
+            )
+        ]
+        for i, rendition in enumerate(self.job.renditions):
+            chains.append(
+                "[rendition{}]{}[rendition{}out]".format(
+                    i,
+                    RENDITION_FILTER.format(rendition["width"], rendition["height"]),
+                    i,
+                )
+            )
+        if self.hasAudioFilter():
+            chains.append(
+                "[aout]asplit={}[amaster]{}".format(
+                    count,
+                    "".join("[arendition{}]".format(i) for i in range(count - 1)),
+                )
+            )
+        return chains
+
     ###################################
     #           Audio                 #
     ###################################
@@ -767,11 +1029,170 @@ class SlideManager:
     def getAudioDuration(self):
         return sum([audio.duration for audio in self.getBackgroundTracks()])
 
+    def useAudioMixer(self):
+        # mix the audio with NumPy instead of the ffmpeg filter graph
+        mixer = self.config["audio_mixer"] if "audio_mixer" in self.config else "ffmpeg"
+        if mixer == "numpy" and not isMixerAvailable():
+            logger.warning("NumPy is not installed, the audio is mixed by ffmpeg")
+            return False
+        return mixer == "numpy"
+
+    def hasAudioFilter(self):
+        # the audio of the final video is mixed in the filter graph
+        return (
+            self.hasAudio()
+            and self.job.audioArtifact is None
+            and self.job.audioMix is None
+        )
+
+    def getAudioInputs(self):
+        # input files of the final video after the slides,
+        # with stream copy the audio is muxed afterwards
+        if self.job.audioArtifact is not None:
+            return []
+        if self.job.audioMix is not None:
+            return [self.job.audioMix]
+        return [track.file for track in self.getBackgroundTracks()]
+
+    def getAudioTimeline(self):
+        # the same timeline as getAudioFilterChains
+        videos = [
+            {
+                "file": slide.file,
+                "start": slide.start if slide.start is not None else 0,
+                "end": slide.end,
+                "offset": self.getOffset(i, False),
+                "fade_in": self.getSlideFadeOutDuration(i - 1, False)
+                if slide.fade_duration > 0
+                else 0,
+                "fade_out_start": self.getSlideFadeOutPosition(i, False),
+                "fade_out": self.getSlideFadeOutDuration(i, False)
+                if slide.fade_duration > 0
+                else 0,
+            }
+            for i, slide in enumerate(self.getSlides())
+            if isinstance(slide, VideoSlide) and slide.has_audio
+        ]
+        background = [track.file for track in self.getBackgroundTracks()]
+        sections = self.getBackgroundSections() if background else []
+        return videos, background, sections
+
+    def mixAudio(self, filename):
+        videos, background, sections = self.getAudioTimeline()
+        mixer = AudioMixer(
+            self.config["ffmpeg"], os.path.join(self.cacheFolder, "audio"), self.governor
+        )
+        return mixer.mix(videos, background, sections, self.getTotalDuration(), filename)
+
+    def useStreamCopy(self):
+        # audio and video are rendered separately and muxed without re-encoding,
+        # which needs the audio of the AudioMixer
+        stream_copy = self.config["stream_copy"] if "stream_copy" in self.config else False
+        return stream_copy and (not self.hasAudio() or self.useAudioMixer())
+
+    def renderAudio(self):
+        # the encoded audio of the timeline, re-used while the timeline is unchanged
+        videos, background, sections = self.getAudioTimeline()
+        key = getKey(
+            [dict(video, file=getFileIdentity(video["file"])) for video in videos],
+            [getFileIdentity(file) for file in background],
+            sections,
+            self.getDurationArguments(),
+            AUDIO_PARAMETERS,
+        )
+        self.job.cached.append((key, AUDIO_EXTENSION))
+        if self.cache.has(key, AUDIO_EXTENSION):
+            logger.debug("Using cached audio %s", key)
+            return self.cache.getPath(key, AUDIO_EXTENSION)
+
+        mix = self.mixAudio(os.path.join(self.job.folder, "temp-kburns-audio.wav"))
+        audio = os.path.join(self.job.folder, "temp-kburns-audio.%s" % (AUDIO_EXTENSION))
+        cmd = [
+            self.config["ffmpeg"],
+            "-hide_banner",
+            "-v error",
+            "-y",
+            '-i "%s"' % (mix),
+            self.getDurationArguments(),
+            AUDIO_PARAMETERS,
+            '"%s"' % (audio),
+        ]
+        if self.governor.call(cmd) != 0 or not os.path.exists(audio):
+            raise ValueError("The audio could not be encoded")
+        return self.cache.put(key, audio, AUDIO_EXTENSION)
+
+    def getVideoKey(self, inputs, temp_filter_script, burnSubtitles, srtFilename, output_file):
+        # the video without audio depends on the inputs, the filter graph and the encoding
+        with open(temp_filter_script) as file:
+            # the renditions are cached by their own keys
+            renditions = self.getRenditionFilterChains()
+            script = ";\n".join(
+                chain for chain in file.read().split(";\n") if chain not in renditions
+            ).replace(self.job.folder, "")
+        subtitles = None
+        if self.hasSubtitles():
+            with open(srtFilename) as file:
+                subtitles = file.read()
+        return getKey(
+            self.job.queue.getInputKeys(inputs),
+            script,
+            burnSubtitles,
+            subtitles,
+            self.getDurationArguments(),
+            self.config["output_codec"],
+            self.config["output_parameters"],
+            os.path.splitext(output_file)[1],
+        )
+
+    def fetchVideo(self, part, key):
+        # a cached video of the same slides is the final video (without audio)
+        extension = os.path.splitext(part)[1][1:]
+        if key is not None and self.cache.has(key, extension):
+            logger.info("Using cached video %s", key)
+            self.cache.fetch(key, part, extension)
+            return True
+        return False
+
+    def muxAudio(self, part, output_file, key):
+        # the video is cached, the output gets the audio without re-encoding
+        extension = os.path.splitext(part)[1][1:]
+        self.cache.put(key, part, extension)
+        self.job.cached.append((key, extension))
+        if self.job.audioArtifact is None:
+            return part
+
+        root, extension = os.path.splitext(output_file)
+        mux = "{}.mux{}".format(root, extension)
+        cmd = [
+            self.config["ffmpeg"],
+            "-hide_banner",
+            "-v error",
+            "-y",
+            '-i "%s"' % (part),
+            '-i "%s"' % (self.job.audioArtifact),
+            "-map 0",
+            "-map 1:a",
+            "-c copy",
+            '"%s"' % (mux),
+        ]
+        with self.profiler.stage("mux", "final"):
+            returncode = self.governor.call(cmd)
+        os.remove(part)
+        if returncode != 0 or not os.path.exists(mux):
+            if os.path.exists(mux):
+                os.remove(mux)
+            return None
+        return mux
+
     def getAudioFilterChains(self):
 
         logger.debug("get Audio Filter Chains")
 
-        offset = len(self.tempInputFiles)
+        # the audio is mixed to a file, see mixAudio
+        if self.useAudioMixer():
+            return []
+
+        offset = len(self.job.tempInputFiles)
 
         filter_chains = []
 
@@ -808,9 +1229,9 @@ class SlideManager:
 
                 input_number = i
                 # append video with sound to input list
-                if self.config["generate_temp"]:
+                if self.useTempFiles():
                     input_number = offset
-                    self.tempInputFiles.append(slide.file)
+                    self.job.tempInputFiles.append(slide.file)
                     offset = offset + 1
 
                 filter_chains.append(
@@ -820,8 +1241,8 @@ class SlideManager:
         # background-tracks
         music_input_offset = (
             len(self.getSlides())
-            if not self.config["generate_temp"]
-            else len(self.tempInputFiles)
+            if not self.useTempFiles()
+            else len(self.job.tempInputFiles)
         )
         background_audio = [
             "[%s:a]" % (i + music_input_offset)
@@ -829,50 +1250,7 @@ class SlideManager:
         ]
 
         if len(background_audio) > 0:
-            # extract background audio sections between videos
-            background_sections = []
-            # is it starting with a video or an image?
-            section_start_slide = (
-                None
-                if isinstance(self.getSlides()[0], VideoSlide) and slide.has_audio
-                else 0
-            )
-            for i, slide in enumerate(self.getSlides()):
-                # is it a video and we have a start value => end of this section
-                if (
-                    isinstance(slide, VideoSlide)
-                    and slide.has_audio
-                    and section_start_slide is not None
-                ):
-                    background_sections.append(
-                        {
-                            "start": self.getOffset(section_start_slide, False),
-                            "fade_in": self.getMusicFadeOutDuration(
-                                section_start_slide - 1
-                            ),
-                            "end": self.getOffset(i, False),
-                            "fade_out": self.getMusicFadeOutDuration(i),
-                        }
-                    )
-                    section_start_slide = None
-
-                # is it a image but the previous one was a video => start new section
-                if isinstance(slide, ImageSlide) and section_start_slide is None:
-                    section_start_slide = i
-
-            # the last section is ending with an image => end of section is end generated video
-            if section_start_slide is not None:
-                background_sections.append(
-                    {
-                        "start": self.getOffset(section_start_slide, False),
-                        "fade_in": self.getMusicFadeOutDuration(
-                            section_start_slide - 1
-                        ),
-                        "end": self.getTotalDuration()
-                        - self.getMusicFadeOutDuration(i),
-                        "fade_out": self.getMusicFadeOutDuration(i),
-                    }
-                )
+            background_sections = self.getBackgroundSections()
 
             if len(background_sections) > 0:
                 # merge background tracks
@@ -925,20 +1303,87 @@ class SlideManager:
 
         return filter_chains
 
+    def getBackgroundSections(self):
+        # extract background audio sections between videos
+        background_sections = []
+        # is it starting with a video or an image?
+        first_slide = self.getSlides()[0]
+        section_start_slide = (
+            None
+            if isinstance(first_slide, VideoSlide) and first_slide.has_audio
+            else 0
+        )
+        for i, slide in enumerate(self.getSlides()):
+            # is it a video and we have a start value => end of this section
+            if (
+                isinstance(slide, VideoSlide)
+                and slide.has_audio
+                and section_start_slide is not None
+            ):
+                background_sections.append(
+                    {
+                        "start": self.getOffset(section_start_slide, False),
+                        "fade_in": self.getMusicFadeOutDuration(
+                            section_start_slide - 1
+                        ),
+                        "end": self.getOffset(i, False),
+                        "fade_out": self.getMusicFadeOutDuration(i),
+                    }
+                )
+                section_start_slide = None
+
+            # is it a image but the previous one was a video => start new section
+            if isinstance(slide, ImageSlide) and section_start_slide is None:
+                section_start_slide = i
+
+        # the last section is ending with an image => end of section is end generated video
+        if section_start_slide is not None:
+            background_sections.append(
+                {
+                    "start": self.getOffset(section_start_slide, False),
+                    "fade_in": self.getMusicFadeOutDuration(section_start_slide - 1),
+                    "end": self.getTotalDuration() - self.getMusicFadeOutDuration(i),
+                    "fade_out": self.getMusicFadeOutDuration(i),
+                }
+            )
+
+        return background_sections
+
+    def getOnsetDetector(self):
+        # the built-in detector replaces aubio, "auto" uses it when aubio is missing
+        detector = (
+            self.config["onset_detector"] if "onset_detector" in self.config else "aubio"
+        )
+        if detector == "auto":
+            aubio = self.config["aubio"] if "aubio" in self.config else "aubioonset"
+            detector = "aubio" if shutil.which(aubio) is not None else "numpy"
+        if detector == "numpy" and not isDetectorAvailable():
+            logger.warning("NumPy is not installed, the onsets are detected by aubio")
+            return None
+        if detector != "numpy":
+            return None
+        return OnsetDetector(self.config["ffmpeg"])
+
     def getTimestampsFromAudio(self):
 
         logger.debug("get Timestamps from Audio Files")
 
+        # the onsets of a track are stored relative to the track
+        onsets = self.onsetIndex.analyze(
+            self.getBackgroundTracks(),
+            self.config["aubio"] if "aubio" in self.config else None,
+            self.governor.cpu_count,
+            self.profiler,
+            self.getOnsetDetector(),
+        )
+
         timestamps = []
         offset = 0
-        for track in self.getBackgroundTracks():
+        for track, track_onsets in zip(self.getBackgroundTracks(), onsets):
             # add beginning of track
             timestamps.append(0 + offset)
             # get timestamps of track
-            timestamps = timestamps + [
-                float(timestamp) + offset
-                for timestamp in track.getTimestamps(self.config["aubio"])
-            ]
+            timestamps = timestamps + [timestamp + offset for timestamp in track_onsets]
             # next track has the offsets after the current
             offset = offset + track.duration
 
@@ -946,6 +1391,35 @@ class SlideManager:
 
         return timestamps
 
+    def getSyncMode(self):
+        # "beam" minimizes the deviation from the slide durations instead of
+        # ending every slide on the first onset after its minimum duration
+        mode = self.config["sync_mode"] if "sync_mode" in self.config else GREEDY
+        if mode not in SYNC_MODES:
+            logger.warning("Unknown sync mode %s, the slides are synced greedily", mode)
+            return GREEDY
+        if mode == BEAM and not isBeamAvailable():
+            logger.warning("NumPy is not installed, the slides are synced greedily")
+            return GREEDY
+        return mode
+
+    def isSyncable(self, slide):
+        # slides with their own audio keep their duration
+        return not slide.has_audio and not isinstance(slide, VideoSlide)
+
+    def getSyncTimeline(self):
+        # the frames, fades and transitions which the offsets depend on
+        slides = self.getSlides()
+        return Timeline(
+            [slide.getFrames() for slide in slides],
+            [slide.fade_duration for slide in slides],
+            [
+                self.getTransition(i, fade_duration=slide.fade_duration)[1]
+                for i, slide in enumerate(slides)
+            ],
+            self.config["fps"],
+        )
+
     def adjustDurationsFromAudio(self):
 
         logger.debug("adjust slide durations")
@@ -958,45 +1432,20 @@ class SlideManager:
         )
 
         # change slide durations
-        timestamp_idx = 0
-        for i, slide in enumerate(self.getSlides()):
-            if (
-                not slide.has_audio
-                and not isinstance(slide, VideoSlide)
-                and timestamp_idx < len(timestamps)
-            ):
-
-                slide_start = self.getOffset(i, False)
-
-                # find the next timestamp after the slide starts
-                # and skip timestamps until the minimum duration is reached
-                no_result = False
-                while (
-                    slide_start >= (timestamps[timestamp_idx])
-                    or (timestamps[timestamp_idx] - slide_start)
-                ) < slide.slide_duration_min:
-                    # is the music long enough?
-                    if (timestamp_idx + 1) < len(timestamps):
-                        timestamp_idx = timestamp_idx + 1
-                    else:
-                        no_result = True
-                        break
-
-                if not no_result:
-                    duration = timestamps[timestamp_idx] - slide_start
-
-                    # the next timestamp is earlier than the initial slide duration
-                    # and after the minimum? => set the new duration
-                    if duration < slide.getDuration():
-                        # extend slide duration for a half fade so that the middle of the transition matches the timestamp
-                        # timestamp matches fade end:    duration
-                        # timestamp matches fade middle: duration + self.getTransitionFrames(i)/2/self.config["fps"]
-                        # timestamp matches fade begin:  duration + self.getTransitionFrames(i)/self.config["fps"]
-                        slide.setDuration(
-                            duration
-                            + self.getTransitionFrames(i) / 2 / self.config["fps"]
-                        )
-                        timestamp_idx = timestamp_idx + 1
+        slides = self.getSlides()
+        frames = solve(
+            timestamps,
+            self.getSyncTimeline(),
+            [
+                slide.slide_duration_min if self.isSyncable(slide) else 0
+                for slide in slides
+            ],
+            [self.isSyncable(slide) for slide in slides],
+            self.getSyncMode(),
+        )
+        for slide, slide_frames in zip(slides, frames):
+            if slide_frames != slide.getFrames():
+                slide.setFrames(slide_frames)
 
         self.config["is_synced_to_audio"] = True
         logger.debug(
@@ -1029,8 +1478,121 @@ class SlideManager:
 
         return frames / self.config["fps"]
 
+    def useTempFiles(self):
+        # without a render plan the configuration decides
+        if self.job.plan is not None:
+            return self.job.plan.useTempFiles()
+        return self.config["generate_temp"]
+
+    def planRender(self):
+        memory = getAvailableMemory()
+        if memory is not None and self.governor.memory_budget is not None:
+            memory = min(memory, self.governor.memory_budget)
+
+        planner = Planner(
+            CostModel.load(os.path.join(self.tempFileFolder, CALIBRATION_FILENAME)),
+            self.governor.cpu_count,
+            memory,
+            getOpenFileLimit(),
+            self.governor.slots,
+            self.governor.threads,
+        )
+        plan = planner.plan(
+            len(self.getSlides()),
+            self.getFinalVideoFrames(),
+            sum(slide.getFrames() for slide in self.getImageSlides()),
+            self.config["output_width"],
+            self.config["output_height"],
+            len(self.getSlides()) + len(self.getBackgroundTracks()),
+            self.config["render_strategy"] if "render_strategy" in self.config else FIXED,
+            self.config["generate_temp"],
+            sum(self.getTransitionFrames(i) for i in range(len(self.getSlides()))),
+        )
+        self.job.planner = planner
+        for line in plan.explain():
+            logger.info(line)
+
+        return plan
+
+    def getEstimate(self):
+        # predicted costs of the render with the planned strategy
+        if self.job.plan is None:
+            self.job.plan = self.planRender()
+        plan = self.job.plan
+        estimate = plan.estimates[plan.strategy]
+        slides = [
+            {
+                "index": i,
+                "file": slide.file,
+                "frames": slide.getFrames(),
+                "image": isinstance(slide, ImageSlide),
+                "transition": slide.transition,
+                "transition_frames": self.getTransitionFrames(i),
+            }
+            for i, slide in enumerate(self.getSlides())
+        ]
+        return {
+            "strategy": plan.strategy,
+            "calibrated": self.job.planner.model.calibrated,
+            "width": self.config["output_width"],
+            "height": self.config["output_height"],
+            "frames": self.getFinalVideoFrames(),
+            "wall": estimate["wall"],
+            "cpu": estimate["cpu"],
+            "memory": estimate["memory"],
+            "disk": estimate["disk"],
+            "slides": self.job.planner.getBreakdown(
+                slides,
+                self.config["output_width"],
+                self.config["output_height"],
+                plan.strategy,
+            ),
+        }
+
+    def getEstimateSummary(self, estimate):
+        lines = [
+            "Estimate (%s strategy, %s cost model):"
+            % (estimate["strategy"], "calibrated" if estimate["calibrated"] else "default"),
+            "  Wall time: %s" % (formatTime(estimate["wall"])),
+            "  CPU time:  %s" % (formatTime(estimate["cpu"])),
+            "  Memory:    %s MB" % (estimate["memory"]),
+            "  Temp disk: %s MB" % (estimate["disk"]),
+            "  %5s %8s %10s %12s  %s"
+            % ("Slide", "Frames", "CPU", "Transition", "File"),
+        ]
+        for slide in estimate["slides"]:
+            lines.append(
+                "  %5s %8s %9.1fs %11.1fs  %s"
+                % (
+                    slide["index"],
+                    slide["frames"],
+                    slide["cpu"],
+                    slide["transition_cpu"],
+                    os.path.basename(slide["file"]),
+                )
+            )
+        return lines
+
+    def warnEstimate(self):
+        # warn before a render which will probably take very long
+        limit = (
+            self.config["estimate_warning"] if "estimate_warning" in self.config else 0
+        )
+        wall = self.job.plan.estimates[self.job.plan.strategy]["wall"]
+        if limit and wall > limit:
+            print(
+                "Warning: the render will take about %s (estimated)" % (formatTime(wall))
+            )
+            logger.warning("The render will take about %s (estimated)", formatTime(wall))
+
     def createVideo(
-        self, output_file, check=False, save=None, test=False, overwrite=False
+        self,
+        output_file,
+        check=False,
+        save=None,
+        test=False,
+        overwrite=False,
+        resume=False,
     ):
         logger.info("Create video %s", output_file)
 
@@ -1068,18 +1630,37 @@ class SlideManager:
             srtFilename,
             inputs,
             temp_filter_script,
-        ) = self.prepareVideoProcessing(output_file)
+        ) = self.prepareVideoProcessing(output_file, test)
+
+        if test:
+            print("\n".join(self.getEstimateSummary(self.getEstimate())))
+        else:
+            self.warnEstimate()
+            if self.shouldValidate():
+                report = self.validate(output_file)
+                if not report["valid"]:
+                    print("\n".join(formatReport(report)))
+                    self.cleanVideoProcessing(temp_filter_script, srtFilename)
+                    return
+            manifest = self.startJob(output_file, resume)
+            self.job.progress.addSink(ConsoleSink())
 
         # create temporary videos
         if not test:
-            for idx, item in enumerate(self.queue.getQueue()):
-                print(f"Processing video {idx}/{self.queue.getQueueLength()}")
-                tempFile = self.queue.createTemporaryVideo(self.config["ffmpeg"], item)
+            processed = []
+
+            def onProcessed(idx, item, tempFile):
+                processed.append(idx)
+                logger.debug(
+                    "Processed video %s/%s", len(processed), self.job.queue.getQueueLength()
+                )
 
                 if tempFile is None:
                     print("Error while creating the temporary video file!")
                     logger.error("Error while creating the temporary video file!")
 
+            self.job.queue.process(self.config["ffmpeg"], self.job.plan.workers, onProcessed)
+
         # Get frames of final video
         frames = self.getFinalVideoFrames()
         print("Number of Frames: %s" % (frames))
@@ -1087,50 +1668,354 @@ class SlideManager:
 
         # Create final video
         if not test:
-            # Run ffmpeg
+            if os.path.exists(output_file) and not overwrite:
+                if (
+                    not input(
+                        "File '%s' already exists. Overwrite? [y/N] " % (output_file)
+                    )
+                    .lower()
+                    .strip()[:1]
+                    == "y"
+                ):
+                    print("Not overwriting - exiting")
+                    self.cleanVideoProcessing(temp_filter_script, srtFilename)
+                    return
+
+            # the playlists and segments of a previous render are replaced
+            for file in [output_file] + [r["file"] for r in self.job.renditions]:
+                if getSegmentFormat(file) is not None:
+                    removeSegments(file)
+
+            # Run ffmpeg (into a part file which is renamed when finished)
             cmd = self.getFinalVideoCommand(
-                output_file,
+                self.getOutputName(output_file),
                 burnSubtitles,
                 srtInput,
                 srtFilename,
                 inputs,
                 temp_filter_script,
-                overwrite,
+                True,
             )
             logger.info("FFMPEG started")
             logger.debug(" ".join(cmd))
-            subprocess.call(" ".join(cmd), shell=True)
+            manifest.setState("final", RUNNING)
+            if self.fetchVideo(getPartName(output_file), self.job.videoKey):
+                missing = [
+                    rendition
+                    for rendition in self.job.renditions
+                    if not self.fetchVideo(
+                        getPartName(rendition["file"]), rendition["key"]
+                    )
+                ]
+                returncode = 0
+                if missing:
+                    with self.profiler.stage("renditions", "final"):
+                        returncode = self.governor.call(
+                            self.getRenditionCommand(getPartName(output_file), missing),
+                            self.job.progress,
+                            "final",
+                        )
+            else:
+                with self.profiler.stage(
+                    "final", "final", depends=self.job.queue.getSuffixes(inputs)
+                ):
+                    returncode = self.governor.call(cmd, self.job.progress, "final")
             logger.info("FFMPEG finished")
 
+            finished = self.finishJob(manifest, output_file, returncode)
+            if "profile" in self.config and self.config["profile"]:
+                self.writeProfile(output_file)
+            if "trace" in self.config and self.config["trace"]:
+                self.writeTrace(output_file)
+
             self.cleanVideoProcessing(temp_filter_script, srtFilename)
+            return finished
+
+        self.cleanVideoProcessing(temp_filter_script, srtFilename)
+
+    def writeProfile(self, output_file):
+        # report next to the output video
+        filename = "%s.profile.json" % (os.path.splitext(output_file)[0])
+        title = "Render profile of %s" % (output_file)
+        labels = {
+            i: os.path.basename(slide.file) for i, slide in enumerate(self.getSlides())
+        }
+        self.profiler.save(filename, title, labels)
+        print("\n".join(self.profiler.getSummary(title, labels)))
+        return filename
+
+    def writeTrace(self, output_file):
+        filename = "%s.trace.json" % (os.path.splitext(output_file)[0])
+        saveTrace(self.profiler, filename)
+        return filename
+
+    def shouldValidate(self):
+        # only long renders are validated first
+        threshold = (
+            self.config["validate_threshold"]
+            if "validate_threshold" in self.config
+            else 0
+        )
+        return threshold > 0 and self.job.plan.estimates[self.job.plan.strategy]["wall"] > threshold
+
+    def validate(self, output_file):
+        # run the same filter graph at a tiny scale to find errors before a long render
+        if getSegmentFormat(output_file) is not None:
+            # the graph of the segments is the same, they are muxed to the null output
+            output_file = "%s.mp4" % (os.path.splitext(output_file)[0])
+        config = getValidationConfig(self.config)
+        sm = SlideManager(config, [], [])
+        sm.slides = [
+            scaleSlide(slide, config["output_width"], config["output_height"])
+            for slide in self.getSlides()
+        ]
+        sm.background_tracks = self.background_tracks
+
+        (
+            burnSubtitles,
+            srtInput,
+            srtFilename,
+            inputs,
+            temp_filter_script,
+        ) = sm.prepareVideoProcessing(output_file)
+        with open(temp_filter_script) as file:
+            chains = file.read().split(";\n")
+        cmd = sm.getFinalVideoCommand(
+            output_file,
+            burnSubtitles,
+            srtInput,
+            srtFilename,
+            inputs,
+            temp_filter_script,
+        )
+        with self.profiler.stage("validate", "graph"):
+            report = validate(cmd, chains, inputs, sm.getSlides(), self.governor)
+        sm.cleanVideoProcessing(temp_filter_script, srtFilename)
+
+        for line in formatReport(report):
+            if report["valid"]:
+                logger.info(line)
+            else:
+                logger.error(line)
+        return report
+
+    def getDefaultJob(self):
+        # without an id the job uses the temporary folder, nothing is created
+        return RenderJob(
+            None,
+            self.tempFileFolder,
+            self.tempFilePrefix,
+            self.cacheFolder,
+            self.config["ffprobe"] if "ffprobe" in self.config else None,
+            self.governor,
+            self.profiler,
+        )
+
+    def newJob(self):
+        jobId = "{}-{}".format(os.getpid(), uuid.uuid4().hex[:8])
+        self.profiler.clear()
+        sinks = list(self.progressSinks)
+        if "progress_log" in self.config and self.config["progress_log"]:
+            sinks.insert(0, JsonLinesSink(self.config["progress_log"]))
+        self.job = RenderJob(
+            jobId,
+            os.path.join(self.jobsFolder, jobId),
+            self.tempFilePrefix,
+            self.cacheFolder,
+            self.config["ffprobe"] if "ffprobe" in self.config else None,
+            self.governor,
+            self.profiler,
+            sinks,
+        )
+        logger.debug("Job %s in %s", self.job.id, self.job.folder)
+
+    def startJob(self, output_file, resume=False):
+        # the job manifest lists the planned videos and their states
+        manifest = JobManifest(
+            getJobManifestFilename(self.tempFileFolder, self.tempFilePrefix, output_file)
+        )
+        if resume and manifest.load():
+            done = [
+                name for name, job in manifest.getJobs().items() if job["state"] == DONE
+            ]
+            logger.info(
+                "Resume render of %s (%s jobs done)", output_file, len(done)
+            )
+            print("Resuming render, %s jobs already done" % (len(done)))
+
+        manifest.setOutput(output_file)
+        manifest.setProject(self.getProject())
+        self.job.queue.setManifest(manifest)
+        manifest.addJob("final")
+        manifest.save()
+
+        # the overall progress covers all temporary videos and the final video
+        for item in self.job.queue.getQueue():
+            self.job.progress.addJob(item["suffix"], item["frames"])
+        self.job.progress.addJob("final", self.getFinalVideoFrames())
+
+        part = getPartName(output_file)
+        if os.path.exists(part):
+            os.remove(part)
+
+        return manifest
+
+    def finishJob(self, manifest, output_file, returncode):
+        outputs = [(output_file, self.job.videoKey)] + [
+            (rendition["file"], rendition["key"]) for rendition in self.job.renditions
+        ]
+        parts = []
+        for file, key in outputs:
+            part = self.getOutputName(file)
+            if returncode == 0 and os.path.exists(part) and key is not None:
+                part = self.muxAudio(part, file, key)
+            parts.append(part)
+
+        # like the temporary videos, every output is verified by its frames
+        frames = self.getOutputFrames()
+        if returncode == 0 and all(
+            part is not None
+            and os.path.exists(part)
+            and self.job.queue.verifyVideo(part, frames)
+            for part in parts
+        ):
+            for (file, _), part in zip(outputs, parts):
+                if part == file:
+                    # a playlist is already complete
+                    continue
+                os.replace(part, file)
+                # the same cached video (hard link) as the previous output is kept
+                if os.path.exists(part):
+                    os.remove(part)
+            if getSegmentFormat(output_file) == HLS and self.job.renditions:
+                writeMasterPlaylist(
+                    output_file,
+                    [
+                        (
+                            output_file,
+                            self.config["output_width"],
+                            self.config["output_height"],
+                        )
+                    ]
+                    + [
+                        (rendition["file"], rendition["width"], rendition["height"])
+                        for rendition in self.job.renditions
+                    ],
+                )
+            manifest.setState("final", DONE)
+            # nothing left to resume
+            manifest.remove()
+            return True
+
+        logger.error("Rendering of %s failed or was cancelled", output_file)
+        manifest.setState("final", FAILED)
+        for (file, _), part in zip(outputs, parts):
+            if getSegmentFormat(file) is not None:
+                removeSegments(file)
+            elif part is not None and os.path.exists(part):
+                os.remove(part)
+        return False
+
+    def prepareVideoProcessing(self, output_file, test=False):
+        renditions = self.getRenditions(output_file)
+
+        # start with an empty job namespace
+        self.newJob()
+
+        # choose between a single filter graph and temporary videos
+        with self.profiler.stage("planRender", "graph"):
+            self.job.plan = self.planRender()
+        self.job.reduceVariable = self.job.plan.reduce_variable
 
-    def prepareVideoProcessing(self, output_file):
         # Subtitles
         burnSubtitles = False if "mkv" in output_file.lower() else True
-        srtInput = len(self.getSlides()) + len(self.getBackgroundTracks())
-        srtFilename = os.path.join(self.tempFileFolder, "temp-kburns-subs.srt")
+        srtFilename = os.path.join(self.job.folder, "temp-kburns-subs.srt")
         if self.hasSubtitles():
             self.createSubtitles(srtFilename)
 
         # Filters
-        video_filters = self.getVideoFilterChains(burnSubtitles, srtFilename)
+        with self.profiler.stage("getVideoFilterChains", "graph"):
+            video_filters = self.getVideoFilterChains(burnSubtitles, srtFilename)
 
         # Get Input Files
         inputs = [slide.file for slide in self.getSlides()]
-        if self.config["generate_temp"]:
-            inputs = self.tempInputFiles
+        if self.useTempFiles():
+            inputs = self.job.tempInputFiles
 
         # Get Audio Filter
-        audio_filters = self.getAudioFilterChains()
+        with self.profiler.stage("getAudioFilterChains", "graph"):
+            audio_filters = self.getAudioFilterChains()
+
+        # the segments of HLS/DASH are muxed while they are encoded
+        streamCopy = self.useStreamCopy() and getSegmentFormat(output_file) is None
+
+        # a dry run only plans the render, the audio is not rendered
+        self.job.audioMix = None
+        self.job.audioArtifact = None
+        if not test and self.hasAudio():
+            if streamCopy:
+                with self.profiler.stage("renderAudio", "audio"):
+                    self.job.audioArtifact = self.renderAudio()
+            elif self.useAudioMixer():
+                with self.profiler.stage("mixAudio", "audio"):
+                    self.job.audioMix = self.mixAudio(
+                        os.path.join(self.job.folder, "temp-kburns-audio.wav")
+                    )
+
+        # the subtitles follow the slides and the audio
+        srtInput = len(inputs) + len(self.getAudioInputs())
+
+        self.job.renditions = renditions
 
         temp_filter_script = os.path.join(
-            self.tempFileFolder, "temp-kburns-video-script.txt"
+            self.job.folder, "temp-kburns-video-script.txt"
         )
         with open("%s" % (temp_filter_script), "w") as file:
-            file.write(";\n".join(video_filters + audio_filters))
+            file.write(
+                ";\n".join(
+                    video_filters + self.getRenditionFilterChains() + audio_filters
+                )
+            )
+
+        if self.useTempFiles():
+            self.updateRenderManifest(output_file)
+
+        self.job.videoKey = None
+        if streamCopy:
+            self.job.videoKey = self.getVideoKey(
+                inputs, temp_filter_script, burnSubtitles, srtFilename, output_file
+            )
+            for rendition in self.job.renditions:
+                rendition["key"] = getKey(
+                    self.job.videoKey,
+                    RENDITION_FILTER.format(rendition["width"], rendition["height"]),
+                    rendition["codec"],
+                    rendition["parameters"],
+                )
 
         return burnSubtitles, srtInput, srtFilename, inputs, temp_filter_script
 
+    def getOutputDuration(self):
+        # start and duration of the output in seconds
+        # if video should be loopable, skip the start fade-in (-ss) and the end fade-out
+        # (video is stopped after the fade-in of the last image which is the same as the first-image)
+        if self.config["loopable"]:
+            return (
+                self.getSlideFadeOutDuration(0) / self.config["fps"],
+                self.getOffset(-1, False),
+            )
+        return None, self.getTotalDuration()
+
+    def getOutputFrames(self):
+        # the frames of the output which is trimmed by getDurationArguments
+        return round(self.getOutputDuration()[1] * self.config["fps"])
+
+    def getDurationArguments(self):
+        start, duration = self.getOutputDuration()
+        if start is not None:
+            return "-ss {} -t {}".format(start, duration)
+        return "-t %s" % (duration)
+
     def getFinalVideoCommand(
         self,
         output_file,
@@ -1149,39 +2034,65 @@ class SlideManager:
             "-y" if overwrite else "",
             # slides
             " ".join(['-i "%s" ' % (f) for f in inputs]),
-            " ".join(
-                ['-i "%s" ' % (track.file) for track in self.getBackgroundTracks()]
-            ),
+            " ".join(['-i "%s" ' % (f) for f in self.getAudioInputs()]),
             # subtitles (only mkv)
             "-i %s" % (srtFilename)
             if self.hasSubtitles() and not burnSubtitles
             else "",
             # filters
             '-filter_complex_script "%s"' % (temp_filter_script),
-            # define duration
-            # if video should be loopable, skip the start fade-in (-ss) and the end fade-out
-            # (video is stopped after the fade-in of the last image which is the same as the first-image)
-            "-ss {} -t {}".format(
-                self.getSlideFadeOutDuration(0) / self.config["fps"],
-                self.getOffset(-1, False),
+        ]
+
+        # the video and the renditions are written in the same run
+        renditions = self.job.renditions
+        cmd.extend(
+            self.getOutputArguments(
+                "[vmaster]" if renditions else "[out]",
+                "[amaster]" if renditions else "[aout]",
+                self.config["output_codec"],
+                self.config["output_parameters"],
+                burnSubtitles,
+                srtInput,
+                inputs,
+                output_file,
+            )
+        )
+        for i, rendition in enumerate(renditions):
+            cmd.extend(
+                self.getOutputArguments(
+                    "[rendition%sout]" % (i),
+                    "[arendition%s]" % (i),
+                    rendition["codec"],
+                    rendition["parameters"],
+                    burnSubtitles,
+                    srtInput,
+                    inputs,
+                    self.getOutputName(rendition["file"]),
+                )
             )
-            if self.config["loopable"]
-            else "-t %s" % (self.getTotalDuration()),
-            # "-t %s" % (self.getTotalDuration()),
+
+        return cmd
+
+    def getOutputArguments(
+        self, video, audio, codec, parameters, burnSubtitles, srtInput, inputs, output_file
+    ):
+        return [
+            # define duration
+            self.getDurationArguments(),
             # define output
             "-map",
-            "[out]:v",
-            "-c:v %s" % (self.config["output_codec"])
-            if self.config["output_codec"]
-            else "",
+            "%s:v" % (video),
+            "-c:v %s" % (codec) if codec else "",
             # "-crf", "0" ,
             # "-preset", "ultrafast",
             # "-tune", "stillimage",
-            self.config["output_parameters"],
-            "-map [aout]:a" if self.hasAudio() else "",
+            parameters,
+            # the mixed audio file follows the slides
+            ("-map %s:a" % (len(inputs)) if self.job.audioMix else "-map %s:a" % (audio))
+            if self.hasAudio() and self.job.audioArtifact is None
+            else "",
             # audio compression and bitrate
-            "-c:a aac" if self.hasAudio() else "",
-            "-b:a 160k" if self.hasAudio() else "",
+            AUDIO_PARAMETERS if self.hasAudio() and self.job.audioArtifact is None else "",
             # map subtitles (only mkv)
             "-map %s:s" % (srtInput)
             if self.hasSubtitles() and not burnSubtitles
@@ -1190,21 +2101,105 @@ class SlideManager:
             "-disposition:s:s:0 default"
             if self.hasSubtitles() and not burnSubtitles
             else "",
+            # HLS/DASH segments
+            " ".join(
+                getSegmentArguments(
+                    output_file,
+                    self.getSegmentBoundaries(),
+                    self.config["fps"],
+                    self.config["segment_duration"]
+                    if "segment_duration" in self.config
+                    else SEGMENT_DURATION,
+                )
+            )
+            if getSegmentFormat(output_file) is not None
+            else "",
+            # the threads of a slot are shared by all outputs
+            "-threads %s" % (self.governor.threads),
             '"%s"' % (output_file),
         ]
 
+    def getOutputName(self, output_file):
+        # a playlist is written in place while its segments are encoded,
+        # a video is written to a part file which is renamed when it is finished
+        if getSegmentFormat(output_file) is not None:
+            return output_file
+        return getPartName(output_file)
+
+    def getSegmentBoundaries(self):
+        # the start (seconds) of every slide in the output, with a loopable video
+        # the output starts after the fade-in of the first slide
+        fps = self.config["fps"]
+        if self.config["loopable"]:
+            start = self.getSlideFadeOutDuration(0)
+            end = self.getOffset(-1) - start
+        else:
+            start = 0
+            end = self.getFinalVideoFrames()
+        # half a frame early, the keyframe is the first frame after the boundary
+        return [
+            (self.getOffset(i) - start - 0.5) / fps
+            for i in range(1, len(self.getSlides()))
+            if 0 < self.getOffset(i) - start < end
+        ]
+
+    def getRenditionCommand(self, video, renditions):
+        # the renditions which are not cached are scaled from the cached video
+        chains = [
+            "[0:v]split={}{}".format(
+                len(renditions),
+                "".join("[rendition{}]".format(i) for i in range(len(renditions))),
+            )
+        ] + [
+            "[rendition{}]{}[rendition{}out]".format(
+                i,
+                RENDITION_FILTER.format(rendition["width"], rendition["height"]),
+                i,
+            )
+            for i, rendition in enumerate(renditions)
+        ]
+        cmd = [
+            self.config["ffmpeg"],
+            "-hide_banner",
+            "-stats",
+            "-y",
+            '-i "%s"' % (video),
+            '-filter_complex "%s"' % (";".join(chains)),
+        ]
+        for i, rendition in enumerate(renditions):
+            cmd.extend(
+                [
+                    "-map",
+                    "[rendition%sout]:v" % (i),
+                    "-c:v %s" % (rendition["codec"]) if rendition["codec"] else "",
+                    rendition["parameters"],
+                    # the subtitles of a mkv
+                    "-map 0:s?",
+                    "-c:s copy",
+                    "-threads %s" % (self.governor.threads),
+                    '"%s"' % (getPartName(rendition["file"])),
+                ]
+            )
         return cmd
 
     def cleanVideoProcessing(self, temp_filter_script=None, srtFilename=None):
         logger.info("Clean Video processing")
-        self.queue.clean(self.config["delete_temp"])
-        self.tempInputFiles = []
-
+        self.job.queue.clean(self.config["delete_temp"])
         if self.config["delete_temp"]:
-            if temp_filter_script is not None and os.path.exists(temp_filter_script):
-                os.remove(temp_filter_script)
-            if srtFilename is not None and os.path.exists(srtFilename):
-                os.remove(srtFilename)
+            # the final videos and the audio are cached like the temporary videos
+            for key, extension in self.job.cached:
+                self.cache.remove(key, extension)
+        self.job.cached = []
+        self.job.tempInputFiles = []
+        self.job.progress.close()
+
+        for file in [temp_filter_script, srtFilename]:
+            if file is not None and os.path.exists(file):
+                os.remove(file)
+        # the job namespace is not needed after the render, a render is resumed
+        # from the cache
+        if self.job.id is not None and os.path.exists(self.job.folder):
+            shutil.rmtree(self.job.folder, ignore_errors=True)
 
     def getFinalVideoFrames(self):
         if len(self.getSlides()) <= 0:
@@ -1214,13 +2209,111 @@ class SlideManager:
 
         return last_slide_start + last_slide.getFrames()
 
+    ###################################
+    #       Incremental Render        #
+    ###################################
+    def getRenderManifestFilename(self, output_file):
+        # the previous render of the same output is the base for the diff
+        return os.path.join(
+            self.tempFileFolder,
+            "{}render-{}.json".format(
+                self.tempFilePrefix, getKey(os.path.abspath(output_file))[:12]
+            ),
+        )
+
+    def getRenderManifest(self):
+        segments = {
+            str(item["suffix"]): item["key"] for item in self.job.queue.getQueue()
+        }
+
+        # the audio is mixed in the final render, describe what goes into it
+        audio = {
+            "tracks": [
+                getFileIdentity(track.file) for track in self.getBackgroundTracks()
+            ],
+            "videos": [
+                {
+                    "file": getFileIdentity(slide.file),
+                    "filter": slide.getAudioFilter(),
+                    "offset": self.getOffset(i, False),
+                    "fade_in": self.getSlideFadeOutDuration(i - 1, False),
+                    "fade_out": self.getSlideFadeOutDuration(i, False),
+                }
+                for i, slide in enumerate(self.getSlides())
+                if isinstance(slide, VideoSlide) and slide.has_audio
+            ],
+            "sections": self.getBackgroundSections()
+            if len(self.getSlides()) > 0 and len(self.getBackgroundTracks()) > 0
+            else [],
+        }
+
+        return {"segments": segments, "audio": audio}
+
+    def getRenderDiff(self, previous, current):
+        # segments are compared by content, so a moved slide is still unchanged
+        previous_keys = set(previous["segments"].values()) if previous else set()
+
+        changed = []
+        unchanged = []
+        for name, key in current["segments"].items():
+            if key in previous_keys:
+                unchanged.append(name)
+            else:
+                changed.append(name)
+
+        return {
+            "changed": changed,
+            "unchanged": unchanged,
+            "audio_changed": previous is None or previous["audio"] != current["audio"],
+        }
+
+    def updateRenderManifest(self, output_file):
+        filename = self.getRenderManifestFilename(output_file)
+
+        previous = None
+        if os.path.exists(filename):
+            try:
+                with open(filename) as file:
+                    previous = json.load(file)
+            except ValueError:
+                logger.warning("Render manifest %s is not readable", filename)
+
+        current = self.getRenderManifest()
+        # JSON has no tuples, compare the serialized form
+        current = json.loads(json.dumps(current))
+        diff = self.getRenderDiff(previous, current)
+
+        logger.info(
+            "Render diff: %s of %s segments changed (%s), audio changed: %s",
+            len(diff["changed"]),
+            len(current["segments"]),
+            ", ".join(diff["changed"]),
+            diff["audio_changed"],
+        )
+        if previous is not None:
+            print(
+                "Re-rendering {} of {} segments".format(
+                    len(diff["changed"]), len(current["segments"])
+                )
+            )
+
+        with open(filename, "w") as file:
+            json.dump(current, file, indent=4)
+
+        return diff
+
     ###################################
     #           Config                #
     ###################################
     def saveConfig(self, filename):
         logger.info("Save config to %s", filename)
 
-        content = {
+        content = self.getProject()
+        with open("%s" % (filename), "w") as file:
+            json.dump(content, file, indent=4)
+
+    def getProject(self):
+        return {
             "config": {
                 "output_width": self.config["output_width"],
                 "output_height": self.config["output_height"],
@@ -1251,11 +2344,17 @@ class SlideManager:
                 "sync_titles_to_slides": self.config["sync_titles_to_slides"],
                 "is_synced_to_audio": self.config["is_synced_to_audio"],
             },
-            "slides": [slide.getObject(self.config) for slide in self.slides],
+            # the copy of the first slide is added again to a loopable slideshow
+            "slides": [
+                slide.getObject(self.config)
+                for slide in (
+                    self.slides[:-1]
+                    if self.config["loopable"] and len(self.slides) > 0
+                    else self.slides
+                )
+            ],
             "audio": [track.getObject() for track in self.getBackgroundTracks()],
         }
-        with open("%s" % (filename), "w") as file:
-            json.dump(content, file, indent=4)
 
     ###################################
     #           Subtitles             #
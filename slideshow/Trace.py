@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+
+import json
+import logging
+
+logger = logging.getLogger("kburns-slideshow")
+
+# stages which are connected by their dependencies
+JOB_CATEGORIES = ["slide", "transition", "combine", "final"]
+
+
+def getTraceEvents(profiler):
+    # spans of the profiler stages in the Chrome trace event format,
+    # one track per thread (worker)
+    events = [
+        {
+            "ph": "M",
+            "name": "process_name",
+            "pid": 1,
+            "args": {"name": "kburns-slideshow"},
+        }
+    ]
+    tracks = {}
+    jobs = {}
+    stages = sorted(profiler.getStages(), key=lambda s: s["start"])
+
+    for record in stages:
+        if record["thread"] not in tracks:
+            tracks[record["thread"]] = len(tracks) + 1
+            events.append(
+                {
+                    "ph": "M",
+                    "name": "thread_name",
+                    "pid": 1,
+                    "tid": tracks[record["thread"]],
+                    "args": {"name": record["thread"]},
+                }
+            )
+
+        args = dict(record["args"])
+        args.update(
+            {
+                "cpu": record["cpu"],
+                "ffmpeg_cpu": record["children_cpu"],
+                "peak_rss_mb": record["peak_rss_mb"],
+            }
+        )
+        events.append(
+            {
+                "ph": "X",
+                "name": record["name"],
+                "cat": record["category"],
+                "ts": int(record["start"] * 1000000),
+                "dur": max(1, int(record["wall"] * 1000000)),
+                "pid": 1,
+                "tid": tracks[record["thread"]],
+                "args": args,
+            }
+        )
+        if record["category"] in JOB_CATEGORIES:
+            jobs[record["name"]] = record
+
+    # arrows from the end of a job to the start of the jobs using its output
+    flow = 0
+    for record in stages:
+        for dependency in record["args"].get("depends", []):
+            if str(dependency) not in jobs:
+                # cached videos have no span
+                continue
+            source = jobs[str(dependency)]
+            flow = flow + 1
+            events.append(
+                {
+                    "ph": "s",
+                    "name": "dependency",
+                    "cat": "dependency",
+                    "id": flow,
+                    "ts": int((source["start"] + source["wall"]) * 1000000) - 1,
+                    "pid": 1,
+                    "tid": tracks[source["thread"]],
+                }
+            )
+            events.append(
+                {
+                    "ph": "f",
+                    "bp": "e",
+                    "name": "dependency",
+                    "cat": "dependency",
+                    "id": flow,
+                    "ts": int(record["start"] * 1000000),
+                    "pid": 1,
+                    "tid": tracks[record["thread"]],
+                }
+            )
+
+    return events
+
+
+def saveTrace(profiler, filename):
+    # open with https://ui.perfetto.dev or chrome://tracing
+    with open(filename, "w") as file:
+        json.dump(
+            {"traceEvents": getTraceEvents(profiler), "displayTimeUnit": "ms"},
+            file,
+            default=str,
+        )
+    logger.info("Trace written to %s", filename)
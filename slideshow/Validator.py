@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+
+import copy
+import logging
+import re
+import subprocess
+
+from .ImageSlide import ImageSlide
+from .VideoSlide import VideoSlide
+
+logger = logging.getLogger("kburns-slideshow")
+
+# the graph is validated at this width (the height keeps the aspect ratio) and frame rate
+VALIDATION_WIDTH = 64
+VALIDATION_FPS = 5
+# one frame of fade-in, main part and fade-out per slide
+VALIDATION_FADE = 0.2
+VALIDATION_DURATION = 0.6
+
+# the output of a validation, nothing is written
+NULL_OUTPUT = "-f null -"
+
+
+def getValidationSize(width, height):
+    # libx264 needs an even height
+    return VALIDATION_WIDTH, max(2, 2 * round(VALIDATION_WIDTH * height / width / 2))
+
+
+def getValidationConfig(config):
+    width, height = getValidationSize(config["output_width"], config["output_height"])
+    validation = dict(config)
+    validation.update(
+        {
+            "output_width": width,
+            "output_height": height,
+            "fps": VALIDATION_FPS,
+            "slide_duration": VALIDATION_DURATION,
+            "slide_duration_min": VALIDATION_DURATION,
+            "fade_duration": VALIDATION_FADE,
+            # the single graph contains every chain of the slideshow
+            "render_strategy": "single",
+            "generate_temp": False,
+            "delete_temp": True,
+            "progress_log": "",
+            "profile": False,
+            "trace": False,
+            "estimate_warning": 0,
+            "validate_threshold": 0,
+            "stream_copy": False,
+            # the null muxer is the only output
+            "renditions": [],
+        }
+    )
+    return validation
+
+
+def scaleOverlay(overlay, factor, size_factor):
+    # the overlay timing is relative to the start of the slide
+    if overlay is None:
+        return None
+    overlay = dict(overlay)
+    for key in ["duration", "offset"]:
+        if key in overlay:
+            overlay[key] = round(overlay[key] * factor, 3)
+    if "font_size" in overlay:
+        overlay["font_size"] = max(1, int(overlay["font_size"] * size_factor))
+    return overlay
+
+
+def scaleSlide(slide, width, height):
+    # copy of the slide with the same filters at the validation scale
+    scaled = copy.copy(slide)
+    factor = VALIDATION_DURATION / slide.getDuration() if slide.getDuration() > 0 else 1
+    size_factor = height / slide.output_height
+
+    scaled.output_width = width
+    scaled.output_height = height
+    scaled.output_ratio = width / height
+    scaled.fps = VALIDATION_FPS
+    # a disabled fade stays disabled
+    scaled.fade_duration = VALIDATION_FADE if slide.fade_duration > 0 else 0
+    scaled.overlay_text = scaleOverlay(slide.overlay_text, factor, size_factor)
+    scaled.overlay_color = scaleOverlay(slide.overlay_color, factor, 1)
+
+    if isinstance(slide, ImageSlide):
+        scaled.slide_duration_min = VALIDATION_DURATION
+        scaled.setDuration(VALIDATION_DURATION)
+    elif isinstance(slide, VideoSlide):
+        start = slide.start if slide.start is not None else 0
+        if start + VALIDATION_DURATION < slide.video_duration:
+            scaled.end = start + VALIDATION_DURATION
+        scaled.calculateDurationAfterTrimming()
+        if not scaled.is_trimmed:
+            scaled.setDuration(scaled.video_duration)
+    return scaled
+
+
+def getValidationCommand(cmd):
+    # only errors on stderr, the output goes to the null muxer
+    cmd = [c for c in cmd if c not in ["-stats", "-hide_banner"]]
+    return [cmd[0], "-hide_banner", "-nostats", "-v error"] + cmd[1:-1] + [NULL_OUTPUT]
+
+
+def splitFilters(chain):
+    # filters of a chain, commas in quotes, escaped and inside labels do not separate
+    filters = []
+    current = ""
+    quoted = False
+    label = False
+    escaped = False
+    for char in chain:
+        if escaped:
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char == "'":
+            quoted = not quoted
+        elif not quoted and char == "[":
+            label = True
+        elif not quoted and char == "]":
+            label = False
+        elif not quoted and not label and char == ",":
+            filters.append(current)
+            current = ""
+            continue
+        current += char
+    filters.append(current)
+    return [f for f in filters if f.strip()]
+
+
+def getFilterChain(chains, index):
+    # ffmpeg names the filters Parsed_<name>_<index> in the order of the graph
+    count = 0
+    for i, chain in enumerate(chains):
+        count += len(splitFilters(chain))
+        if index < count:
+            return i
+    return None
+
+
+def getChainSlide(chain, slides):
+    # the labels of a chain start with the index of its slide,
+    # a transition belongs to the slide before it ([v<i>end] [v<i+1>start])
+    if chain.endswith("[out]") or chain.endswith("[aout]"):
+        # the concat of all slides
+        return None
+    match = re.search(r"\[(?:v|a)?(\d+)(?::[va]|end|start|main|out|trans|\])", chain)
+    if match is None:
+        return None
+    index = int(match.group(1))
+    return index if index < slides else None
+
+
+def findFailingChain(errors, chains, inputs):
+    # the chain (index) of the first error ffmpeg reports, or None
+    match = re.search(r"Parsed_\w+?_(\d+) @", errors)
+    if match is not None:
+        return getFilterChain(chains, int(match.group(1)))
+
+    match = re.search(r"No such filter: '([^']+)'", errors)
+    if match is not None:
+        for i, chain in enumerate(chains):
+            if re.search(r"(^|[\],\s])%s(=|,|\[|\s|$)" % re.escape(match.group(1)), chain):
+                return i
+
+    match = re.search(r"around: (.+)", errors)
+    if match is not None:
+        for i, chain in enumerate(chains):
+            if match.group(1).strip() in chain:
+                return i
+
+    # a broken input is used by the chain of its slide
+    for i, file in enumerate(inputs):
+        if file in errors:
+            for k, chain in enumerate(chains):
+                if chain.startswith("[%s:" % (i)):
+                    return k
+    return None
+
+
+def validate(cmd, chains, inputs, slides, governor=None):
+    # run the graph to the null muxer and report the failing chain
+    cmd = getValidationCommand(cmd)
+    if governor is not None:
+        with governor.acquire() as slot:
+            result = runValidation(governor.getCommand(cmd, slot))
+    else:
+        result = runValidation(cmd)
+    returncode, errors = result
+
+    report = {
+        "valid": returncode == 0,
+        "returncode": returncode,
+        "errors": errors.strip().splitlines()[-10:],
+        "chain": None,
+        "chain_index": None,
+        "slide": None,
+        "file": None,
+    }
+    if returncode != 0:
+        index = findFailingChain(errors, chains, inputs)
+        if index is not None:
+            report["chain_index"] = index
+            report["chain"] = chains[index]
+            report["slide"] = getChainSlide(chains[index], len(slides))
+            if report["slide"] is not None:
+                report["file"] = slides[report["slide"]].file
+    return report
+
+
+def runValidation(cmd):
+    p = subprocess.run(" ".join(cmd), shell=True, capture_output=True)
+    return p.returncode, p.stderr.decode(errors="replace")
+
+
+def formatReport(report):
+    if report["valid"]:
+        return ["Filter graph is valid"]
+    lines = ["Filter graph is invalid (ffmpeg exit code %s)" % (report["returncode"])]
+    if report["slide"] is not None:
+        lines.append("  Slide %s: %s" % (report["slide"], report["file"]))
+    if report["chain"] is not None:
+        lines.append("  Chain %s: %s" % (report["chain_index"], report["chain"]))
+    lines.extend("  %s" % (line) for line in report["errors"])
+    return lines
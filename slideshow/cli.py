@@ -6,6 +6,9 @@ import logging
 import os
 import pkgutil
 
+from .JobManifest import getJobManifestFilename
+from .JobManifest import JobManifest
+
 logger = logging.getLogger("kburns-slideshow")
 
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
@@ -160,6 +163,36 @@ class CLI:
 
         self.parser.add_argument("-s", "--save", metavar="FILE", help="save settings")
 
+        self.parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue an interrupted rendering of the output file",
+        )
+
+        self.parser.add_argument(
+            "--trace",
+            action="store_true",
+            help="Write a trace of the rendering next to the output file",
+        )
+
+        self.parser.add_argument(
+            "--estimate",
+            action="store_true",
+            help="Only print the estimated costs of the rendering as JSON",
+        )
+
+        self.parser.add_argument(
+            "--validate",
+            action="store_true",
+            help="Only run the filter graph at a tiny scale to find errors",
+        )
+
+        self.parser.add_argument(
+            "--draft",
+            action="store_true",
+            help="Render a fast, small draft with the same timing",
+        )
+
         self.parser.add_argument(
             "-test",
             action="store_true",
@@ -174,7 +207,16 @@ class CLI:
         input_files = []
         audio_files = []
 
-        if args.input_files is not None:
+        # an interrupted render continues with the saved project of the render
+        project = self.getResumeProject(args.output_file) if args.resume else None
+
+        if project is not None:
+            logger.debug("Resume from job manifest")
+            self.config.update(project["config"])
+            input_files = project["slides"]
+            audio_files = project["audio"]
+
+        elif args.input_files is not None:
             input_files = args.input_files
             logger.debug("Load Files from command line: %s", input_files)
 
@@ -284,8 +326,52 @@ class CLI:
         if args.test is True:
             logger.debug("Set Testmode")
 
+        self.config["resume"] = args.resume
+        if args.resume is True:
+            logger.debug("Set resume")
+
+        self.config["estimate"] = args.estimate
+        if args.estimate is True:
+            logger.debug("Set estimate")
+
+        self.config["validate"] = args.validate
+        if args.validate is True:
+            logger.debug("Set validate")
+
+        if args.trace is True:
+            self.config["trace"] = True
+            logger.debug("Set trace")
+
+        if args.draft is True:
+            self.config["quality"] = "draft"
+            logger.debug("Set draft")
+
         self.config["save"] = args.save
 
         logger.debug("Save config: %s", args.save)
 
         return self.config, input_files, audio_files, args.output_file
+
+    def getResumeProject(self, output_file):
+        temp_file_folder = (
+            self.config["temp_file_folder"]
+            if "temp_file_folder" in self.config
+            else "temp"
+        )
+        if not os.path.isabs(temp_file_folder):
+            temp_file_folder = os.path.join(PROJECT_ROOT, temp_file_folder)
+        temp_file_prefix = (
+            self.config["temp_file_prefix"]
+            if "temp_file_prefix" in self.config
+            else "temp-kburns-"
+        )
+
+        manifest = JobManifest(
+            getJobManifestFilename(temp_file_folder, temp_file_prefix, output_file)
+        )
+        if not manifest.load() or manifest.getProject() is None:
+            print("No interrupted render of %s found" % (output_file))
+            logger.info("No interrupted render of %s found", output_file)
+            return None
+
+        return manifest.getProject()
@@ -0,0 +1,96 @@
+"""
+Tests for the offline audio mixer of the background tracks and video slides.
+"""
+import os
+import shutil
+import tempfile
+import wave
+from unittest import TestCase
+
+import numpy as np
+
+from slideshow.AudioMixer import AudioMixer
+from slideshow.AudioMixer import CHANNELS
+from slideshow.AudioMixer import getFadeGain
+from slideshow.AudioMixer import getSectionGain
+from slideshow.AudioMixer import PCM_EXTENSION
+from slideshow.AudioMixer import readSamples
+from slideshow.AudioMixer import SAMPLE_RATE
+
+
+class TestAudioMixer(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.mixer = AudioMixer("ffmpeg", os.path.join(self.temp_dir, "cache"))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def addSource(self, name, value, seconds):
+        # a source with constant samples which is already decoded
+        file = os.path.join(self.temp_dir, name)
+        with open(file, "w") as source:
+            source.write(name)
+        pcm = np.full((int(seconds * SAMPLE_RATE), CHANNELS), value, dtype="<f4")
+        pcm.tofile(
+            self.mixer.cache.getPath(self.mixer.getPcmKey(file), PCM_EXTENSION)
+        )
+        return file
+
+    def test_gains(self):
+        """
+        Test that the fades are linear like afade.
+        """
+        times = np.array([0, 0.5, 1, 2, 2.5, 3, 4])
+        gain = getFadeGain(times, 1, 2, 1)
+        np.testing.assert_allclose(gain, [0, 0.5, 1, 1, 0.5, 0, 0])
+
+        gain = getSectionGain(times, [{"start": 1, "fade_in": 1, "end": 3, "fade_out": 0}])
+        np.testing.assert_allclose(gain, [0, 0, 0, 1, 1, 0, 0])
+
+    def test_read_concatenated(self):
+        """
+        Test that the background tracks are read as one stream.
+        """
+        first = np.ones((3, CHANNELS), dtype=np.float32)
+        second = np.full((2, CHANNELS), 2, dtype=np.float32)
+        block = readSamples([first, second], 2, 7)
+        np.testing.assert_allclose(block[:, 0], [1, 2, 2, 0, 0])
+
+    def test_mix(self):
+        """
+        Test that the sources are decoded once, placed on the timeline and
+        divided by the number of inputs like amix.
+        """
+        music = self.addSource("music.mp3", 0.5, 4)
+        video = self.addSource("video.mp4", 0.25, 4)
+        output = os.path.join(self.temp_dir, "mix.wav")
+
+        self.mixer.mix(
+            [
+                {
+                    "file": video,
+                    "start": 1,
+                    "end": 2,
+                    "offset": 2,
+                    "fade_in": 0,
+                    "fade_out_start": 1,
+                    "fade_out": 0,
+                }
+            ],
+            [music],
+            [{"start": 0, "fade_in": 0, "end": 1, "fade_out": 0}],
+            3,
+            output,
+        )
+
+        with wave.open(output) as file:
+            self.assertEqual(file.getframerate(), SAMPLE_RATE)
+            self.assertEqual(file.getnframes(), 3 * SAMPLE_RATE)
+            samples = np.frombuffer(file.readframes(file.getnframes()), dtype="<i2")
+        samples = samples.reshape(-1, CHANNELS)[:, 0] / 32767
+
+        # background section (0-1s), silence, video (2-3s), both halved
+        self.assertAlmostEqual(samples[SAMPLE_RATE // 2], 0.25, places=3)
+        self.assertAlmostEqual(samples[SAMPLE_RATE + SAMPLE_RATE // 2], 0, places=3)
+        self.assertAlmostEqual(samples[2 * SAMPLE_RATE + SAMPLE_RATE // 2], 0.125, places=3)
@@ -0,0 +1,126 @@
+"""
+Tests for the solver which syncs the slide durations to the audio onsets.
+"""
+import random
+import time
+
+import numpy as np
+
+from slideshow import PROJECT_ROOT
+from slideshow.BeatSync import getDurationFramesArray
+from slideshow.BeatSync import getNextOnset
+from slideshow.BeatSync import solveGreedy
+from slideshow.BeatSync import solveBeam
+from slideshow.BeatSync import Timeline
+from slideshow.Slide import getDurationFrames
+from slideshow.VideoSlide import VideoSlide
+
+IMAGE = str(PROJECT_ROOT / "tests" / "fixtures" / "img_001.jpeg")
+
+
+def adjustDurations(sm, timestamps):
+    # the slide by slide implementation which the greedy solver replaces
+    timestamp_idx = 0
+    for i, slide in enumerate(sm.getSlides()):
+        if (
+            not slide.has_audio
+            and not isinstance(slide, VideoSlide)
+            and timestamp_idx < len(timestamps)
+        ):
+            slide_start = sm.getOffset(i, False)
+            no_result = False
+            while (
+                slide_start >= (timestamps[timestamp_idx])
+                or (timestamps[timestamp_idx] - slide_start)
+            ) < slide.slide_duration_min:
+                if (timestamp_idx + 1) < len(timestamps):
+                    timestamp_idx = timestamp_idx + 1
+                else:
+                    no_result = True
+                    break
+            if not no_result:
+                duration = timestamps[timestamp_idx] - slide_start
+                if duration < slide.getDuration():
+                    slide.setDuration(
+                        duration + sm.getTransitionFrames(i) / 2 / sm.config["fps"]
+                    )
+                    timestamp_idx = timestamp_idx + 1
+
+
+class TestBeatSync:
+    def test_next_onset(self):
+        """
+        Test that an onset before the slide only ends the search when the
+        minimum duration is not above one second, like the original loop.
+        """
+        onsets = [1, 2, 3.5, 6]
+        assert getNextOnset(onsets, 0, 2, 1.5) == 2
+        assert getNextOnset(onsets, 0, 2, 1) == 0
+        assert getNextOnset(onsets, 2, 2, 1) == 2
+        assert getNextOnset(onsets, 0, 5, 2) is None
+        assert getNextOnset([6, 1, 2, 3.5], 1, 2, 1.5, False) == 3
+
+    def test_greedy_matches_original(self, stub_manager):
+        """
+        Test that the greedy solver sets the same frames as the slide by slide search.
+        """
+        sm = stub_manager([IMAGE] * 20, probe=True)
+        slides = list(sm.getSlides())
+
+        for _ in range(50):
+            sm.slides = slides[: random.randint(1, len(slides))]
+            for slide in sm.getSlides():
+                slide.fade_duration = random.choice([0, 0.5, 1])
+                slide.slide_duration_min = random.choice([0.5, 1, 2])
+                slide.setDuration(random.choice([1, 2, 3.33, 5.27]))
+                slide.has_audio = random.random() < 0.1
+            requested = [slide.getFrames() for slide in sm.getSlides()]
+            timestamps = sorted(
+                round(random.uniform(0, 60), 3) for _ in range(random.randint(0, 80))
+            )
+
+            adjustDurations(sm, timestamps)
+            expected = [slide.getFrames() for slide in sm.getSlides()]
+            for slide, frames in zip(sm.getSlides(), requested):
+                slide.setFrames(frames)
+
+            sm.getTimestampsFromAudio = lambda: timestamps
+            sm.adjustDurationsFromAudio()
+            assert [slide.getFrames() for slide in sm.getSlides()] == expected
+
+    def test_beam(self):
+        """
+        Test that the beam search deviates less from the requested durations
+        and still ends the slides on onsets after their minimum duration.
+        """
+        count = 200
+        onsets = np.sort(np.random.default_rng(0).uniform(0, count * 4, count * 6))
+        timeline = Timeline([240] * count, [1] * count, [60] * count, 60)
+        minimums = [1] * count
+
+        greedy = np.array(solveGreedy(onsets, timeline, minimums, [True] * count))
+        beam = np.array(solveBeam(onsets, timeline, minimums, [True] * count))
+        assert np.abs(beam - 240).sum() < np.abs(greedy - 240).sum() / 2
+        assert (beam >= 60).all()
+
+    def test_frames(self):
+        """
+        Test that the durations of an array are rounded like a single one.
+        """
+        durations = np.array([0, 0.004, 0.99, 1.016, 2.5, 3.333333, 10.999])
+        for fps in [24, 25, 30, 60]:
+            assert getDurationFramesArray(durations, fps).tolist() == [
+                getDurationFrames(duration, fps) for duration in durations.tolist()
+            ]
+
+    def test_many_slides(self):
+        """
+        Test that 10,000 slides are synced to a long mix in a fraction of a second.
+        """
+        count = 10000
+        onsets = np.sort(np.random.default_rng(0).uniform(0, count * 4, count * 8))
+        timeline = Timeline([240] * count, [1] * count, [60] * count, 60)
+
+        start = time.perf_counter()
+        solveGreedy(onsets, timeline, [1] * count, [True] * count)
+        assert time.perf_counter() - start < 1
@@ -0,0 +1,69 @@
+"""
+Tests for the comparison of benchmark results and the calibration of the
+cost model from the profile of a render.
+"""
+from unittest import TestCase
+
+from benchmarks.calibrate import calibrate
+from benchmarks.calibrate import DECODE_SHARE
+from benchmarks.compare import compare
+
+
+def getStage(name, category, frames, children_cpu, wall=1.0, rss=100, depends=None):
+    return {
+        "name": name,
+        "category": category,
+        "wall": wall,
+        "children_cpu": children_cpu,
+        "peak_rss_mb": rss,
+        "args": {"frames": frames, "depends": depends or []},
+    }
+
+
+class TestBenchmarks(TestCase):
+    def test_compare(self):
+        """
+        Test that only slowdowns beyond the threshold are regressions.
+        """
+        baseline = {"metrics": {"a": 1.0, "b": 1.0, "c": 1.0, "d": 0.001}}
+        current = {"metrics": {"a": 1.1, "b": 1.5, "c": 0.5, "d": 0.002, "e": 1.0}}
+
+        rows, regressions = compare(baseline, current, threshold=0.2)
+        status = {row[0]: row[4] for row in rows}
+
+        self.assertEqual(regressions, ["b"])
+        self.assertEqual(status["a"], "")
+        self.assertEqual(status["c"], "faster")
+        # below the minimum difference
+        self.assertEqual(status["d"], "")
+        self.assertEqual(status["e"], "new")
+
+    def test_calibrate(self):
+        """
+        Test that the coefficients are derived per frame and megapixel.
+        """
+        details = {
+            "1000x1000-temp": {
+                "width": 1000,
+                "height": 1000,
+                "stages": [
+                    getStage("0", "slide", 100, 5.0, wall=2.5, rss=300),
+                    getStage("0_main", "slide", 100, 1.0),
+                    getStage("0_9_combine", "combine", 200, 2.0, rss=400, depends=["1", "2"]),
+                    getStage("0_trans_fade", "transition", 30, 1.0),
+                ],
+            }
+        }
+        model, coefficients = calibrate(details)
+
+        self.assertAlmostEqual(coefficients["decode"], 0.01 * DECODE_SHARE)
+        self.assertAlmostEqual(coefficients["encode"], 0.01 * (1 - DECODE_SHARE))
+        self.assertAlmostEqual(coefficients["zoompan"], 0.05 - coefficients["encode"])
+        self.assertAlmostEqual(coefficients["filter_parallelism"], 2.0)
+        self.assertAlmostEqual(coefficients["single_memory"], 300)
+        self.assertAlmostEqual(coefficients["concat_memory"], 200)
+        self.assertAlmostEqual(
+            coefficients["transition"], 1.0 / 30 - coefficients["encode"]
+        )
+        self.assertTrue(model.calibrated)
+        self.assertEqual(model.get("zoompan"), coefficients["zoompan"])
@@ -0,0 +1,65 @@
+"""
+Tests for the content addressed cache which stores the temporary videos
+of a render so that a later render can re-use unchanged segments.
+"""
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from slideshow.Cache import Cache
+from slideshow.Cache import getFileIdentity
+from slideshow.Cache import getKey
+
+
+class TestCache(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = Cache(os.path.join(self.temp_dir, "cache"))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_init(self):
+        """
+        Test that the cache folder is created.
+        """
+        self.assertTrue(os.path.exists(self.cache.folder))
+
+    def test_get_key(self):
+        """
+        Test that keys are stable for equal content and differ otherwise.
+        """
+        self.assertEqual(getKey(["a"], "filter"), getKey(["a"], "filter"))
+        self.assertNotEqual(getKey(["a"], "filter"), getKey(["a"], "other"))
+
+    def test_file_identity_changes_with_content(self):
+        """
+        Test that an edited file gets a new identity.
+        """
+        file = os.path.join(self.temp_dir, "input.txt")
+        with open(file, "w") as f:
+            f.write("a")
+        identity = getFileIdentity(file)
+
+        with open(file, "w") as f:
+            f.write("ab")
+
+        self.assertNotEqual(identity, getFileIdentity(file))
+
+    def test_put_and_fetch(self):
+        """
+        Test that a stored artifact can be fetched under another name.
+        """
+        file = os.path.join(self.temp_dir, "video.mp4")
+        with open(file, "w") as f:
+            f.write("video")
+
+        self.assertFalse(self.cache.has("abc"))
+        self.cache.put("abc", file)
+        self.assertTrue(self.cache.has("abc"))
+
+        destination = os.path.join(self.temp_dir, "slot.mp4")
+        self.cache.fetch("abc", destination)
+        with open(destination) as f:
+            self.assertEqual(f.read(), "video")
@@ -81,6 +81,11 @@ class TestCLI:
                 input_files=["input1.jpg", "input2.jpg"],
                 file_list=None,
                 save="config.json",
+                resume=False,
+                trace=False,
+                estimate=False,
+                validate=False,
+                draft=False,
                 test=True,
                 output_file="output.mp4",
             )
@@ -142,6 +147,11 @@ class TestCLI:
                 input_files=None,
                 file_list="file_list.json",
                 save=None,
+                resume=False,
+                trace=False,
+                estimate=False,
+                validate=False,
+                draft=False,
                 test=False,
                 output_file="output.mp4",
             )
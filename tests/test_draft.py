@@ -0,0 +1,81 @@
+"""
+Tests for the draft quality tier.
+"""
+import pytest
+
+from slideshow import PROJECT_ROOT
+from slideshow.SlideManager import DRAFT
+
+IMAGES = [
+    str(PROJECT_ROOT / "tests" / "fixtures" / "img_00{}.jpeg".format(i))
+    for i in range(4)
+]
+
+
+class TestDraft:
+    def test_config(self, stub_manager):
+        """Test that a draft is smaller, has fewer frames and is encoded fast"""
+        sm = stub_manager(IMAGES, probe=True)
+        draft = sm.snapshot(quality=DRAFT)
+
+        assert (draft.config["output_width"], draft.config["output_height"]) == (
+            480,
+            300,
+        )
+        assert draft.config["fps"] == 15
+        assert "ultrafast" in draft.config["output_parameters"]
+        # the project is unchanged
+        assert sm.config["output_width"] == 1280
+        assert sm.config["fps"] == 60
+
+    def test_slides(self, stub_manager):
+        """Test that the slides of a draft are not supersampled and fade"""
+        sm = stub_manager(
+            [{"file": IMAGES[0], "overlay_text": {"title": "Title", "font_size": 100}}]
+            + IMAGES[1:],
+            probe=True,
+        )
+        draft = sm.snapshot(quality=DRAFT)
+        slide = draft.getSlides()[0]
+
+        assert slide.supersample == 1
+        assert "scale=480x300,zoompan" in slide.getFilter()[-1]
+        assert all(s.transition == "fade" for s in draft.getSlides())
+        # the title has the same size relative to the video
+        assert slide.overlay_text["font_size"] == 37
+        assert sm.getSlides()[0].overlay_text["font_size"] == 100
+        assert sm.getSlides()[0].supersample == 4
+
+    def test_timing(self, stub_manager):
+        """Test that the slides of a draft start at the same time"""
+        sm = stub_manager(
+            [
+                {"file": IMAGES[i % 4], "slide_duration": 2.35 + (i % 4) * 0.1}
+                for i in range(12)
+            ],
+            probe=True,
+        )
+        final = sm.snapshot()
+        draft = sm.snapshot(quality=DRAFT)
+
+        for i in range(len(sm.getSlides())):
+            # within half a frame of the draft
+            assert draft.getOffset(i, False) == pytest.approx(
+                final.getOffset(i, False), abs=1 / 30
+            )
+        assert draft.getTotalDuration() == pytest.approx(
+            final.getTotalDuration(), abs=1 / 15
+        )
+
+    def test_estimate(self, stub_manager):
+        """Test that a draft is estimated to render at least ten times faster"""
+        sm = stub_manager(IMAGES * 5, probe=True)
+        final = sm.snapshot().getEstimate()
+        draft = sm.snapshot(quality=DRAFT).getEstimate()
+        assert draft["wall"] * 10 < final["wall"]
+
+    def test_unknown_quality(self, stub_manager):
+        """Test that an unknown quality is an error"""
+        sm = stub_manager(IMAGES, probe=True)
+        with pytest.raises(ValueError):
+            sm.snapshot(quality="best")
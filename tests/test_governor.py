@@ -0,0 +1,65 @@
+"""
+Tests for the governor which limits the concurrent ffmpeg processes
+of all renders on one host.
+"""
+import shutil
+import tempfile
+from unittest import TestCase
+
+from slideshow.Governor import Governor
+
+
+class TestGovernor(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_slots_limited_by_memory(self):
+        """
+        Test that the memory budget limits the number of slots.
+        """
+        governor = Governor(
+            self.temp_dir, max_parallel_jobs=8, memory_per_job=1000, memory_budget=2500
+        )
+        self.assertEqual(governor.slots, 2)
+
+    def test_acquire_distinct_slots(self):
+        """
+        Test that concurrent jobs get different slots.
+        """
+        governor = Governor(self.temp_dir, max_parallel_jobs=2, memory_budget=None)
+
+        with governor.acquire() as first:
+            with governor.acquire() as second:
+                self.assertNotEqual(first.index, second.index)
+
+    def test_get_command(self):
+        """
+        Test that the thread options are added to the ffmpeg command.
+        """
+        governor = Governor(self.temp_dir, max_parallel_jobs=1, memory_budget=None)
+
+        with governor.acquire() as slot:
+            cmd = governor.getCommand(["ffmpeg", "-i in.mp4", "out.mp4"], slot)
+
+        self.assertEqual(cmd[0], "ffmpeg")
+        self.assertIn("-filter_threads %s" % (slot.threads), cmd)
+        self.assertEqual(cmd[-2], "-threads %s" % (slot.threads))
+        self.assertEqual(cmd[-1], "out.mp4")
+
+    def test_get_command_outputs(self):
+        """
+        Test that the threads of a command with several outputs are kept.
+        """
+        governor = Governor(self.temp_dir, max_parallel_jobs=1, memory_budget=None)
+        threads = "-threads %s" % (governor.threads)
+
+        with governor.acquire() as slot:
+            cmd = governor.getCommand(
+                ["ffmpeg", "-i in.mp4", threads, "out.mp4", threads, "small.mp4"], slot
+            )
+
+        self.assertEqual(cmd.count(threads), 2)
+        self.assertEqual(cmd[-1], "small.mp4")
@@ -0,0 +1,65 @@
+"""
+Tests for the job manifest which records the planned videos of a render
+and their states so that an interrupted render can be resumed.
+"""
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from slideshow.JobManifest import DONE
+from slideshow.JobManifest import getJobManifestFilename
+from slideshow.JobManifest import getPartName
+from slideshow.JobManifest import JobManifest
+from slideshow.JobManifest import PENDING
+
+
+class TestJobManifest(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.filename = getJobManifestFilename(self.temp_dir, "temp-", "out.mp4")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_part_name(self):
+        """
+        Test that the part file keeps the extension of the output.
+        """
+        self.assertEqual(getPartName("/tmp/out.mp4"), "/tmp/out.part.mp4")
+
+    def test_filename_depends_on_output(self):
+        """
+        Test that different outputs get different manifests.
+        """
+        other = getJobManifestFilename(self.temp_dir, "temp-", "other.mp4")
+        self.assertNotEqual(self.filename, other)
+
+    def test_save_and_load(self):
+        """
+        Test that states and the project survive a restart.
+        """
+        manifest = JobManifest(self.filename)
+        manifest.setProject({"slides": ["1.jpg"]})
+        manifest.addJob("0", "abc", 10)
+        manifest.setState("0", DONE)
+
+        loaded = JobManifest(self.filename)
+        self.assertTrue(loaded.load())
+        self.assertEqual(loaded.getState("0"), DONE)
+        self.assertEqual(loaded.getProject(), {"slides": ["1.jpg"]})
+        self.assertFalse(os.path.exists(getPartName(self.filename)))
+
+    def test_changed_job_is_reset(self):
+        """
+        Test that a resumed job with a different key has to be rendered again.
+        """
+        manifest = JobManifest(self.filename)
+        manifest.addJob("0", "abc")
+        manifest.setState("0", DONE)
+
+        manifest.addJob("0", "abc")
+        self.assertEqual(manifest.getState("0"), DONE)
+
+        manifest.addJob("0", "def")
+        self.assertEqual(manifest.getState("0"), PENDING)
@@ -0,0 +1,122 @@
+"""
+Tests for the built-in streaming onset detector.
+"""
+import io
+import shutil
+import subprocess
+from unittest import TestCase
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from slideshow import PROJECT_ROOT
+from slideshow.AudioFile import ONSET_PARAMETERS
+from slideshow.OnsetDetector import BLOCK_SIZE
+from slideshow.OnsetDetector import OnsetDetector
+from slideshow.OnsetDetector import SAMPLE_RATE
+
+TRACK = str(PROJECT_ROOT / "tests" / "fixtures" / "poin.mp3")
+
+
+def makeClicks(duration, onsets):
+    # a quiet tone with some noise and decaying beeps at the onsets
+    rng = np.random.default_rng(0)
+    times = np.arange(duration * SAMPLE_RATE) / SAMPLE_RATE
+    samples = 0.05 * np.sin(2 * np.pi * 220 * times)
+    samples += 0.005 * rng.standard_normal(len(samples))
+    beep = np.arange(2000)
+    for onset in onsets:
+        start = int(onset * SAMPLE_RATE)
+        samples[start : start + len(beep)] += (
+            0.8 * np.exp(-beep / 300) * np.sin(2 * np.pi * 1000 * beep / SAMPLE_RATE)
+        )
+    return samples.astype(np.float32)
+
+
+def detect(detector, samples, block):
+    onsets = []
+    for start in range(0, len(samples), block):
+        onsets += detector.feed(samples[start : start + block])
+    return np.array(onsets + detector.finish())
+
+
+class TestOnsetDetector(TestCase):
+    def test_clicks(self):
+        """
+        Test that every beep is found once, within two frames, whatever the block size.
+        """
+        expected = np.arange(0.5, 20, 0.5)
+        samples = makeClicks(20, expected)
+
+        onsets = detect(OnsetDetector(), samples, len(samples))
+        self.assertEqual(len(onsets), len(expected))
+        np.testing.assert_allclose(onsets, expected, atol=2 * 512 / SAMPLE_RATE)
+
+        for block in [777, 4096, 12345]:
+            np.testing.assert_array_equal(detect(OnsetDetector(), samples, block), onsets)
+
+    def test_streaming(self):
+        """
+        Test that the state between the blocks does not grow with the track.
+        """
+        duration = 120
+        samples = makeClicks(duration, np.arange(1, duration, 1))
+        detector = OnsetDetector()
+
+        onsets = []
+        for first in range(0, len(samples), BLOCK_SIZE):
+            onsets += detector.feed(samples[first : first + BLOCK_SIZE])
+            self.assertLess(len(detector.samples), detector.window)
+            self.assertLessEqual(len(detector.flux), detector.average + 2)
+        onsets += detector.finish()
+
+        self.assertEqual(len(onsets), duration - 1)
+
+    def test_detect(self):
+        """
+        Test that the decoded track is read from the pipe in blocks of a fixed size,
+        also when a read ends within a sample.
+        """
+        samples = makeClicks(20, np.arange(0.5, 20, 0.5))
+        pipe = io.BytesIO(samples.tobytes())
+        reads = []
+
+        def read(size):
+            reads.append(size)
+            return pipe.read(min(size, 100001))
+
+        process = MagicMock()
+        process.stdout.read = read
+        process.wait.return_value = 0
+        with patch("subprocess.Popen", MagicMock(return_value=process)) as popen:
+            onsets = OnsetDetector("ffmpeg").detect(TRACK)
+
+        # nothing is decoded to a file
+        self.assertEqual(popen.call_args[0][0][-1], "pipe:1")
+        self.assertEqual(set(reads), {BLOCK_SIZE * 4})
+        np.testing.assert_array_equal(
+            onsets, detect(OnsetDetector(), samples, len(samples))
+        )
+
+    @pytest.mark.skipif(
+        shutil.which("aubioonset") is None or shutil.which("ffmpeg") is None,
+        reason="aubio and ffmpeg are required",
+    )
+    def test_aubio(self):
+        """
+        Test that the onsets of the fixture track match the ones of aubio.
+        """
+        aubio = [
+            float(onset)
+            for onset in subprocess.check_output(
+                ["aubioonset", "-i", TRACK] + ONSET_PARAMETERS
+            )
+            .decode()
+            .splitlines()
+        ]
+        onsets = np.array(OnsetDetector("ffmpeg").detect(TRACK))
+
+        matched = [onset for onset in aubio if np.min(np.abs(onsets - onset)) < 0.05]
+        self.assertGreaterEqual(len(matched), 0.8 * len(aubio))
@@ -0,0 +1,67 @@
+"""
+Tests for the persistent index of the onsets of the background tracks.
+"""
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from slideshow.OnsetIndex import OnsetIndex
+
+
+class Track:
+    def __init__(self, file, onsets):
+        self.file = file
+        self.onsets = onsets
+        self.calls = 0
+
+    def getTimestamps(self, aubio, detector=None):
+        self.calls += 1
+        return [str(onset) for onset in self.onsets]
+
+
+class TestOnsetIndex(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.temp_dir, "onsets.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def getTrack(self, name, onsets):
+        file = os.path.join(self.temp_dir, name)
+        with open(file, "w") as audio:
+            audio.write(name)
+        return Track(file, onsets)
+
+    def test_analyze_once(self):
+        """
+        Test that the onsets are detected once and found again by a new index.
+        """
+        first = self.getTrack("a.mp3", [0.5, 1.5])
+        second = self.getTrack("b.mp3", [0.25])
+
+        onsets = OnsetIndex(self.filename).analyze([first, second], "aubioonset", 2)
+        self.assertEqual(onsets, [[0.5, 1.5], [0.25]])
+        self.assertEqual((first.calls, second.calls), (1, 1))
+
+        onsets = OnsetIndex(self.filename).analyze([second, first], "aubioonset", 2)
+        self.assertEqual(onsets, [[0.25], [0.5, 1.5]])
+        self.assertEqual((first.calls, second.calls), (1, 1))
+
+    def test_changed_file_or_parameters(self):
+        """
+        Test that an edited file or another aubio is analyzed again.
+        """
+        track = self.getTrack("a.mp3", [1.0])
+        index = OnsetIndex(self.filename)
+        index.analyze([track], "aubioonset")
+
+        index.analyze([track], "/opt/aubio/aubioonset")
+        self.assertEqual(track.calls, 2)
+
+        with open(track.file, "a") as audio:
+            audio.write("edited")
+        os.utime(track.file, ns=(0, 0))
+        index.analyze([track], "aubioonset")
+        self.assertEqual(track.calls, 3)
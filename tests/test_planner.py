@@ -0,0 +1,130 @@
+"""
+Tests for the planner which chooses the render strategy of a slideshow.
+"""
+import json
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from slideshow.Planner import CHUNKED
+from slideshow.Planner import CostModel
+from slideshow.Planner import FIXED
+from slideshow.Planner import FIXED_FAN_IN
+from slideshow.Planner import Planner
+from slideshow.Planner import SINGLE
+from slideshow.Planner import TEMP
+
+
+class TestPlanner(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_small_slideshow_single(self):
+        """
+        Test that a small slideshow is rendered in a single filter graph.
+        """
+        planner = Planner(cpu_count=4, memory=8000, open_files=1024, slots=1)
+        plan = planner.plan(5, 5 * 240, 5 * 240, 1280, 800, 6)
+
+        self.assertEqual(plan.strategy, SINGLE)
+        self.assertFalse(plan.useTempFiles())
+        self.assertEqual(plan.workers, 1)
+
+    def test_large_slideshow_exceeds_limits(self):
+        """
+        Test that the single filter graph is not used beyond the open file
+        limit and that parallel slots lead to the chunked strategy.
+        """
+        planner = Planner(cpu_count=16, memory=64000, open_files=256, slots=4, threads=4)
+        plan = planner.plan(400, 400 * 240, 400 * 240, 1280, 800, 401)
+
+        self.assertFalse(plan.estimates[SINGLE]["feasible"])
+        self.assertEqual(plan.strategy, CHUNKED)
+        self.assertEqual(plan.workers, 4)
+        self.assertLessEqual(plan.reduce_variable, 256)
+
+    def test_configured_strategy(self):
+        """
+        Test that a configured strategy is kept and generate_temp excludes
+        the single filter graph.
+        """
+        planner = Planner(cpu_count=4, memory=8000, open_files=1024, slots=1)
+
+        plan = planner.plan(5, 1200, 1200, 1280, 800, 6, strategy=TEMP)
+        self.assertEqual(plan.strategy, TEMP)
+
+        plan = planner.plan(5, 1200, 1200, 1280, 800, 6, temp=True)
+        self.assertEqual(plan.strategy, TEMP)
+
+    def test_fixed_strategy(self):
+        """
+        Test that the fixed strategy follows generate_temp with the fixed fan-in
+        even beyond the limits.
+        """
+        planner = Planner(cpu_count=16, memory=64000, open_files=256, slots=4, threads=4)
+
+        plan = planner.plan(400, 400 * 240, 400 * 240, 1280, 800, 401, strategy=FIXED)
+        self.assertEqual(plan.strategy, SINGLE)
+        plan = planner.plan(5, 1200, 1200, 1280, 800, 6, strategy=FIXED, temp=True)
+        self.assertEqual(plan.strategy, TEMP)
+        self.assertEqual(plan.workers, 1)
+        self.assertEqual(plan.reduce_variable, FIXED_FAN_IN)
+
+    def test_concat_steps(self):
+        """
+        Test that the concat steps match the reduction of the temporary videos.
+        """
+        planner = Planner()
+        self.assertEqual(planner.getConcatSteps(120, 10), ([12, 1], 3))
+        self.assertEqual(planner.getConcatSteps(8, 10), ([], 8))
+
+    def test_estimate(self):
+        """
+        Test that only temporary videos use disk space and that the
+        transitions are part of the estimate and the breakdown.
+        """
+        planner = Planner(cpu_count=4, memory=8000, open_files=1024, slots=1)
+        plan = planner.plan(5, 1200, 1200, 1000, 1000, 6)
+        with_transitions = planner.plan(5, 1200, 1200, 1000, 1000, 6, transition_frames=100)
+
+        self.assertEqual(plan.estimates[SINGLE]["disk"], 0)
+        self.assertGreater(plan.estimates[TEMP]["disk"], 0)
+        self.assertAlmostEqual(
+            with_transitions.estimates[SINGLE]["cpu"] - plan.estimates[SINGLE]["cpu"],
+            100 * CostModel.DEFAULTS["transition"],
+        )
+
+        breakdown = planner.getBreakdown(
+            [
+                {"frames": 100, "image": True, "transition_frames": 10},
+                {"frames": 100, "image": False, "transition_frames": 0},
+            ],
+            1000,
+            1000,
+            SINGLE,
+        )
+        self.assertGreater(breakdown[0]["cpu"], breakdown[1]["cpu"])
+        self.assertAlmostEqual(
+            breakdown[0]["transition_cpu"], 10 * CostModel.DEFAULTS["transition"]
+        )
+        self.assertEqual(breakdown[1]["transition_cpu"], 0)
+
+    def test_load_calibration(self):
+        """
+        Test that calibrated coefficients replace the defaults.
+        """
+        filename = os.path.join(self.temp_dir, "calibration.json")
+        with open(filename, "w") as file:
+            json.dump({"coefficients": {"zoompan": 0.5, "unknown": 1}}, file)
+
+        model = CostModel.load(filename)
+        self.assertTrue(model.calibrated)
+        self.assertEqual(model.get("zoompan"), 0.5)
+        self.assertEqual(model.get("encode"), CostModel.DEFAULTS["encode"])
+        self.assertNotIn("unknown", model.coefficients)
+
+        self.assertFalse(CostModel.load(os.path.join(self.temp_dir, "none")).calibrated)
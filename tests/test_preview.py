@@ -0,0 +1,68 @@
+"""
+Tests for the preview of the slideshow without FFmpeg.
+"""
+from PIL import Image
+from PIL import ImageChops
+import pytest
+
+from slideshow import PROJECT_ROOT
+from slideshow.Preview import Preview
+
+IMAGES = [
+    str(PROJECT_ROOT / "tests" / "fixtures" / "img_00{}.jpeg".format(i))
+    for i in range(4)
+]
+
+
+@pytest.fixture
+def sm(stub_manager):
+    return stub_manager(IMAGES, probe=True)
+
+
+class TestPreview:
+    def test_timeline(self, sm):
+        """
+        Test that the preview has the frames of the rendered video and a frame at any time.
+        """
+        preview = Preview(sm, width=320)
+        assert preview.getFrameCount() == sm.getFinalVideoFrames()
+
+        image = preview.renderFrameAt(1.5)
+        assert image.size == preview.size
+        assert preview.getFrame(1000) == preview.getFrameCount() - 1
+        preview.shutdown()
+
+    def test_crop_box(self, sm):
+        """
+        Test that a zoom in starts with the whole image and ends zoomed by the zoom rate.
+        """
+        slide = sm.getSlides()[0]
+        slide.scale = "crop_center"
+        slide.setZoomDirectionX("right")
+        slide.setZoomDirectionY("bottom")
+        slide.setZoomDirectionZ("in")
+
+        assert slide.getCropBox(0) == (0, 0, 1, 1)
+        x, y, width, height = slide.getCropBox(slide.getFrames())
+        assert width == pytest.approx(1 / (1 + slide.zoom_rate))
+        assert x + width == pytest.approx(1)
+        assert y + height == pytest.approx(1)
+
+    def test_transition(self, sm):
+        """
+        Test that the frames of a transition blend the two slides.
+        """
+        preview = Preview(sm, width=320)
+        frames, slide, first, next_slide = preview.segments[1]
+        assert (slide, next_slide) == (0, 1)
+
+        start = preview.starts[1]
+        middle = start + frames // 2
+        expected = Image.blend(
+            preview.renderSlideFrame(0, first + frames // 2),
+            preview.renderSlideFrame(1, frames // 2),
+            (frames // 2) / frames,
+        )
+        difference = ImageChops.difference(preview.renderFrame(middle), expected)
+        assert difference.getbbox() is None
+        preview.shutdown()
@@ -0,0 +1,46 @@
+"""
+Tests for the decoded previews of the slide editor.
+"""
+import time
+from unittest import TestCase
+
+from gui.PreviewCache import PreviewCache
+from slideshow import PROJECT_ROOT
+from slideshow.Cache import getFileIdentity
+
+IMAGE = str(PROJECT_ROOT / "tests" / "fixtures" / "img_001.jpeg")
+IMAGE2 = str(PROJECT_ROOT / "tests" / "fixtures" / "img_002.jpeg")
+
+
+class TestPreviewCache(TestCase):
+    def test_size(self):
+        """
+        Test that an image is decoded only as large as it needs to cover the preview.
+        """
+        cache = PreviewCache()
+        image, original = cache.get(IMAGE, (250, 140))
+        self.assertGreaterEqual(image.size[0], 250)
+        self.assertGreaterEqual(image.size[1], 140)
+        self.assertTrue(image.size[0] == 250 or image.size[1] == 140)
+        self.assertGreater(original[0], image.size[0])
+
+        # the second request is served from memory
+        self.assertIs(cache.get(IMAGE, (250, 140))[0], image)
+        cache.shutdown()
+
+    def test_prefetch(self):
+        """
+        Test that a prefetched image is cached and the oldest one is evicted.
+        """
+        cache = PreviewCache(capacity=1)
+        cache.prefetch(lambda: IMAGE2, (250, 140))
+        for _ in range(100):
+            if cache.images:
+                break
+            time.sleep(0.05)
+        self.assertEqual(len(cache.images), 1)
+
+        cache.get(IMAGE, (250, 140))
+        self.assertEqual(len(cache.images), 1)
+        self.assertEqual(list(cache.images), [(getFileIdentity(IMAGE), (250, 140))])
+        cache.shutdown()
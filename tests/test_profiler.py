@@ -0,0 +1,78 @@
+"""
+Tests for the profiler which records the wall time, CPU time and memory
+of the stages of a render.
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from unittest import TestCase
+
+from slideshow.Profiler import getItemCategory
+from slideshow.Profiler import Profiler
+from slideshow.Profiler import waitProcess
+
+
+class TestProfiler(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_stage(self):
+        """
+        Test that a stage records its wall time and the CPU time of a child process.
+        """
+        profiler = Profiler()
+        with profiler.stage("0", "slide", slide=0) as record:
+            p = subprocess.Popen(
+                [sys.executable, "-c", "sum(range(2000000))"], shell=False
+            )
+            self.assertEqual(waitProcess(p), 0)
+
+        self.assertEqual(p.returncode, 0)
+        self.assertGreater(record["wall"], 0)
+        if hasattr(os, "wait4"):
+            self.assertGreater(record["children_cpu"], 0)
+            self.assertGreater(record["peak_rss_mb"], 0)
+        self.assertEqual(profiler.getTotals()["slide"]["count"], 1)
+
+    def test_item_category(self):
+        """
+        Test the categories of the queue items.
+        """
+        self.assertEqual(getItemCategory({"suffix": 3}), "slide")
+        self.assertEqual(getItemCategory({"suffix": "3_main"}), "slide")
+        self.assertEqual(getItemCategory({"suffix": "3_trans_fade"}), "transition")
+        self.assertEqual(getItemCategory({"suffix": "0_9_combine"}), "combine")
+
+    def test_report(self):
+        """
+        Test that the report calls out the slowest slides and keeps the
+        setup stages for the next render.
+        """
+        profiler = Profiler()
+        for slide, wall in [(0, 1.0), (1, 3.0), (1, 2.0), (2, 0.5)]:
+            with profiler.stage(slide, "slide", slide=slide) as record:
+                pass
+            record["wall"] = wall
+        with profiler.stage("a.jpg", "open"):
+            pass
+
+        worst = profiler.getWorst("slide", labels={1: "b.jpg"})
+        self.assertEqual(worst[0]["slide"], 1)
+        self.assertEqual(worst[0]["wall"], 5.0)
+        self.assertEqual(worst[0]["label"], "b.jpg")
+
+        filename = os.path.join(self.temp_dir, "video.profile.json")
+        profiler.save(filename)
+        with open(filename) as file:
+            self.assertEqual(len(json.load(file)["stages"]), 5)
+        with open(os.path.join(self.temp_dir, "video.profile.txt")) as file:
+            self.assertIn("Slowest slides:", file.read())
+
+        profiler.clear()
+        self.assertEqual([s["category"] for s in profiler.getStages()], ["open"])
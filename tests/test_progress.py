@@ -0,0 +1,93 @@
+"""
+Tests for the parser of the ffmpeg progress output and the aggregation
+of the progress of all jobs of a render.
+"""
+import io
+import json
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from slideshow.Progress import ConsoleSink
+from slideshow.Progress import getProgressCommand
+from slideshow.Progress import JsonLinesSink
+from slideshow.Progress import Progress
+from slideshow.Progress import ProgressParser
+
+PROGRESS_OUTPUT = """frame=120
+fps=30.00
+stream_0_0_q=-1.0
+bitrate= 512.0kbits/s
+total_size=128000
+out_time_us=2000000
+out_time_ms=2000000
+out_time=00:00:02.000000
+dup_frames=0
+drop_frames=0
+speed=1.50x
+progress=continue
+"""
+
+
+class TestProgress(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_parse_progress(self):
+        """
+        Test that a block of the progress output is parsed into one event.
+        """
+        parser = ProgressParser("1")
+        events = [parser.feed(line) for line in PROGRESS_OUTPUT.splitlines()]
+
+        self.assertEqual(events[:-1], [None] * (len(events) - 1))
+        event = events[-1]
+        self.assertEqual(event["job"], "1")
+        self.assertEqual(event["frame"], 120)
+        self.assertEqual(event["fps"], 30.0)
+        self.assertEqual(event["out_time"], 2.0)
+        self.assertEqual(event["speed"], 1.5)
+        self.assertEqual(event["size"], 128000)
+        self.assertFalse(event["finished"])
+
+        self.assertTrue(parser.feed("progress=end")["finished"])
+        self.assertIsNone(parser.feed("some warning"))
+
+    def test_progress_command(self):
+        """
+        Test that the stats line is replaced by the progress output.
+        """
+        cmd = getProgressCommand(["ffmpeg", "-hide_banner", "-stats", "out.mp4"])
+        self.assertEqual(
+            cmd, ["ffmpeg", "-progress pipe:1", "-nostats", "-hide_banner", "out.mp4"]
+        )
+
+    def test_overall_progress(self):
+        """
+        Test that the overall progress covers all jobs and that finished jobs
+        count with all of their frames.
+        """
+        stream = io.StringIO()
+        filename = os.path.join(self.temp_dir, "progress.jsonl")
+        progress = Progress([ConsoleSink(stream), JsonLinesSink(filename)])
+        progress.addJob("1", 100)
+        progress.addJob("final", 300)
+
+        progress.update({"job": "final", "frame": 50})
+        progress.finish("1")
+        overall = progress.getOverall()
+
+        self.assertEqual(overall["frames_total"], 400)
+        self.assertEqual(overall["frames_done"], 150)
+        self.assertEqual(overall["jobs_done"], 1)
+        self.assertIn("37%", stream.getvalue())
+
+        progress.close()
+        with open(filename) as file:
+            lines = [json.loads(line) for line in file]
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(lines[1]["event"]["job"], "1")
@@ -9,6 +9,7 @@ import shutil
 from unittest import TestCase
 from unittest.mock import MagicMock, patch
 
+from slideshow.JobManifest import getPartName
 from slideshow.Queue import Queue
 
 
@@ -62,6 +63,59 @@ class TestQueue(TestCase):
 
             mock_subprocess_call.assert_called_once()
 
+    def test_item_key(self):
+        """
+        Test that the content key of an item depends on its filters and
+        that generated inputs are identified by the key of their queue item.
+        """
+        output = self.queue.addItem(["input1.mp4"], ["filter1"], "1")
+        other = self.queue.addItem(["input1.mp4"], ["filter2"], "2")
+        combined = self.queue.addItem([output], "[0] concat=n=1", "3")
+
+        items = self.queue.getQueue()
+        self.assertNotEqual(items[0]["key"], items[1]["key"])
+        self.assertEqual(self.queue.keys[output], items[0]["key"])
+        self.assertEqual(self.queue.keys[other], items[1]["key"])
+        self.assertEqual(self.queue.keys[combined], items[2]["key"])
+
+    def test_create_temporary_video_cached(self):
+        """
+        Test that an already rendered item is taken from the cache
+        without calling ffmpeg again.
+        """
+        output = self.queue.addItem(["input1.mp4"], ["filter1"], "1")
+        item = self.queue.getQueue()[0]
+
+        with open(output, "w") as f:
+            f.write("video")
+        self.queue.cache.put(item["key"], output)
+        os.remove(output)
+
+        with patch("subprocess.call", MagicMock()) as mock_subprocess_call:
+            self.assertEqual(self.queue.createTemporaryVideo("ffmpeg", item), output)
+
+            mock_subprocess_call.assert_not_called()
+        self.assertTrue(os.path.exists(output))
+
+    def test_create_temporary_video_incomplete(self):
+        """
+        Test that a video of a failed ffmpeg run is never used.
+        """
+        output = self.queue.addItem(["input1.mp4"], ["filter1"], "1")
+        item = self.queue.getQueue()[0]
+
+        def write_part(*args, **kwargs):
+            with open(getPartName(output), "w") as f:
+                f.write("half written")
+            return 255
+
+        with patch("subprocess.call", MagicMock(side_effect=write_part)):
+            self.assertIsNone(self.queue.createTemporaryVideo("ffmpeg", item))
+
+        self.assertFalse(os.path.exists(output))
+        self.assertFalse(os.path.exists(getPartName(output)))
+        self.assertFalse(self.queue.cache.has(item["key"]))
+
     def test_clean(self):
         """
         Test the cleanup of temporary files created during the process.
@@ -79,3 +133,37 @@ class TestQueue(TestCase):
         self.assertEqual(self.queue.getQueueLength(), 0)
         for temp_file in self.queue.tempFiles:
             self.assertFalse(os.path.exists(os.path.join(self.temp_dir, temp_file)))
+
+    def test_item_args(self):
+        """
+        Test that a transition is attributed to the slide it follows.
+        """
+        slide = {"inputs": [], "filters": [], "suffix": "2_main"}
+        transition = {"inputs": [], "filters": [], "suffix": "2_trans_fade"}
+
+        self.assertEqual(self.queue.getItemArgs(slide)["slide"], 2)
+        args = self.queue.getItemArgs(transition)
+        self.assertEqual((args["slide"], args["transition"]), (1, "fade"))
+
+    def test_process_in_dependency_order(self):
+        """
+        Test that parallel processing creates the inputs of an item first.
+        """
+        first = self.queue.addItem(["input1.mp4"], ["filter1"], "1")
+        second = self.queue.addItem(["input2.mp4"], ["filter2"], "2")
+        self.queue.addItem([first, second], "[0][1] concat=n=2", "3")
+
+        self.assertEqual(self.queue.getDependencies(), [set(), set(), {0, 1}])
+
+        order = []
+
+        def create(ffmpeg, item):
+            order.append(item["suffix"])
+            return self.queue.getOutputName(item)
+
+        with patch.object(self.queue, "createTemporaryVideo", side_effect=create):
+            results = self.queue.process("ffmpeg", workers=2)
+
+        self.assertEqual(order[-1], "3")
+        self.assertEqual(results[0], first)
+        self.assertEqual(results[1], second)
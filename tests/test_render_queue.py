@@ -0,0 +1,75 @@
+"""
+Tests for the render queue which renders the videos in worker processes.
+"""
+import os
+import random
+import time
+
+import pytest
+
+from slideshow import PROJECT_ROOT
+from slideshow.JobManifest import DONE
+from slideshow.JobManifest import PENDING
+from slideshow.RenderQueue import CANCELLED
+from slideshow.RenderQueue import RenderQueue
+from slideshow.SlideManager import SlideManager
+
+IMAGES = [
+    str(PROJECT_ROOT / "tests" / "fixtures" / "img_00{}.jpeg".format(i))
+    for i in range(4)
+]
+
+
+@pytest.fixture
+def project(stub_config):
+    random.seed(0)
+    project = SlideManager(dict(stub_config), IMAGES, []).getProject()
+    project["config"] = dict(stub_config, **project["config"])
+    # the placeholders cannot be verified by their frames
+    del project["config"]["ffprobe"]
+    return project
+
+
+def waitFor(renderQueue):
+    for _ in range(600):
+        renderQueue.poll()
+        if not renderQueue.isBusy():
+            return
+        time.sleep(0.1)
+
+
+class TestRenderQueue:
+    def test_render(self, project, tmp_path):
+        """
+        Test that the queued videos are rendered one after another with their progress.
+        """
+        renderQueue = RenderQueue()
+        first = renderQueue.submit(project, str(tmp_path / "a.mp4"))
+        second = renderQueue.submit(project, str(tmp_path / "b.mp4"))
+        assert second["state"] == PENDING
+
+        waitFor(renderQueue)
+        for job in [first, second]:
+            assert job["state"] == DONE
+            assert job["overall"]["percent"] == 100
+            assert os.path.exists(job["output"])
+
+    def test_cancel(self, project, tmp_path):
+        """
+        Test that a cancelled job is stopped and the next one is rendered.
+        """
+        renderQueue = RenderQueue()
+        first = renderQueue.submit(project, str(tmp_path / "a.mp4"))
+        second = renderQueue.submit(project, str(tmp_path / "b.mp4"))
+        third = renderQueue.submit(project, str(tmp_path / "c.mp4"))
+        renderQueue.cancel(second["id"])
+        renderQueue.cancel(first["id"])
+
+        assert first["state"] == CANCELLED
+        assert not first["process"].is_alive()
+        assert second["state"] == CANCELLED
+        assert second["process"] is None
+
+        waitFor(renderQueue)
+        assert third["state"] == DONE
+        assert not os.path.exists(first["output"])
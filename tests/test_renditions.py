@@ -0,0 +1,147 @@
+"""
+Tests for the renditions which are scaled from the rendered video.
+"""
+import os
+from unittest.mock import patch
+
+import pytest
+
+from slideshow import PROJECT_ROOT
+from slideshow.Queue import Queue
+from slideshow.Validator import getValidationConfig
+
+IMAGE = str(PROJECT_ROOT / "tests" / "fixtures" / "img_001.jpeg")
+
+
+@pytest.fixture
+def output(tmp_path):
+    return str(tmp_path / "output.mp4")
+
+
+@pytest.fixture
+def create(stub_manager):
+    # the cached videos are kept between the renders
+    def create(renditions, probe=False):
+        return stub_manager(
+            [IMAGE] * 3,
+            probe=probe,
+            renditions=renditions,
+            stream_copy=True,
+            audio_mixer="numpy",
+            delete_temp=False,
+        )
+
+    return create
+
+
+@pytest.fixture
+def render(create, output):
+    def render(renditions):
+        sm = create(renditions)
+        assert sm.createVideo(output, overwrite=True)
+        return [stage["name"] for stage in sm.profiler.getStages("final")]
+
+    return render
+
+
+class TestRenditions:
+    def test_get_renditions(self, create, stub_config, output, tmp_path):
+        """
+        Test that the size, the encoding and the file of a rendition have defaults.
+        """
+        sm = create([{"width": 640}, {"width": 320, "height": 240, "codec": "libx265"}])
+        renditions = sm.getRenditions(output)
+
+        assert [(r["width"], r["height"]) for r in renditions] == [
+            (640, 400),
+            (320, 240),
+        ]
+        assert [r["codec"] for r in renditions] == [
+            stub_config["output_codec"],
+            "libx265",
+        ]
+        assert renditions[0]["file"] == str(tmp_path / "output-400p.mp4")
+
+    def test_single_run(self, create, output):
+        """
+        Test that the renditions are split from the graph in the same ffmpeg run.
+        """
+        sm = create([{"width": 640}, {"width": 320}])
+        (
+            burnSubtitles,
+            srtInput,
+            srtFilename,
+            inputs,
+            temp_filter_script,
+        ) = sm.prepareVideoProcessing(output)
+        cmd = " ".join(
+            sm.getFinalVideoCommand(
+                output,
+                burnSubtitles,
+                srtInput,
+                srtFilename,
+                inputs,
+                temp_filter_script,
+            )
+        )
+        with open(temp_filter_script) as file:
+            script = file.read()
+        sm.cleanVideoProcessing(temp_filter_script, srtFilename)
+
+        assert "[out]split=3[vmaster][rendition0][rendition1]" in script
+        assert "scale=640:400" in script
+        assert "-map [vmaster]:v" in cmd
+        assert "-map [rendition1out]:v" in cmd
+        assert "output-200p.part.mp4" in cmd
+        # every output is limited to the threads of the slot
+        assert cmd.count("-threads %s" % (sm.governor.threads)) == 3
+
+    def test_render(self, render, output, tmp_path):
+        """
+        Test that a new rendition is scaled from the cached video.
+        """
+        assert render([{"width": 640}]) == ["final"]
+        assert os.path.exists(output)
+        assert os.path.exists(tmp_path / "output-400p.mp4")
+
+        # the slides are not rendered again
+        assert render([{"width": 640}, {"width": 320}]) == ["renditions"]
+        assert os.path.exists(tmp_path / "output-200p.mp4")
+        assert render([{"width": 640}, {"width": 320}]) == []
+        assert sorted(f for f in os.listdir(tmp_path) if f.endswith(".mp4")) == [
+            "output-200p.mp4",
+            "output-400p.mp4",
+            "output.mp4",
+        ]
+
+    def test_verify(self, create, output, tmp_path):
+        """
+        Test that the outputs are not renamed when one has the wrong frames.
+        """
+        # the placeholders have 120 frames
+        sm = create([{"width": 640}], probe=True)
+        assert not sm.createVideo(output, overwrite=True)
+        assert [f for f in os.listdir(tmp_path) if f.endswith(".mp4")] == []
+
+    def test_verify_loopable(self, create, output):
+        """
+        Test that the outputs of a loopable video are verified by their trimmed frames.
+        """
+        sm = create([{"width": 640}])
+        sm.config["loopable"] = True
+        with patch.object(Queue, "verifyVideo", return_value=True) as verifyVideo:
+            assert sm.createVideo(output, overwrite=True)
+
+        _, duration = sm.getOutputDuration()
+        assert sm.getOutputFrames() == round(duration * sm.config["fps"])
+        assert sm.getOutputFrames() < sm.getFinalVideoFrames()
+        assert [call.args[1] for call in verifyVideo.call_args_list] == [
+            sm.getOutputFrames()
+        ] * 2
+
+    def test_validation(self, stub_config):
+        """
+        Test that the graph is validated without the renditions.
+        """
+        config = getValidationConfig(dict(stub_config, renditions=[{"width": 640}]))
+        assert config["renditions"] == []
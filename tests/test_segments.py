@@ -0,0 +1,141 @@
+"""
+Tests for the HLS/DASH output which is segmented at the slides.
+"""
+import os
+
+import pytest
+
+from slideshow import PROJECT_ROOT
+from slideshow.Segments import DASH
+from slideshow.Segments import getMasterPlaylistName
+from slideshow.Segments import getPlaylistBandwidth
+from slideshow.Segments import getSegmentArguments
+from slideshow.Segments import getSegmentFiles
+from slideshow.Segments import getSegmentFormat
+from slideshow.Segments import HLS
+from slideshow.Segments import removeSegments
+from slideshow.Segments import writeMasterPlaylist
+
+IMAGE = str(PROJECT_ROOT / "tests" / "fixtures" / "img_001.jpeg")
+
+
+def touch(folder, *files):
+    for file in files:
+        with open(folder / file, "w"):
+            pass
+
+
+class TestSegments:
+    def test_get_segment_format(self):
+        """
+        Test that the segmented output is chosen by the extension.
+        """
+        assert getSegmentFormat("video.m3u8") == HLS
+        assert getSegmentFormat("video.MPD") == DASH
+        assert getSegmentFormat("video.mp4") is None
+
+    def test_get_segment_arguments(self):
+        """
+        Test that a keyframe is forced at every slide boundary.
+        """
+        arguments = " ".join(getSegmentArguments("/out/video.m3u8", [4, 8], 25, 4))
+        assert "-force_key_frames 4.0000,8.0000" in arguments
+        assert "-g 100" in arguments
+        assert "-hls_playlist_type event" in arguments
+        assert '-hls_segment_filename "/out/video-%05d.ts"' in arguments
+
+        arguments = " ".join(getSegmentArguments("/out/video.mpd", [], 25, 4))
+        assert "-force_key_frames" not in arguments
+        assert "-f dash" in arguments
+        assert "video-init-" in arguments
+
+    def test_remove_segments(self, tmp_path):
+        """
+        Test that only the segments of the output are removed.
+        """
+        touch(
+            tmp_path,
+            "video.m3u8",
+            "video-00000.ts",
+            "video-00001.ts.tmp",
+            "video-720p.m3u8",
+            "video-720p-00000.ts",
+            "video.mp4",
+        )
+        output = str(tmp_path / "video.m3u8")
+        assert len(getSegmentFiles(output)) == 2
+
+        removeSegments(output)
+        assert sorted(os.listdir(tmp_path)) == [
+            "video-720p-00000.ts",
+            "video-720p.m3u8",
+            "video.mp4",
+        ]
+
+    def test_render(self, stub_manager, tmp_path):
+        """
+        Test that a playlist is written in place and the slide starts are keyframes.
+        """
+        sm = stub_manager([IMAGE] * 3)
+        fps = sm.config["fps"]
+        assert [
+            round(boundary * fps + 0.5) for boundary in sm.getSegmentBoundaries()
+        ] == [sm.getOffset(1), sm.getOffset(2)]
+
+        touch(tmp_path, "video-00042.ts")
+        output = str(tmp_path / "video.m3u8")
+        assert sm.createVideo(output, overwrite=True)
+        assert os.path.exists(output)
+        # the segments of the previous render are removed
+        assert not os.path.exists(tmp_path / "video-00042.ts")
+
+    def test_master_playlist(self, tmp_path):
+        """
+        Test that the master playlist lists the variants with their bandwidth.
+        """
+        for name, sizes in [("video", [1000, 3000]), ("video-360p", [500, 500])]:
+            lines = ["#EXTM3U", "#EXT-X-TARGETDURATION:2"]
+            for i, size in enumerate(sizes):
+                segment = "%s-%05d.ts" % (name, i)
+                with open(tmp_path / segment, "wb") as file:
+                    file.write(bytes(size))
+                lines += ["#EXTINF:2.000000,", segment]
+            with open(tmp_path / (name + ".m3u8"), "w") as file:
+                file.write("\n".join(lines + ["#EXT-X-ENDLIST"]) + "\n")
+
+        output = str(tmp_path / "video.m3u8")
+        small = str(tmp_path / "video-360p.m3u8")
+        assert getPlaylistBandwidth(output) == (12000, 8000)
+
+        master = writeMasterPlaylist(output, [(output, 1280, 720), (small, 640, 360)])
+        assert master == str(tmp_path / "video.master.m3u8")
+        with open(master) as file:
+            lines = file.read().splitlines()
+        assert lines[-4:] == [
+            "#EXT-X-STREAM-INF:BANDWIDTH=12000,AVERAGE-BANDWIDTH=8000,"
+            "RESOLUTION=1280x720",
+            "video.m3u8",
+            "#EXT-X-STREAM-INF:BANDWIDTH=2000,AVERAGE-BANDWIDTH=2000,"
+            "RESOLUTION=640x360",
+            "video-360p.m3u8",
+        ]
+
+        removeSegments(output)
+        assert not os.path.exists(master)
+
+    def test_render_renditions(self, stub_manager, tmp_path):
+        """
+        Test that the renditions of a playlist are listed in a master playlist.
+        """
+        sm = stub_manager([IMAGE] * 3, renditions=[{"width": 640}])
+
+        output = str(tmp_path / "video.m3u8")
+        assert sm.createVideo(output, overwrite=True)
+        with open(getMasterPlaylistName(output)) as file:
+            master = file.read()
+        assert "RESOLUTION=1280x800\nvideo.m3u8" in master
+        assert "RESOLUTION=640x400\nvideo-400p.m3u8" in master
+
+        # a player can not switch between the manifests of a DASH output
+        with pytest.raises(ValueError):
+            sm.createVideo(str(tmp_path / "video.mpd"), overwrite=True)
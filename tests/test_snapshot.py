@@ -0,0 +1,96 @@
+"""
+Tests for the frozen project snapshots which are rendered.
+"""
+import os
+import threading
+
+import pytest
+
+from slideshow import PROJECT_ROOT
+
+IMAGES = [
+    str(PROJECT_ROOT / "tests" / "fixtures" / "img_00{}.jpeg".format(i))
+    for i in range(4)
+]
+
+
+@pytest.fixture
+def sm(stub_manager):
+    return stub_manager(IMAGES)
+
+
+class TestSnapshot:
+    def test_frozen(self, sm):
+        """Test that the slides and the config of a snapshot can not be changed"""
+        snapshot = sm.snapshot()
+        with pytest.raises(AttributeError):
+            snapshot.getSlides()[0].duration = 10
+        with pytest.raises(TypeError):
+            snapshot.config["fps"] = 25
+
+    def test_edit(self, sm):
+        """Test that edits of the project do not change a snapshot"""
+        snapshot = sm.snapshot()
+        frames = snapshot.getFinalVideoFrames()
+        offsets = [snapshot.getOffset(i) for i in range(len(snapshot.getSlides()))]
+
+        sm.getSlides()[0].setDuration(10)
+        sm.config["output_width"] = 640
+
+        assert snapshot.getFinalVideoFrames() == frames
+        assert snapshot.config["output_width"] == 1280
+        assert sm.getFinalVideoFrames() != frames
+        assert [snapshot.getOffset(i) for i in range(len(offsets))] == offsets
+
+    def test_offsets(self, sm):
+        """Test that the precomputed offsets are the offsets of the project"""
+        snapshot = sm.snapshot()
+        for i in range(len(sm.getSlides())):
+            assert snapshot.getOffset(i) == sm.getOffset(i)
+
+    def test_overrides(self, sm):
+        """Test that a snapshot in another output size scales its slides"""
+        snapshot = sm.snapshot(output_width=640, output_height=360)
+        slide = snapshot.getSlides()[0]
+        assert (slide.output_width, slide.output_height) == (640, 360)
+        assert sm.getSlides()[0].output_width == 1280
+
+    def test_concurrent(self, sm, tmp_path):
+        """Test that snapshots in different sizes are rendered at the same time"""
+        snapshots = [sm.snapshot(), sm.snapshot(output_width=640, output_height=360)]
+        # the jobs are created by the render
+        assert snapshots[0].job.id is None
+
+        results = {}
+        folders = {}
+
+        def render(i):
+            output_file = str(tmp_path / "video-{}.mp4".format(i))
+            results[i] = snapshots[i].createVideo(output_file, overwrite=True)
+            folders[i] = snapshots[i].job.folder
+
+        threads = [threading.Thread(target=render, args=(i,)) for i in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == {0: True, 1: True}
+        assert folders[0] != folders[1]
+        for i in range(2):
+            assert os.path.exists(tmp_path / "video-{}.mp4".format(i))
+
+    def test_single_job(self, sm, tmp_path):
+        """Test that a render of a snapshot creates one job"""
+        snapshot = sm.snapshot()
+        snapshot.createVideo(str(tmp_path / "video.mp4"), test=True)
+        assert os.listdir(snapshot.jobsFolder) == []
+
+    @pytest.mark.parametrize("delete_temp", [False, True])
+    def test_clean(self, stub_manager, tmp_path, delete_temp):
+        """Test that the job is removed and delete_temp removes the cached videos"""
+        sm = stub_manager(IMAGES, generate_temp=True, delete_temp=delete_temp)
+        assert sm.createVideo(str(tmp_path / "video.mp4"), overwrite=True)
+
+        assert os.listdir(sm.jobsFolder) == []
+        assert (os.listdir(sm.cacheFolder) == []) == delete_temp
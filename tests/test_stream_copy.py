@@ -0,0 +1,78 @@
+"""
+Tests for the separately cached audio and video of the final video.
+"""
+import os
+
+import pytest
+
+from slideshow import PROJECT_ROOT
+
+IMAGE = str(PROJECT_ROOT / "tests" / "fixtures" / "img_001.jpeg")
+
+
+@pytest.fixture
+def output(tmp_path):
+    return str(tmp_path / "output.mp4")
+
+
+@pytest.fixture
+def render(stub_manager, output):
+    # the stages of the final video, the cached videos are kept between the renders
+    def render(audio, delete_temp=False):
+        sm = stub_manager(
+            [IMAGE] * 3,
+            audio,
+            stream_copy=True,
+            audio_mixer="numpy",
+            delete_temp=delete_temp,
+        )
+        sm.createVideo(output, overwrite=True)
+        return [stage["name"] for stage in sm.profiler.getStages("final")]
+
+    return render
+
+
+class TestStreamCopy:
+    def test_audio_edit_reuses_video(self, render, stub_audio, output):
+        """
+        Test that the video is only rendered once and the audio is muxed.
+        """
+        audio = stub_audio(2)
+
+        assert render(audio[:1]) == ["final", "mux"]
+        assert os.path.exists(output)
+
+        # another soundtrack only changes the audio
+        assert render(audio[1:]) == ["mux"]
+        assert os.path.exists(output)
+
+    def test_without_audio(self, render, output):
+        """
+        Test that a video without audio is not muxed.
+        """
+        assert render([]) == ["final"]
+        assert render([]) == []
+        assert os.path.exists(output)
+
+    def test_dry_run(self, stub_manager, stub_audio, output):
+        """
+        Test that the audio is not rendered for the estimate.
+        """
+        sm = stub_manager(
+            [IMAGE] * 3, stub_audio(1), stream_copy=True, audio_mixer="numpy"
+        )
+        sm.createVideo(output, test=True)
+
+        assert sm.profiler.getStages("audio") == []
+        assert not os.path.exists(os.path.join(sm.cacheFolder, "audio"))
+        assert not os.path.exists(output)
+
+    def test_delete_temp(self, render, stub_audio, stub_config, output):
+        """
+        Test that delete_temp removes the cached video and audio of the render.
+        """
+        assert render(stub_audio(1), delete_temp=True) == ["final", "mux"]
+        assert os.path.exists(output)
+
+        cache = os.path.join(stub_config["temp_file_folder"], "cache")
+        assert [file for file in os.listdir(cache) if not file == "audio"] == []
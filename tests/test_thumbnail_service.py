@@ -0,0 +1,51 @@
+"""
+Tests for the background thumbnails of the slide strip.
+"""
+import shutil
+import tempfile
+import time
+from unittest import TestCase
+
+from PIL import Image
+
+from gui.ThumbnailService import ThumbnailService
+from slideshow import PROJECT_ROOT
+
+IMAGE = str(PROJECT_ROOT / "tests" / "fixtures" / "img_001.jpeg")
+
+
+class TestThumbnailService(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def waitFor(self, service):
+        for _ in range(100):
+            finished = service.poll()
+            if finished:
+                return finished
+            time.sleep(0.05)
+        return []
+
+    def test_image(self):
+        """
+        Test that a thumbnail is rendered in the background once and then read from the cache.
+        """
+        service = ThumbnailService("ffmpeg", self.temp_dir)
+        self.assertIsNone(service.get(IMAGE))
+        # a second request while it is rendered is not queued again
+        self.assertIsNone(service.get(IMAGE))
+
+        finished = self.waitFor(service)
+        self.assertEqual(len(finished), 1)
+        file, thumbnail = finished[0]
+        self.assertEqual(file, IMAGE)
+        with Image.open(thumbnail) as image:
+            self.assertLessEqual(image.size[0], 150)
+            self.assertLessEqual(image.size[1], 75)
+
+        # another service (the next session) finds it on disk
+        self.assertEqual(ThumbnailService("ffmpeg", self.temp_dir).get(IMAGE), thumbnail)
+        service.shutdown()
@@ -0,0 +1,62 @@
+"""
+Tests for the export of the profiler stages in the Chrome trace event format.
+"""
+import json
+import os
+import shutil
+import tempfile
+import threading
+from unittest import TestCase
+
+from slideshow.Profiler import Profiler
+from slideshow.Trace import getTraceEvents
+from slideshow.Trace import saveTrace
+
+
+class TestTrace(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_trace_events(self):
+        """
+        Test that the jobs are spans on the tracks of their threads and
+        that dependencies are connected by flow events.
+        """
+        profiler = Profiler()
+
+        def render(suffix):
+            with profiler.stage(suffix, "slide", slide=int(suffix)):
+                pass
+
+        workers = [
+            threading.Thread(target=render, args=(suffix,), name="worker-%s" % suffix)
+            for suffix in ["0", "1"]
+        ]
+        for worker in workers:
+            worker.start()
+            worker.join()
+        with profiler.stage("final", "final", depends=["0", "1", "2"]):
+            pass
+
+        events = getTraceEvents(profiler)
+        spans = [e for e in events if e["ph"] == "X"]
+        threads = [e["args"]["name"] for e in events if e["name"] == "thread_name"]
+
+        self.assertEqual([s["name"] for s in spans], ["0", "1", "final"])
+        self.assertEqual(len(set(s["tid"] for s in spans)), 3)
+        self.assertIn("worker-0", threads)
+
+        # no span for the (cached) job 2
+        starts = [e for e in events if e["ph"] == "s"]
+        ends = [e for e in events if e["ph"] == "f"]
+        self.assertEqual(len(starts), 2)
+        self.assertEqual([e["id"] for e in starts], [e["id"] for e in ends])
+        self.assertTrue(all(e["tid"] == spans[2]["tid"] for e in ends))
+
+        filename = os.path.join(self.temp_dir, "video.trace.json")
+        saveTrace(profiler, filename)
+        with open(filename) as file:
+            self.assertEqual(len(json.load(file)["traceEvents"]), len(events))
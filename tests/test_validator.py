@@ -0,0 +1,102 @@
+"""
+Tests for the validation of the filter graph at a tiny scale.
+"""
+from unittest import TestCase
+
+from slideshow import PROJECT_ROOT
+from slideshow.ImageSlide import ImageSlide
+from slideshow.Validator import findFailingChain
+from slideshow.Validator import getChainSlide
+from slideshow.Validator import getValidationCommand
+from slideshow.Validator import getValidationSize
+from slideshow.Validator import scaleSlide
+from slideshow.Validator import splitFilters
+from slideshow.Validator import VALIDATION_DURATION
+from slideshow.Validator import VALIDATION_FPS
+
+CHAINS = [
+    "[0:v]scale=64x40,zoompan=z='if(eq(on,0),1,zoom+0.1)':d=3,split=3[v0out-start][v0out-main][v0out-end]",
+    "[v0out-end]fifo,trim=start_frame=2:end_frame=3,setpts=PTS-STARTPTS[v0end]",
+    "[1:v]drawtext=text='a\\, b\\: c':fontsize=10,setpts=PTS-STARTPTS[v1start]",
+    "[v0end] [v1start] blend=all_expr='A*(1-T/0.2)+B*(T/0.2)':shortest=1 [v1trans]",
+    "[v0main][v1trans] concat=n=2:v=1:a=0,format=yuv420p[out]",
+]
+
+
+class TestValidator(TestCase):
+    def test_split_filters(self):
+        """
+        Test that commas in quotes, labels and escapes do not split a chain.
+        """
+        self.assertEqual(len(splitFilters(CHAINS[0])), 3)
+        self.assertEqual(len(splitFilters(CHAINS[1])), 3)
+        self.assertEqual(len(splitFilters(CHAINS[2])), 2)
+        self.assertEqual(len(splitFilters(CHAINS[3])), 1)
+
+    def test_failing_chain(self):
+        """
+        Test that the errors of ffmpeg are mapped to the chain and slide.
+        """
+        # the filters are numbered over all chains: 3 + 3 + 2
+        errors = "[Parsed_blend_8 @ 0x55d0] Invalid expression\n"
+        index = findFailingChain(errors, CHAINS, [])
+        self.assertEqual(index, 3)
+        # a transition belongs to the slide before it
+        self.assertEqual(getChainSlide(CHAINS[index], 2), 0)
+
+        errors = "[Parsed_drawtext_6 @ 0x55d0] Cannot find a valid font\n"
+        index = findFailingChain(errors, CHAINS, [])
+        self.assertEqual(index, 2)
+        self.assertEqual(getChainSlide(CHAINS[index], 2), 1)
+
+        errors = "[AVFilterGraph @ 0x55d0] No such filter: 'zoompan'\n"
+        self.assertEqual(findFailingChain(errors, CHAINS, []), 0)
+
+        errors = "b.jpg: No such file or directory\n"
+        self.assertEqual(findFailingChain(errors, CHAINS, ["a.jpg", "b.jpg"]), 2)
+
+        self.assertIsNone(getChainSlide(CHAINS[4], 2))
+        self.assertIsNone(findFailingChain("Unknown error", CHAINS, []))
+
+    def test_command(self):
+        """
+        Test that the validation only reports errors and writes to the null muxer.
+        """
+        cmd = getValidationCommand(
+            ["ffmpeg", "-hide_banner", "-stats", "-i a.jpg", "-t 1", '"out.mp4"']
+        )
+        self.assertEqual(cmd[0], "ffmpeg")
+        self.assertIn("-v error", cmd)
+        self.assertNotIn("-stats", cmd)
+        self.assertEqual(cmd[-1], "-f null -")
+        self.assertNotIn('"out.mp4"', cmd)
+
+    def test_scale_slide(self):
+        """
+        Test that a slide is scaled down without changing the original.
+        """
+        self.assertEqual(getValidationSize(1920, 1080), (64, 36))
+        self.assertEqual(getValidationSize(1280, 800), (64, 40))
+
+        slide = ImageSlide(
+            4,
+            str(PROJECT_ROOT / "tests" / "fixtures" / "img_001.jpeg"),
+            1280,
+            800,
+            10,
+            1,
+            1,
+            fps=30,
+            overlay_text={"title": "Intro", "duration": 5, "offset": 1, "font_size": 100},
+            transition="fade",
+        )
+        scaled = scaleSlide(slide, 64, 40)
+
+        self.assertEqual(scaled.getFrames(), VALIDATION_DURATION * VALIDATION_FPS)
+        self.assertEqual(scaled.overlay_text["duration"], 0.3)
+        self.assertEqual(scaled.overlay_text["font_size"], 5)
+        self.assertEqual(scaled.transition, "fade")
+        self.assertIn("s=64x40", scaled.getFilter()[-1])
+
+        self.assertEqual(slide.getFrames(), 300)
+        self.assertEqual(slide.overlay_text["duration"], 5)